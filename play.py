@@ -1,7 +1,9 @@
+import time
+PROCESS_START = time.perf_counter() # Startup is measured from here (imports included)
+
 import sys
 import os
 import argparse
-import time
 import numpy as np
 import logging
 
@@ -15,21 +17,85 @@ logging.basicConfig(
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 from env.benji_env import BenjiBananasEnv
-from agent.model import BenjiAgent
+from agent.pipeline import PolicyRunner
+
+def compare_latency(agent, env, steps):
+    """Runs the same number of steps serial and pipelined and reports both."""
+    for pipelined in (False, True):
+        runner = PolicyRunner(agent.model, env, pipelined=pipelined)
+        runner.reset()
+        for _ in range(steps):
+            runner.step()
+        runner.close()
+        runner.stats.report("PIPELINED" if pipelined else "SERIAL")
+
+def play_exported(args):
+    """
+    Plays with a policy from tools/export_policy.py: only torch + the env are
+    loaded (no stable-baselines3, PPO or VecNormalize), frame stacking and
+    normalization happen in the runtime / the exported graph.
+    """
+    from agent.inference import PolicyRuntime
+    
+    print(f"Loading exported policy from {args.policy}...")
+    runtime = PolicyRuntime(args.policy)
+    env = BenjiBananasEnv(offline=False)
+    startup = None
+    
+    try:
+        for ep in range(args.episodes):
+            print(f"Episode {ep+1}/{args.episodes}")
+            obs, info = env.reset()
+            runtime.reset()
+            done = False
+            total_reward = 0
+            steps = 0
+            
+            while not done:
+                action = runtime.act(obs)
+                if startup is None:
+                    startup = time.perf_counter() - PROCESS_START
+                obs, reward, terminated, truncated, info = env.step(action)
+                done = terminated or truncated
+                total_reward += reward
+                steps += 1
+                if reward != 0:
+                    print(f"Step {steps} | Reward: {reward:.4f}")
+            
+            print(f"Episode Finished. Total Reward: {total_reward:.4f} | Steps: {steps}")
+            time.sleep(1) # Pause between games
+    except KeyboardInterrupt:
+        print("\nStopping play...")
+    finally:
+        runtime.report(startup)
+        env.close()
 
 def main():
     parser = argparse.ArgumentParser(description="Run Benji Bananas Agent")
-    parser.add_argument("--model", type=str, required=True, help="Path to trained model (.zip)")
+    parser.add_argument("--model", type=str, default=None, help="Path to trained model (.zip)")
+    parser.add_argument("--policy", type=str, default=None, help="Exported policy (tools/export_policy.py) to play with instead of --model")
     parser.add_argument("--episodes", type=int, default=5, help="Number of episodes to play")
     parser.add_argument("--render", action="store_true", help="Render RGB array (slower)")
+    parser.add_argument("--pipeline", action="store_true", help="Overlap policy inference with the next env step (one step of action delay)")
+    parser.add_argument("--compare_latency", type=int, default=0, metavar="STEPS", help="Measure serial vs pipelined decision latency over STEPS steps each, then exit")
     
     args = parser.parse_args()
     
+    if args.policy:
+        if not os.path.exists(args.policy):
+            print(f"Error: Exported policy not found at {args.policy}")
+            return
+        play_exported(args)
+        return
+    if not args.model:
+        parser.error("one of --model or --policy is required")
+    
     if not os.path.exists(args.model) and not os.path.exists(args.model + ".zip"):
         print(f"Error: Model not found at {args.model}")
         return
 
     print(f"Loading Agent from {args.model}...")
+    from agent.model import BenjiAgent
     try:
         # Use BenjiAgent to handle environment wrapping (Stacking, Transpose)
         agent = BenjiAgent(model_path=args.model, offline=False)
@@ -40,13 +106,18 @@ def main():
         # Observation shape must match VecFrameStack (1, 4, 128, 128)
         dummy_obs = np.zeros((1, 4, 128, 128), dtype=np.uint8)
         agent.model.predict(dummy_obs, deterministic=True)
-        print("Model ready.")
+        print(f"Model ready ({time.perf_counter() - PROCESS_START:.2f} s since start).")
 
-        print("Starting Play Loop...")
+        if args.compare_latency:
+            compare_latency(agent, env, args.compare_latency)
+            return
+
+        print(f"Starting Play Loop ({'pipelined' if args.pipeline else 'serial'})...")
+        runner = PolicyRunner(agent.model, env, pipelined=args.pipeline)
         
         for ep in range(args.episodes):
             print(f"Episode {ep+1}/{args.episodes}")
-            obs = env.reset()
+            runner.reset()
             done = False
             total_reward = 0
             steps = 0
@@ -56,11 +127,8 @@ def main():
             # Since VecEnv auto-resets, we can't easily break the loop exactly on termination without checking info
             
             while not done:
-                # Predict action
-                action, _states = agent.model.predict(obs, deterministic=True)
-                
-                # VecEnv step returns: obs, rewards, dones, infos
-                obs, rewards, dones, infos = env.step(action)
+                # Predict action + step (VecEnv step returns: obs, rewards, dones, infos)
+                obs, rewards, dones, infos = runner.step()
                 
                 # Extract scalar values from vector
                 reward = rewards[0]
@@ -85,6 +153,9 @@ def main():
             
             print(f"Episode Finished. Total Reward: {total_reward:.4f} | Steps: {steps}")
             time.sleep(1) # Pause between games
+        
+        runner.close()
+        runner.stats.report("DECISION LATENCY")
             
     except KeyboardInterrupt:
         print("\nStopping play...")
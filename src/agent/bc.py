@@ -3,14 +3,78 @@ import torch.optim as optim
 from torch.utils.data import DataLoader
 import os
 import sys
+import time
+import argparse
 
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '../'))
 
 from agent.model import BenjiAgent
-from agent.dataset import BenjiBCDataset
+from agent.dataset import BenjiBCDataset, BenjiBCStreamDataset, collate_batch
 
-def train_bc(epochs=5, batch_size=32, lr=1e-4):
+class BatchAugment:
+    """
+    Domain randomization applied to a whole collated (B, 4, H, W) uint8 batch
+    on the training device, so the data loader stays untouched.
+    
+    Every random draw is per sample and shared by its 4 stacked frames, so
+    motion between frames is preserved:
+    - random shift of up to `shift` px (random crop of a replicate-padded frame)
+    - brightness/contrast jitter
+    - gaussian pixel noise (one noise map per sample)
+    Returns a float32 batch in [0, 255], ready for the policy.
+    """
+    def __init__(self, shift=4, brightness=0.1, contrast=0.2, noise_std=4.0):
+        self.shift = shift
+        self.brightness = brightness
+        self.contrast = contrast
+        self.noise_std = noise_std
+
+    def __call__(self, obs: torch.Tensor) -> torch.Tensor:
+        B, C, H, W = obs.shape
+        device = obs.device
+        
+        x = obs.float()
+        
+        # 1. Random shift. Clamping the source indices is equivalent to
+        # replicate padding, so the crop is two gathers (rows, then columns).
+        if self.shift > 0:
+            p = self.shift
+            dy = torch.randint(-p, p + 1, (B, 1), device=device)
+            dx = torch.randint(-p, p + 1, (B, 1), device=device)
+            rows = (torch.arange(H, device=device)[None, :] + dy).clamp_(0, H - 1)
+            cols = (torch.arange(W, device=device)[None, :] + dx).clamp_(0, W - 1)
+            x = torch.gather(x, 2, rows[:, None, :, None].expand(B, C, H, W))
+            x = torch.gather(x, 3, cols[:, None, None, :].expand(B, C, H, W))
+        
+        # 2. Brightness / contrast around each sample's mean
+        if self.contrast > 0 or self.brightness > 0:
+            contrast = 1.0 + (torch.rand(B, 1, 1, 1, device=device) * 2 - 1) * self.contrast
+            brightness = (torch.rand(B, 1, 1, 1, device=device) * 2 - 1) * self.brightness * 255.0
+            mean = x.mean(dim=(1, 2, 3), keepdim=True)
+            x = x.sub_(mean).mul_(contrast).add_(mean + brightness)
+        
+        # 3. Noise, identical across the stacked frames
+        if self.noise_std > 0:
+            x = x.add_(torch.randn(B, 1, H, W, device=device).mul_(self.noise_std))
+        
+        return x.clamp_(0.0, 255.0)
+
+
+def train_bc(epochs=5, batch_size=32, lr=1e-4, store_dir=None, cache_dir="data/cache",
+             stream=False, num_workers=0, bf16=False, channels_last=False, compile=False,
+             augment=False, log_dir="./logs/bc"):
+    """
+    Behavioral cloning pre-training of the PPO policy.
+    
+    Throughput options:
+    - num_workers: DataLoader worker processes (pinned memory + prefetch on CUDA)
+    - bf16: autocast forward/backward to bfloat16 (CPU or CUDA)
+    - channels_last: NHWC memory format for CustomCNN convolutions
+    - compile: torch.compile the feature extractor
+    - augment: BatchAugment on each batch after it reaches the device
+    Per-epoch samples/sec, data-wait and compute time go to TensorBoard (log_dir).
+    """
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
     if torch.backends.mps.is_available():
         device = torch.device("mps")
@@ -18,61 +82,138 @@ def train_bc(epochs=5, batch_size=32, lr=1e-4):
     
     # 1. Load Data
     print("Loading Dataset...")
-    # Ensure we look for dataset in the right place (root or src/agent)
-    # The dataset class usually looks for "bc_dataset.npz"
-    dataset = BenjiBCDataset()
+    # store_dir: packed frame store from tools/pack_dataset.py (skips JPEG decoding)
+    # cache_dir: per-session preprocessed frames, only new/changed sessions are decoded
+    # stream: fixed-memory streaming dataset for corpora larger than RAM
+    if stream:
+        dataset = BenjiBCStreamDataset()
+    else:
+        dataset = BenjiBCDataset(store_dir=store_dir, cache_dir=cache_dir)
     if len(dataset) == 0:
         print("No data found! Run collector.py first.")
         return
+    
+    # Workers decode/gather ahead of the training step; pinned host memory
+    # lets the uint8 batch copy to the GPU asynchronously.
+    loader_kwargs = {
+        "batch_size": batch_size,
+        "num_workers": num_workers,
+        "pin_memory": device.type == "cuda",
+    }
+    if num_workers > 0:
+        loader_kwargs["persistent_workers"] = not stream # stream reshuffles via fresh workers
+        loader_kwargs["prefetch_factor"] = 4
         
-    dataloader = DataLoader(dataset, batch_size=batch_size, shuffle=True, num_workers=0)
+    if stream:
+        # Shuffling happens inside the dataset (session order + buffer)
+        dataloader = DataLoader(dataset, **loader_kwargs)
+    else:
+        # The dataset assembles whole batches itself (__getitems__), so collation is a no-op
+        dataloader = DataLoader(dataset, shuffle=True, collate_fn=collate_batch, **loader_kwargs)
     
     # 2. Init Agent (Offline)
     print("Initializing Agent...")
     agent = BenjiAgent(offline=True)
     policy = agent.model.policy.to(device)
     
+    memory_format = torch.channels_last if channels_last else torch.contiguous_format
+    if channels_last:
+        policy = policy.to(memory_format=torch.channels_last)
+    if compile:
+        # Compiling forward (not wrapping the module) keeps state_dict keys unchanged,
+        # so agent.model.save() still works; nn.Module.compile() would need torch>=2.2
+        print("Compiling feature extractor (first batches will be slow)...")
+        extractor = policy.features_extractor
+        extractor.forward = torch.compile(extractor.forward)
+    
+    augmenter = BatchAugment() if augment else None
+    
     # 3. Setup Optimizer
     optimizer = optim.Adam(policy.parameters(), lr=lr)
     
+    writer = None
+    try:
+        from torch.utils.tensorboard import SummaryWriter
+        writer = SummaryWriter(log_dir)
+    except ImportError:
+        print("TensorBoard not installed, throughput metrics will only be printed.")
+    
     # 4. Training Loop
     print(f"Starting BC Training for {epochs} epochs...")
     policy.train()
     
     for epoch in range(epochs):
+        if stream:
+            dataset.set_epoch(epoch)
         total_loss = 0
         correct = 0
         total = 0
+        data_time = 0.0
+        compute_time = 0.0
+        augment_time = 0.0
         
+        epoch_start = time.perf_counter()
+        step_end = epoch_start
+        batch_idx = -1 # Empty loader: no batches
         for batch_idx, (obs, actions) in enumerate(dataloader):
-            obs = obs.float().to(device) # (B, 4, 84, 84)
-            actions = actions.to(device) # (B)
+            batch_ready = time.perf_counter()
+            data_time += batch_ready - step_end
+            
+            # Copy uint8 (4x smaller than float32), then convert on the device
+            obs = obs.to(device, non_blocking=True)
+            if augmenter is not None:
+                aug_start = time.perf_counter()
+                obs = augmenter(obs)
+                augment_time += time.perf_counter() - aug_start
+            obs = obs.float().contiguous(memory_format=memory_format) # (B, 4, 128, 128)
+            actions = actions.to(device, non_blocking=True) # (B)
             
             # Forward Pass
             # SB3 Policy returns distribution
             # We assume NatureCNN normalizes if configured (it is)
-            dist = policy.get_distribution(obs)
-            
-            # Loss: Negative Log Likelihood
-            loss = -dist.log_prob(actions).mean()
+            with torch.autocast(device_type=device.type, dtype=torch.bfloat16, enabled=bf16):
+                dist = policy.get_distribution(obs)
+                
+                # Loss: Negative Log Likelihood
+                loss = -dist.log_prob(actions).float().mean()
             
             # Backward
-            optimizer.zero_grad()
+            optimizer.zero_grad(set_to_none=True)
             loss.backward()
             optimizer.step()
             
-            # Metrics
+            # Metrics (.item() synchronizes, so compute_time includes device work)
             total_loss += loss.item()
             pred_actions = dist.mode() # discrete: argmax
             correct += (pred_actions == actions).sum().item()
             total += actions.size(0)
             
+            step_end = time.perf_counter()
+            compute_time += step_end - batch_ready
+            
             if batch_idx % 10 == 0:
                 print(f"Epoch {epoch+1}/{epochs} | Batch {batch_idx}/{len(dataloader)} | Loss: {loss.item():.4f} | Acc: {correct/total:.2%}", end='\r')
                 
-        avg_loss = total_loss / len(dataloader)
-        acc = correct / total
+        epoch_time = time.perf_counter() - epoch_start
+        avg_loss = total_loss / max(batch_idx + 1, 1)
+        acc = correct / max(total, 1)
+        samples_per_sec = total / epoch_time
         print(f"\nEpoch {epoch+1} Done. Avg Loss: {avg_loss:.4f} | Accuracy: {acc:.2%}")
+        print(f"  {samples_per_sec:.0f} samples/sec | data wait {data_time:.1f}s | compute {compute_time:.1f}s"
+              + (f" (augment {augment_time:.1f}s)" if augmenter is not None else ""))
+        
+        if writer is not None:
+            writer.add_scalar("bc/loss", avg_loss, epoch)
+            writer.add_scalar("bc/accuracy", acc, epoch)
+            writer.add_scalar("bc/samples_per_sec", samples_per_sec, epoch)
+            writer.add_scalar("bc/data_wait_sec", data_time, epoch)
+            writer.add_scalar("bc/compute_sec", compute_time, epoch)
+            writer.add_scalar("bc/data_wait_fraction", data_time / epoch_time, epoch)
+            if augmenter is not None:
+                writer.add_scalar("bc/augment_sec", augment_time, epoch)
+    
+    if writer is not None:
+        writer.close()
         
     # 5. Save
     os.makedirs("models", exist_ok=True)
@@ -81,4 +222,22 @@ def train_bc(epochs=5, batch_size=32, lr=1e-4):
     print(f"Pre-trained model saved to {save_path}.zip")
 
 if __name__ == "__main__":
-    train_bc()
+    parser = argparse.ArgumentParser(description="Behavioral cloning pre-training")
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--batch_size", type=int, default=32)
+    parser.add_argument("--lr", type=float, default=1e-4)
+    parser.add_argument("--store", type=str, default=None, help="Packed frame store dir (tools/pack_dataset.py)")
+    parser.add_argument("--cache", type=str, default="data/cache", help="Per-session preprocessing cache dir")
+    parser.add_argument("--stream", action="store_true", help="Stream sessions instead of loading into RAM")
+    parser.add_argument("--workers", type=int, default=0, help="DataLoader worker processes")
+    parser.add_argument("--bf16", action="store_true", help="bfloat16 autocast")
+    parser.add_argument("--channels_last", action="store_true", help="channels_last memory format for the CNN")
+    parser.add_argument("--compile", action="store_true", help="torch.compile the feature extractor")
+    parser.add_argument("--augment", action="store_true", help="Batched shift/colour/noise augmentation")
+    parser.add_argument("--log_dir", type=str, default="./logs/bc", help="TensorBoard log dir")
+    args = parser.parse_args()
+    
+    train_bc(epochs=args.epochs, batch_size=args.batch_size, lr=args.lr,
+             store_dir=args.store, cache_dir=args.cache, stream=args.stream,
+             num_workers=args.workers, bf16=args.bf16, channels_last=args.channels_last,
+             compile=args.compile, augment=args.augment, log_dir=args.log_dir)
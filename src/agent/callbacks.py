@@ -1,4 +1,5 @@
 from stable_baselines3.common.callbacks import BaseCallback
+import numpy as np
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,16 +13,19 @@ class TensorboardCallback(BaseCallback):
         super(TensorboardCallback, self).__init__(verbose)
 
     def _on_step(self) -> bool:
-        # Access the 'info' dict of the first environment
+        # Access the 'info' dicts of every environment
         # The 'infos' are accessible via self.locals['infos']
         infos = self.locals.get("infos", [])
-        if infos:
-             # Aggregate components from all envs (if parallel) or just take first
-             # For now, taking first is fine for DummyVecEnv(1)
-            info = infos[0]
-            if "reward_components" in info:
-                for key, value in info["reward_components"].items():
-                    self.logger.record(f"custom/{key}", value)
+        # Average each component over every env that reported it this step
+        # (one per device with SubprocVecEnv)
+        totals = {}
+        counts = {}
+        for info in infos:
+            for key, value in info.get("reward_components", {}).items():
+                totals[key] = totals.get(key, 0.0) + value
+                counts[key] = counts.get(key, 0) + 1
+        for key, total in totals.items():
+            self.logger.record(f"custom/{key}", total / counts[key])
         return True
 
 class PauseCallback(BaseCallback):
@@ -44,7 +48,8 @@ class PauseCallback(BaseCallback):
         # self.training_env is a VecEnv.
         # We need to call unpause() on the actual BenjiBananasEnv instance.
         # Since it's wrapped in Monitor -> VecFrameStack -> dummyVecEnv...
-        # We try to access methods via 'env_method'.
+        # We try to access methods via 'env_method', which calls every env
+        # (all devices when running a SubprocVecEnv).
         
         logger.info("[Callback] Rollout Started. Unpausing Game...")
         try:
@@ -65,3 +70,51 @@ class PauseCallback(BaseCallback):
             self.training_env.env_method("pause")
         except Exception as e:
             logger.warning(f"Failed to pause environment: {e}")
+
+class DelayedRewardCallback(BaseCallback):
+    """
+    Moves rewards that AsyncRewardWrapper reports late (info["delayed_rewards"],
+    already part of the current step's reward) back to the rollout-buffer slot
+    of the step whose frame they were read from.
+    
+    Steps still in the current rollout are patched in place in
+    rollout_buffer.rewards (before returns/advantages are computed at the end
+    of the rollout), and the same amount is taken off the current step's
+    reward before it is stored. Rewards for steps of an already-trained
+    rollout stay on the current step, so nothing is lost or counted twice.
+    """
+    def __init__(self, verbose=0):
+        super(DelayedRewardCallback, self).__init__(verbose)
+        self._slots = {} # (env_idx, seq) -> rollout buffer position
+        self.credited = 0
+        self.carried_over = 0
+
+    def _on_rollout_start(self) -> None:
+        self._slots = {}
+
+    def _normalize(self, reward):
+        # VecNormalize scales the rewards the buffer sees (this step's, with the
+        # delayed ones inside, by the same ret_rms); scale the moved part the same way
+        normalize = getattr(self.training_env, "normalize_reward", None)
+        if normalize is None:
+            return reward
+        return float(normalize(np.array([reward], dtype=np.float32))[0])
+
+    def _on_step(self) -> bool:
+        infos = self.locals.get("infos", [])
+        rewards = self.locals.get("rewards")
+        buffer = self.model.rollout_buffer
+        # on_step runs before the current step is added, at buffer.pos
+        for env_idx, info in enumerate(infos):
+            if "reward_seq" in info:
+                self._slots[(env_idx, info["reward_seq"])] = buffer.pos
+            for seq, reward in info.get("delayed_rewards", []):
+                pos = self._slots.get((env_idx, seq))
+                if pos is not None and pos < buffer.pos and rewards is not None:
+                    value = self._normalize(reward)
+                    buffer.rewards[pos, env_idx] += value
+                    rewards[env_idx] -= value
+                    self.credited += 1
+                else:
+                    self.carried_over += 1
+        return True
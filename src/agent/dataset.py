@@ -4,22 +4,335 @@ import cv2
 import csv
 import torch
 import numpy as np
-from torch.utils.data import Dataset
+from torch.utils.data import Dataset, IterableDataset, get_worker_info
 import glob
 import sys
+import time
+from collections import deque
+import hashlib
+import inspect
+from concurrent.futures import ProcessPoolExecutor
 
 # Add src to path to import preprocessor
 sys.path.append(os.path.join(os.path.dirname(__file__), '../'))
 from env.preprocessing import BenjiPreprocessor
+from env.batch_preprocessing import BatchPreprocessor
+from data.frame_writer import VIDEO_FILE, VIDEO_INDEX_FILE, read_video_index, iter_video_frames
+
+# Packed frame store layout (see build_frame_store)
+STORE_FRAMES_FILE = "frames.npy"
+STORE_INDEX_FILE = "index.npz"
+
+# Bump when the cache layout or decode pipeline changes
+CACHE_VERSION = 1
+
+
+def read_session(session_path):
+    """
+    Parses a session's actions.csv into a list of
+    {'img_path', 'action', 'frame_id'} dicts, sorted by frame_id.
+    Rows whose frame file is missing are dropped.
+    
+    Video sessions (DataCollector record_mode="video") have img_path None
+    and carry 'video_path' / 'video_index' from the frames_index.csv sidecar
+    instead; no per-frame file checks are needed.
+    """
+    csv_path = os.path.join(session_path, "actions.csv")
+    frames_dir = os.path.join(session_path, "frames")
+    
+    if not os.path.exists(csv_path):
+        return []
+        
+    with open(csv_path, 'r') as f:
+        reader = csv.DictReader(f)
+        # Read all rows first strictly sorted by frame_id
+        rows = list(reader)
+        rows.sort(key=lambda x: int(x['frame_id']))
+    
+    video_index = read_video_index(session_path)
+    video_path = os.path.join(session_path, VIDEO_FILE)
+        
+    session_data = []
+    for row in rows:
+        frame_id = int(row['frame_id'])
+        action = int(row['action'])
+        
+        if video_index is not None:
+            # Dropped frames are absent from the sidecar
+            if frame_id in video_index:
+                session_data.append({
+                    'img_path': None,
+                    'video_path': video_path,
+                    'video_index': video_index[frame_id],
+                    'action': action,
+                    'frame_id': frame_id
+                })
+            continue
+        
+        img_path = os.path.join(frames_dir, f"frame_{frame_id:06d}.jpg")
+        
+        # Check if file exists (integrity)
+        if os.path.exists(img_path):
+            session_data.append({
+                'img_path': img_path,
+                'action': action,
+                'frame_id': frame_id
+            })
+    return session_data
+
+
+def preprocess_bgr(preprocessor, raw_bgr):
+    """Preprocesses one raw BGR frame to a (128, 128) uint8 frame."""
+    if raw_bgr is None:
+        # corrupted or missing
+        return np.zeros((128, 128), dtype=np.uint8)
+    frame = preprocessor.process_frame(raw_bgr)
+    # Frame is (1, 128, 128) - CHW
+    # Squeeze channel dim: (1, 128, 128) -> (128, 128)
+    if frame.ndim == 3 and frame.shape[0] == 1:
+        frame = frame[0, :, :]
+    return frame
+
+
+def load_frame(preprocessor, img_path):
+    """Decodes and preprocesses one JPEG to a (128, 128) uint8 frame."""
+    return preprocess_bgr(preprocessor, cv2.imread(img_path))
+
+
+# Raw frames buffered per BatchPreprocessor.process_batch call
+VIDEO_BATCH_SIZE = 32
+
+
+def decode_video(preprocessor, video_path, video_indices):
+    """Sequentially decodes a session video, yielding preprocessed frames."""
+    batch = BatchPreprocessor(preprocessor)
+    raw = []
+    for raw_bgr in iter_video_frames(video_path, video_indices):
+        raw.append(raw_bgr)
+        if len(raw) == VIDEO_BATCH_SIZE:
+            yield from batch.process_batch(raw)
+            raw = []
+    if raw:
+        yield from batch.process_batch(raw)
+
+
+# JPEG (libjpeg) can decode directly at 1/2, 1/4 or 1/8 scale in grayscale,
+# which skips most of the IDCT and colour conversion work.
+_REDUCED_GRAYSCALE_FLAGS = {
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+
+# Max mean abs difference (grey levels) tolerated between the reduced decode
+# and preprocessor.process_frame before falling back to full decoding.
+# The reduced path is lossy (individual pixels can be off by ~20 levels),
+# which is why it is opt-in (reduced_decode=False by default).
+REDUCED_DECODE_TOLERANCE = 2.0
+
+
+def _reduced_decode(img_path, factor):
+    """Decodes at 1/factor scale in grayscale and area-resizes to 128x128."""
+    img = cv2.imread(img_path, _REDUCED_GRAYSCALE_FLAGS[factor])
+    if img is None or img.shape[0] < 128 or img.shape[1] < 128:
+        return None
+    return cv2.resize(img, (128, 128), interpolation=cv2.INTER_AREA)
+
+
+def choose_reduced_factor(preprocessor, sample_path):
+    """
+    Picks the largest JPEG reduction factor that still leaves at least 128px
+    on each side, and checks on sample_path that the reduced grayscale path
+    stays within REDUCED_DECODE_TOLERANCE of preprocessor.process_frame.
+    Returns 1 if it does not (e.g. a non-grayscale preprocessor), meaning
+    "decode at full size". The measured error is printed either way.
+    """
+    raw_bgr = cv2.imread(sample_path)
+    if raw_bgr is None:
+        return 1
+    h, w = raw_bgr.shape[:2]
+    
+    reference = load_frame(preprocessor, sample_path)
+    for factor in (8, 4, 2):
+        if h // factor < 128 or w // factor < 128:
+            continue
+        reduced = _reduced_decode(sample_path, factor)
+        if reduced is None or reduced.shape != reference.shape:
+            continue
+        diff = np.abs(reduced.astype(np.int16) - reference.astype(np.int16))
+        accepted = diff.mean() <= REDUCED_DECODE_TOLERANCE
+        print(f"Reduced JPEG decode 1/{factor}: mean abs error {diff.mean():.2f}, max {diff.max()} grey levels "
+              f"vs process_frame ({'using it' if accepted else 'rejected'})")
+        if accepted:
+            return factor
+    return 1
+
+
+# Per-process state for decode_frames() workers
+_worker_preprocessor = None
+_worker_factor = 1
+
+
+def _init_decode_worker(factor):
+    global _worker_preprocessor, _worker_factor
+    _worker_preprocessor = BenjiPreprocessor()
+    _worker_factor = factor
+
+
+def _decode_worker(img_path):
+    frame = None
+    if _worker_factor > 1:
+        frame = _reduced_decode(img_path, _worker_factor)
+    if frame is None:
+        frame = load_frame(_worker_preprocessor, img_path)
+    return frame
+
+
+def decode_frames(img_paths, num_workers=None, reduced_decode=False, log_every=1000):
+    """
+    Decodes and preprocesses img_paths over a process pool, yielding
+    (128, 128) uint8 frames in input order. Prints progress and frames/sec.
+    
+    With reduced_decode=True (opt-in, lossy), frames are decoded straight to
+    a reduced grayscale size when choose_reduced_factor() finds it close
+    enough to the preprocessor output. The default decodes at full size.
+    """
+    total = len(img_paths)
+    if total == 0:
+        return
+    
+    factor = 1
+    if reduced_decode:
+        factor = choose_reduced_factor(BenjiPreprocessor(), img_paths[0])
+    num_workers = num_workers or os.cpu_count() or 1
+    print(f"Decoding {total} frames with {num_workers} workers (JPEG reduction 1/{factor})...")
+    
+    start = time.time()
+    
+    def report(n):
+        if n % log_every == 0 or n == total:
+            elapsed = max(time.time() - start, 1e-6)
+            print(f"Decoded {n}/{total} frames | {n / elapsed:.0f} frames/sec", end='\r' if n < total else '\n')
+    
+    if num_workers <= 1:
+        _init_decode_worker(factor)
+        for n, p in enumerate(img_paths, 1):
+            frame = _decode_worker(p)
+            report(n)
+            yield frame
+        return
+    
+    # Large chunks amortize IPC; each result is only 16 KB.
+    chunksize = max(1, min(256, total // (num_workers * 4)))
+    with ProcessPoolExecutor(max_workers=num_workers,
+                             initializer=_init_decode_worker,
+                             initargs=(factor,)) as pool:
+        for n, frame in enumerate(pool.map(_decode_worker, img_paths, chunksize=chunksize), 1):
+            report(n)
+            yield frame
+
+
+def decode_into(out, positions, img_paths, videos, num_workers=None, reduced_decode=False):
+    """
+    Fills `out` (F, 128, 128) with preprocessed frames:
+    - JPEG frames img_paths[i] go to out[positions[i]] via decode_frames()
+    - each (offset, video_path, video_indices) in videos is decoded
+      sequentially into out[offset:offset + len(video_indices)]
+    """
+    for i, frame in enumerate(decode_frames(img_paths, num_workers, reduced_decode)):
+        out[positions[i]] = frame
+    
+    if videos:
+        preprocessor = BenjiPreprocessor()
+        for offset, video_path, video_indices in videos:
+            print(f"Decoding {len(video_indices)} frames from {video_path}...")
+            for k, frame in enumerate(decode_video(preprocessor, video_path, video_indices)):
+                out[offset + k] = frame
+
+
+def session_fingerprint(session_path):
+    """
+    Content key for a session: hash of actions.csv plus the name, size and
+    mtime of every file in frames/ (or of the session video and its index).
+    Changes whenever the collector adds, rewrites or removes anything.
+    """
+    h = hashlib.sha1()
+    with open(os.path.join(session_path, "actions.csv"), 'rb') as f:
+        h.update(f.read())
+    
+    frames_dir = os.path.join(session_path, "frames")
+    if os.path.isdir(frames_dir):
+        for entry in sorted(os.scandir(frames_dir), key=lambda e: e.name):
+            st = entry.stat()
+            h.update(f"{entry.name}:{st.st_size}:{st.st_mtime_ns};".encode())
+    
+    for name in (VIDEO_FILE, VIDEO_INDEX_FILE):
+        path = os.path.join(session_path, name)
+        if os.path.exists(path):
+            st = os.stat(path)
+            h.update(f"{name}:{st.st_size}:{st.st_mtime_ns};".encode())
+    return h.hexdigest()
+
+
+def preprocessor_fingerprint(preprocessor, reduced_decode=False):
+    """
+    Config key for a preprocessor: its class source plus its plain attributes
+    (sizes, flags, arrays). Any change to either invalidates cached frames.
+    """
+    h = hashlib.sha1()
+    cls = type(preprocessor)
+    h.update(f"{cls.__module__}.{cls.__qualname__}|v{CACHE_VERSION}|reduced={reduced_decode}".encode())
+    try:
+        h.update(inspect.getsource(cls).encode())
+    except (OSError, TypeError):
+        pass
+    
+    for name, value in sorted(vars(preprocessor).items()):
+        if isinstance(value, np.ndarray):
+            h.update(f"{name}={value.dtype}{value.shape}".encode())
+            h.update(value.tobytes())
+        elif isinstance(value, (int, float, str, bool, tuple, list, type(None))):
+            h.update(f"{name}={value!r}".encode())
+    return h.hexdigest()
+
+
+def stack_indices(offset, length, stack_size):
+    """
+    Frame-stack index matrix for one session of `length` frames stored at
+    `offset` in a flat frame array: row i is [T-3, T-2, T-1, T] (chronological)
+    for T = offset + i. Entries before the session start are -1 (zero padding).
+    """
+    local = np.arange(length, dtype=np.int64)[:, None] - np.arange(stack_size - 1, -1, -1)[None, :]
+    indices = (local + offset).astype(np.int32)
+    indices[local < 0] = -1
+    return indices
+
 
 class BenjiBCDataset(Dataset):
-    def __init__(self, data_dir="data/raw", stack_size=4):
+    def __init__(self, data_dir="data/raw", stack_size=4, store_dir=None,
+                 num_workers=None, reduced_decode=False, cache_dir=None):
         self.data_dir = data_dir
         self.stack_size = stack_size
+        self.num_workers = num_workers # Preload processes (None = all cores)
+        self.reduced_decode = reduced_decode
+        self.cache_dir = cache_dir # Per-session preprocessed frame cache (None = off)
         self.preprocessor = BenjiPreprocessor()
         
-        self.samples = []
-        self.image_cache = {} # RAM Cache
+        # Compact sample index:
+        # - frames: (F, 128, 128) uint8, in RAM or memory-mapped
+        # - stack_indices: (N, stack_size) int32 rows into frames, -1 = padding
+        # - actions: (N,) uint8
+        self.frame_paths = [] # One path per frame (JPEG mode only)
+        self.sessions = [] # (session_path, frame offset, frame count)
+        self.session_videos = {} # session_path -> (video_path, video_indices) for video sessions
+        self.frames = np.zeros((0, 128, 128), dtype=np.uint8)
+        self.stack_indices = np.zeros((0, stack_size), dtype=np.int32)
+        self.actions = np.zeros(0, dtype=np.uint8)
+        
+        # 0. Packed store: skip decoding entirely, pages are loaded on demand
+        if store_dir is not None:
+            self._load_store(store_dir)
+            return
         
         # 1. Discover all sessions
         if not os.path.exists(data_dir):
@@ -29,142 +342,338 @@ class BenjiBCDataset(Dataset):
         session_dirs = sorted(glob.glob(os.path.join(data_dir, "session_*")))
         print(f"Found {len(session_dirs)} sessions.")
         
+        index_parts, action_parts = [], []
         for session_path in session_dirs:
-            self._load_session(session_path)
+            self._load_session(session_path, index_parts, action_parts)
+        self._set_index(index_parts, action_parts)
             
-        print(f"Total Samples Loaded: {len(self.samples)}")
+        print(f"Total Samples Loaded: {len(self)}")
         print("Pre-loading images into RAM...")
         self._preload_images()
-        print(f"Cached {len(self.image_cache)} images.")
+        print(f"Cached {len(self.frames)} images.")
+
+    def _set_index(self, index_parts, action_parts):
+        if index_parts:
+            self.stack_indices = np.concatenate(index_parts)
+            self.actions = np.concatenate(action_parts).astype(np.uint8)
 
     def _preload_images(self):
-        """Loads all unique images referenced in samples into RAM."""
-        unique_paths = set()
-        for s in self.samples:
-            for p in s['paths']:
-                if p is not None:
-                    unique_paths.add(p)
-        
-        for p in unique_paths:
-            if p not in self.image_cache:
-                raw_bgr = cv2.imread(p)
-                if raw_bgr is not None:
-                    frame = self.preprocessor.process_frame(raw_bgr)
-                    # Frame is (1, 128, 128) - CHW
-                    # Squeeze channel dim: (1, 128, 128) -> (128, 128)
-                    if frame.ndim == 3 and frame.shape[0] == 1:
-                        frame = frame[0, :, :]
-                    self.image_cache[p] = frame
-                else:
-                    # corrupted or missing
-                    self.image_cache[p] = np.zeros((128, 128), dtype=np.uint8)
-
-    def _load_session(self, session_path):
-        """Parses actions.csv and verifies frame existence."""
-        csv_path = os.path.join(session_path, "actions.csv")
-        frames_dir = os.path.join(session_path, "frames")
-        
-        if not os.path.exists(csv_path):
+        """
+        Fills one contiguous array with every frame referenced by the index.
+        Sessions with a valid cache entry are read from disk; only new or
+        changed sessions are decoded (in one parallel pass) and then cached.
+        """
+        self.frames = np.empty((len(self.frame_paths), 128, 128), dtype=np.uint8)
+        
+        preproc_key = None
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            preproc_key = preprocessor_fingerprint(self.preprocessor, self.reduced_decode)
+        
+        pending = [] # (session_path, offset, length, session_key)
+        for session_path, offset, length in self.sessions:
+            session_key = None
+            if self.cache_dir:
+                session_key = session_fingerprint(session_path)
+                cached = self._read_cache(session_path, session_key, preproc_key, length)
+                if cached is not None:
+                    self.frames[offset:offset + length] = cached
+                    continue
+            pending.append((session_path, offset, length, session_key))
+        
+        if self.cache_dir:
+            print(f"Preprocessing cache: {len(self.sessions) - len(pending)} sessions reused, "
+                  f"{len(pending)} to process.")
+        
+        positions, videos = [], []
+        for session_path, offset, length, _ in pending:
+            if session_path in self.session_videos:
+                videos.append((offset, *self.session_videos[session_path]))
+            else:
+                positions.extend(range(offset, offset + length))
+        paths = [self.frame_paths[i] for i in positions]
+        decode_into(self.frames, positions, paths, videos, self.num_workers, self.reduced_decode)
+        
+        if self.cache_dir:
+            for session_path, offset, length, session_key in pending:
+                self._write_cache(session_path, session_key, preproc_key,
+                                  self.frames[offset:offset + length])
+
+    def _cache_path(self, session_path):
+        return os.path.join(self.cache_dir, os.path.basename(os.path.normpath(session_path)) + ".npz")
+
+    def _read_cache(self, session_path, session_key, preproc_key, length):
+        """Returns cached (length, 128, 128) frames, or None if missing or stale."""
+        path = self._cache_path(session_path)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as entry:
+                # npz members load lazily: check the keys before touching frames
+                if str(entry['session_key']) != session_key:
+                    print(f"Cache stale (session changed): {os.path.basename(path)}")
+                    return None
+                if str(entry['preprocessor_key']) != preproc_key:
+                    print(f"Cache stale (preprocessor changed): {os.path.basename(path)}")
+                    return None
+                frames = entry['frames']
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Cache unreadable, rebuilding {os.path.basename(path)}: {e}")
+            return None
+        if frames.shape != (length, 128, 128):
+            return None
+        return frames
+
+    def _write_cache(self, session_path, session_key, preproc_key, frames):
+        path = self._cache_path(session_path)
+        tmp_path = path + ".tmp"
+        # Write then rename, so an interrupted run never leaves a truncated entry
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, frames=frames, session_key=session_key, preprocessor_key=preproc_key)
+        os.replace(tmp_path, path)
+
+    def _load_store(self, store_dir):
+        """Opens a packed frame store written by build_frame_store()."""
+        frames_path = os.path.join(store_dir, STORE_FRAMES_FILE)
+        index_path = os.path.join(store_dir, STORE_INDEX_FILE)
+        
+        if not os.path.exists(frames_path) or not os.path.exists(index_path):
+            print(f"Dataset Warning: no frame store in {store_dir}. Run tools/pack_dataset.py first.")
             return
-            
-        with open(csv_path, 'r') as f:
-            reader = csv.DictReader(f)
-            # We need to store everything in memory or just indices?
-            # Storing indices is memory efficient.
-            # But we need random access for stacking.
-            
-            # Read all rows first strictly sorted by frame_id
-            rows = list(reader)
-            rows.sort(key=lambda x: int(x['frame_id']))
-            
-            # Convert to list of dicts for faster access
-            session_data = []
-            for row in rows:
-                frame_id = int(row['frame_id'])
-                action = int(row['action'])
-                img_path = os.path.join(frames_dir, f"frame_{frame_id:06d}.jpg")
-                
-                # Check if file exists (integrity)
-                if os.path.exists(img_path):
-                    session_data.append({
-                        'img_path': img_path,
-                        'action': action,
-                        'frame_id': frame_id
-                    })
-            
-            # Add to master list
-            # We store (session_obj_ref, local_index)
-            # No, cleaner: flat list of (img_path, action, *history_paths*)
-            # Actually, generating history paths on the fly is better but requires knowing session boundaries.
-            
-            # Strategy: Samples list contains metadata strictly.
-            # We need to know previous 3 frames for each sample. 
-            # If index < 3, we pad.
-            
-            for i in range(len(session_data)):
-                # Get current and previous k-1 frames
-                frames_stack = []
-                for k in range(self.stack_size):
-                    prev_idx = i - k
-                    if prev_idx >= 0:
-                        frames_stack.append(session_data[prev_idx]['img_path'])
-                    else:
-                        # Padding: Use the oldest available frame (usually frame 0)
-                        # or None (to indicate zero padding)
-                        frames_stack.append(None) 
-                
-                # Frames are appended [current, prev, prev-1, prev-2]
-                # We usually want [prev-2, prev-1, prev, current] order? 
-                # VecFrameStack usually does channels: [Current, Prev, Prev-2...] or chronological?
-                # SB3 VecFrameStack stacks on channel dim. 
-                # Convention: Usually [Oldest ... Newest] or [Newest ... Oldest]?
-                # SB3 NatureCNN implementation flattens channels.
-                # Let's stick to Chronological: [T-3, T-2, T-1, T]
-                
-                frames_stack.reverse() # Now [T-3, T-2, T-1, T]
-                
-                self.samples.append({
-                    'paths': frames_stack,
-                    'action': session_data[i]['action']
-                })
+        
+        # mmap_mode='r' maps the file without reading it; the OS pages in
+        # only the frames that are actually indexed.
+        self.frames = np.load(frames_path, mmap_mode='r')
+        index = np.load(index_path)
+        offsets = index['session_offsets']
+        
+        print(f"Opened frame store {frames_path}: {len(offsets) - 1} sessions, {len(self.frames)} frames.")
+        
+        index_parts = [
+            stack_indices(int(offsets[s]), int(offsets[s + 1] - offsets[s]), self.stack_size)
+            for s in range(len(offsets) - 1)
+        ]
+        self._set_index(index_parts, [index['actions']])
+        
+        print(f"Total Samples Loaded: {len(self)}")
+
+    def _load_session(self, session_path, index_parts, action_parts):
+        """Parses actions.csv and appends the session's frames and samples."""
+        session_data = read_session(session_path)
+        if not session_data:
+            return
+        
+        # Every frame is one sample; its stack is the previous
+        # stack_size - 1 frames of the same session plus itself.
+        # Stacks are chronological [T-3, T-2, T-1, T] to match VecFrameStack,
+        # and are zero padded (-1) before the session start.
+        offset = len(self.frame_paths)
+        self.sessions.append((session_path, offset, len(session_data)))
+        self.frame_paths.extend(entry['img_path'] for entry in session_data)
+        if session_data[0]['img_path'] is None:
+            self.session_videos[session_path] = (
+                session_data[0]['video_path'],
+                np.array([entry['video_index'] for entry in session_data], dtype=np.int64))
+        index_parts.append(stack_indices(offset, len(session_data), self.stack_size))
+        action_parts.append(np.array([entry['action'] for entry in session_data], dtype=np.uint8))
 
     def __len__(self):
-        return len(self.samples)
+        return len(self.actions)
 
     def __getitem__(self, idx):
-        sample = self.samples[idx]
-        image_paths = sample['paths']
-        action = sample['action']
+        indices = self.stack_indices[idx]
         
-        stacked_frames = []
-        
-        for p in image_paths:
-            if p is None:
-                # Padding: Zero frame (128x128)
-                frame = np.zeros((128, 128), dtype=np.uint8)
-            else:
-                # Retrieve from Cache
-                frame = self.image_cache.get(p)
-                if frame is None:
-                     # Should not happen if preloaded, but fallback
-                     frame = np.zeros((128, 128), dtype=np.uint8)
-            
-            stacked_frames.append(frame)
-            
-        # Convert to Numpy Stack (4, 128, 128)
-        # Note: Preprocessor returns (128, 128) squeezed.
-        np_stack = np.array(stacked_frames, dtype=np.uint8)
-        
-        # Convert to Tensor
-        # PyTorch expects Float 0-1 usually? 
-        # SB3 "NatureCNN" handles normalization internally? 
-        # Yes, SB3 CnnPolicy divides by 255 if "normalize_images=True".
-        # But we are passing this DIRECTLY to the network feature extractor in our custom loop?
-        # If we use SB3 policy, it expects input dict or tensor?
-        # In custom loop, we'll feed tensor.
-        # Let's return ByteTensor (0-255) and normalize in training loop to save dataloader bandwidth.
+        # One gather for the whole stack -> contiguous (4, 128, 128) uint8.
+        # Padding (-1) would wrap to the last frame, so zero it afterwards.
+        np_stack = self.frames[indices]
+        if indices[0] < 0:
+            np_stack[indices < 0] = 0
         
+        # Return ByteTensor (0-255) and normalize in training loop to save dataloader bandwidth.
+        # SB3 CnnPolicy divides by 255 itself ("normalize_images=True").
         state_tensor = torch.from_numpy(np_stack) # Shape (4, 128, 128)
-        action_tensor = torch.tensor(action, dtype=torch.long)
+        action_tensor = torch.tensor(int(self.actions[idx]), dtype=torch.long)
+        
+        return state_tensor, action_tensor
+
+    def __getitems__(self, indices):
+        """
+        Batch fetch used by DataLoader (torch>=2.1) instead of B __getitem__ calls.
+        Returns (B, stack_size, 128, 128) uint8 and (B,) long tensors built
+        with one gather. Pair with collate_fn=collate_batch.
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        stack_idx = self.stack_indices[indices] # (B, stack_size)
+        
+        np_batch = self.frames[stack_idx] # (B, stack_size, 128, 128)
+        pad = stack_idx < 0
+        if pad.any():
+            np_batch[pad] = 0
         
+        state_tensor = torch.from_numpy(np_batch)
+        action_tensor = torch.from_numpy(self.actions[indices].astype(np.int64))
         return state_tensor, action_tensor
+
+
+class BenjiBCStreamDataset(IterableDataset):
+    """
+    Streaming variant of BenjiBCDataset for corpora larger than RAM.
+    
+    Sessions are read one after another and frames are decoded on the fly;
+    stacks come from a rolling window of the last stack_size frames (zero
+    padded at each session start, same as BenjiBCDataset). Samples pass
+    through a bounded shuffle buffer, so memory is roughly
+    shuffle_buffer * stack_size * 16 KB regardless of corpus size.
+    
+    With DataLoader workers, each worker gets a disjoint slice of the
+    (per-epoch shuffled) session list. Call set_epoch() before each epoch to
+    reshuffle.
+    """
+    def __init__(self, data_dir="data/raw", stack_size=4, shuffle_buffer=1024,
+                 seed=0, reduced_decode=False):
+        self.data_dir = data_dir
+        self.stack_size = stack_size
+        self.shuffle_buffer = shuffle_buffer
+        self.seed = seed
+        self.reduced_decode = reduced_decode
+        self.epoch = 0
+        
+        self.session_dirs = sorted(glob.glob(os.path.join(data_dir, "session_*")))
+        
+        # Sample count for len(DataLoader): the rows read_session() keeps
+        # (frame file / video index entry present), no decoding
+        self.num_samples = 0
+        sample_path = None # First JPEG frame, to probe the reduction factor
+        for session_path in self.session_dirs:
+            session_data = read_session(session_path)
+            self.num_samples += len(session_data)
+            if sample_path is None and session_data and session_data[0]['img_path'] is not None:
+                sample_path = session_data[0]['img_path']
+        print(f"Streaming {len(self.session_dirs)} sessions ({self.num_samples} samples).")
+        
+        # Reduction factor is probed once here and shipped to workers
+        self.reduced_factor = 1
+        if reduced_decode and sample_path is not None:
+            self.reduced_factor = choose_reduced_factor(BenjiPreprocessor(), sample_path)
+
+    def set_epoch(self, epoch):
+        self.epoch = epoch
+
+    def __len__(self):
+        return self.num_samples
+
+    def _worker_sessions(self):
+        """This worker's share of the session list, shuffled per epoch."""
+        order = np.random.default_rng((self.seed, self.epoch)).permutation(len(self.session_dirs))
+        sessions = [self.session_dirs[i] for i in order]
+        
+        worker = get_worker_info()
+        if worker is None:
+            return sessions, 0
+        return sessions[worker.id::worker.num_workers], worker.id
+
+    def _iter_session(self, session_path):
+        """Yields (stack, action) for one session with a rolling frame window."""
+        window = deque([np.zeros((128, 128), dtype=np.uint8)] * self.stack_size, maxlen=self.stack_size)
+        session_data = read_session(session_path)
+        if not session_data:
+            return
+        
+        if session_data[0]['img_path'] is None:
+            # Video session: one sequential decoder pass
+            frames = decode_video(_worker_preprocessor, session_data[0]['video_path'],
+                                  [entry['video_index'] for entry in session_data])
+        else:
+            frames = (_decode_worker(entry['img_path']) for entry in session_data)
+        
+        for entry, frame in zip(session_data, frames):
+            window.append(frame) # [T-3, T-2, T-1, T]
+            yield np.stack(window), entry['action']
+
+    def __iter__(self):
+        sessions, worker_id = self._worker_sessions()
+        rng = np.random.default_rng((self.seed, self.epoch, worker_id))
+        _init_decode_worker(self.reduced_factor)
+        
+        # Bounded shuffle buffer: once full, each new sample evicts a random one
+        buffer = []
+        for session_path in sessions:
+            for sample in self._iter_session(session_path):
+                if len(buffer) < self.shuffle_buffer:
+                    buffer.append(sample)
+                    continue
+                i = rng.integers(len(buffer))
+                buffer[i], sample = sample, buffer[i]
+                yield self._to_tensors(sample)
+        
+        rng.shuffle(buffer)
+        for sample in buffer:
+            yield self._to_tensors(sample)
+
+    @staticmethod
+    def _to_tensors(sample):
+        np_stack, action = sample
+        return torch.from_numpy(np_stack), torch.tensor(action, dtype=torch.long)
+
+
+def collate_batch(batch):
+    """collate_fn for BenjiBCDataset.__getitems__: the batch is already stacked."""
+    return batch
+
+
+def build_frame_store(data_dir="data/raw", store_dir="data/processed",
+                      num_workers=None, reduced_decode=False):
+    """
+    One-time converter: decodes and preprocesses every session under data_dir
+    and writes all frames into a single contiguous (N, 128, 128) uint8 .npy,
+    plus a small index (session names/offsets, actions, frame ids).
+    
+    Open the result with BenjiBCDataset(store_dir=store_dir).
+    """
+    session_dirs = sorted(glob.glob(os.path.join(data_dir, "session_*")))
+    sessions = [(os.path.basename(p), read_session(p)) for p in session_dirs]
+    sessions = [(name, data) for name, data in sessions if data]
+    
+    total = sum(len(data) for _, data in sessions)
+    print(f"Packing {total} frames from {len(sessions)} sessions into {store_dir}...")
+    
+    os.makedirs(store_dir, exist_ok=True)
+    frames_path = os.path.join(store_dir, STORE_FRAMES_FILE)
+    index_path = os.path.join(store_dir, STORE_INDEX_FILE)
+    
+    # Write through a memmap so the whole corpus never sits in RAM
+    frames = np.lib.format.open_memmap(frames_path, mode='w+', dtype=np.uint8, shape=(total, 128, 128))
+    
+    offsets = [0]
+    positions, img_paths, videos = [], [], []
+    actions = np.zeros(total, dtype=np.uint8)
+    frame_ids = np.zeros(total, dtype=np.int32)
+    
+    for name, session_data in sessions:
+        offset = offsets[-1]
+        for k, entry in enumerate(session_data):
+            actions[offset + k] = entry['action']
+            frame_ids[offset + k] = entry['frame_id']
+        
+        if session_data[0]['img_path'] is None:
+            videos.append((offset, session_data[0]['video_path'],
+                           [entry['video_index'] for entry in session_data]))
+        else:
+            positions.extend(range(offset, offset + len(session_data)))
+            img_paths.extend(entry['img_path'] for entry in session_data)
+        offsets.append(offset + len(session_data))
+        print(f"  {name}: {len(session_data)} frames")
+    
+    decode_into(frames, positions, img_paths, videos, num_workers, reduced_decode)
+    
+    frames.flush()
+    del frames
+    
+    np.savez(index_path,
+             session_names=np.array([name for name, _ in sessions]),
+             session_offsets=np.array(offsets, dtype=np.int64),
+             actions=actions,
+             frame_ids=frame_ids)
+    
+    print(f"Saved {frames_path} ({total * 128 * 128 / 1e6:.1f} MB) and {index_path}")
+    return store_dir
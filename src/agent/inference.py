@@ -0,0 +1,145 @@
+import json
+import time
+import logging
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from agent.pipeline import LatencyStats
+
+logger = logging.getLogger(__name__)
+
+# Stored next to the TorchScript graph in the exported file
+META_FILE = "benji_policy.json"
+
+
+class ExportedPolicy(nn.Module):
+    """
+    Deterministic PPO actor as one plain module: uint8 frame stack in, action out.
+
+    The observation pipeline SB3 runs before the network is folded in as
+    constants:
+    - VecNormalize: (obs - mean) / sqrt(var + eps), clipped to +-clip_obs
+    - normalize_images: / 255, only when the policy still sees a uint8 image
+      space (VecNormalize turns it into a float Box, and SB3 then skips it)
+    Both are affine up to the clip, so they become one multiply-add (any
+    /255 inside the scale and the clip bounds) ahead of CustomCNN, the
+    actor MLP and the action head. Output is the argmax action (Discrete).
+    """
+    def __init__(self, policy, obs_rms=None, epsilon=1e-8, clip_obs=10.0):
+        super().__init__()
+        # Export time only: the runtime never imports stable-baselines3
+        from stable_baselines3.common.preprocessing import is_image_space
+        shape = tuple(policy.observation_space.shape)
+        divide = policy.normalize_images and is_image_space(policy.observation_space)
+        scale = 1.0 / 255.0 if divide else 1.0
+        if obs_rms is not None:
+            mean = torch.as_tensor(obs_rms.mean, dtype=torch.float32).reshape(shape)
+            inv_std = 1.0 / torch.sqrt(torch.as_tensor(obs_rms.var, dtype=torch.float32).reshape(shape) + epsilon)
+            clip = clip_obs * scale
+        else:
+            mean = torch.zeros(shape)
+            inv_std = torch.ones(shape)
+            clip = float("inf")
+        self.register_buffer("mean", mean)
+        self.register_buffer("scale", inv_std * scale)
+        self.clip = clip
+
+        self.features_extractor = policy.features_extractor
+        self.mlp_extractor = policy.mlp_extractor
+        self.action_net = policy.action_net
+
+    def forward(self, obs: torch.Tensor) -> torch.Tensor:
+        x = (obs.float() - self.mean) * self.scale
+        x = x.clamp(-self.clip, self.clip)
+        latent = self.mlp_extractor.forward_actor(self.features_extractor(x))
+        return self.action_net(latent).argmax(dim=1)
+
+
+def export_policy(model, path, venv=None, n_stack=4):
+    """
+    Traces model.policy (SB3 PPO, Discrete actions) with venv's VecNormalize
+    statistics folded in and saves it as TorchScript. The file also carries
+    the observation shape and stack size the runtime needs.
+    """
+    obs_rms = epsilon = clip_obs = None
+    if venv is not None and getattr(venv, "norm_obs", False):
+        obs_rms, epsilon, clip_obs = venv.obs_rms, venv.epsilon, venv.clip_obs
+    module = ExportedPolicy(model.policy, obs_rms, epsilon or 1e-8, clip_obs or 10.0).cpu().eval()
+
+    shape = tuple(model.policy.observation_space.shape)
+    example = torch.zeros((1, *shape), dtype=torch.uint8)
+    with torch.inference_mode():
+        traced = torch.jit.trace(module, example)
+        traced = torch.jit.freeze(traced)
+    meta = {"obs_shape": list(shape), "n_stack": n_stack, "normalized": obs_rms is not None}
+    torch.jit.save(traced, path, _extra_files={META_FILE: json.dumps(meta)})
+    return meta
+
+
+class PolicyRuntime:
+    """
+    Minimal player for an exported policy: loads only the TorchScript file
+    (no stable-baselines3, no PPO/VecNormalize objects) and runs it on a
+    preallocated (1, n_stack, H, W) uint8 input.
+
+    Frame stacking follows VecFrameStack: zeros after a reset, newest frame
+    last. act(frame) takes the env's raw (1, H, W) observation.
+    """
+    def __init__(self, path, num_threads=None):
+        t0 = time.perf_counter()
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        extra = {META_FILE: ""}
+        self.module = torch.jit.load(path, map_location="cpu", _extra_files=extra)
+        self.module.eval()
+        meta = json.loads(extra[META_FILE] or "{}")
+        self.obs_shape = tuple(meta.get("obs_shape", (4, 128, 128)))
+        self.n_stack = meta.get("n_stack", 4)
+        self.frame_channels = self.obs_shape[0] // self.n_stack
+
+        # One buffer, shared between numpy (frame stacking) and torch (input)
+        self._input = torch.zeros((1, *self.obs_shape), dtype=torch.uint8)
+        self._stack = self._input.numpy()[0]
+        self.stats = LatencyStats()
+        self.load_time = time.perf_counter() - t0
+
+        # First calls build the optimized graph
+        t0 = time.perf_counter()
+        for _ in range(2):
+            self._run()
+        self.warmup_time = time.perf_counter() - t0
+
+    def _run(self):
+        with torch.inference_mode():
+            return int(self.module(self._input)[0])
+
+    def reset(self, frame=None):
+        self._stack[:] = 0
+        if frame is not None:
+            self._push(frame)
+
+    def _push(self, frame):
+        c = self.frame_channels
+        self._stack[:-c] = self._stack[c:]
+        self._stack[-c:] = frame
+
+    def act(self, frame) -> int:
+        """Pushes frame onto the stack and returns the action for the new stack."""
+        self._push(frame)
+        return self.predict()
+
+    def predict(self, obs=None) -> int:
+        """Action for the current stack, or for a full (n_stack * C, H, W) obs."""
+        if obs is not None:
+            self._stack[:] = np.asarray(obs).reshape(self.obs_shape)
+        t0 = time.perf_counter()
+        action = self._run()
+        self.stats.record("inference", time.perf_counter() - t0)
+        return action
+
+    def report(self, startup=None):
+        print(f"\nPolicy load: {self.load_time * 1000:.1f} ms | warmup: {self.warmup_time * 1000:.1f} ms"
+              + (f" | process startup to first action: {startup:.2f} s" if startup is not None else ""))
+        self.stats.report("EXPORTED POLICY LATENCY")
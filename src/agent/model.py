@@ -1,15 +1,17 @@
 from stable_baselines3 import PPO
-from stable_baselines3.common.vec_env import VecFrameStack, DummyVecEnv, VecNormalize
+from stable_baselines3.common.vec_env import VecFrameStack, DummyVecEnv, SubprocVecEnv, VecNormalize
 from stable_baselines3.common.callbacks import CheckpointCallback
 from stable_baselines3.common.torch_layers import BaseFeaturesExtractor
 import torch
 import torch.nn as nn
 import gymnasium as gym
-from typing import Optional
+from typing import List, Optional
 import os
 
 from env.benji_env import BenjiBananasEnv
-from agent.callbacks import TensorboardCallback, PauseCallback
+from env.surrogate_sim import make_sim_venv
+from env.async_reward import AsyncRewardWrapper
+from agent.callbacks import TensorboardCallback, PauseCallback, DelayedRewardCallback
 
 from stable_baselines3.common.monitor import Monitor
 
@@ -52,6 +54,21 @@ class CustomCNN(BaseFeaturesExtractor):
     def forward(self, observations: torch.Tensor) -> torch.Tensor:
         return self.linear(self.cnn(observations))
 
+def make_device_env(serial: str, offline: bool = False, async_reward: bool = False):
+    """
+    Env factory for one device, for SubprocVecEnv.
+    adb and scrcpy both pick the device from ANDROID_SERIAL, so setting it
+    inside the worker process pins that worker's ScrcpyClient/controls to
+    its own device/emulator.
+    """
+    def _init():
+        os.environ["ANDROID_SERIAL"] = serial
+        env = BenjiBananasEnv(offline=offline)
+        if async_reward:
+            env = AsyncRewardWrapper(env)
+        return Monitor(env)
+    return _init
+
 class BenjiAgent:
     """
     Wrapper for the PPO agent trained on Benji Bananas.
@@ -61,17 +78,39 @@ class BenjiAgent:
                  model_path: Optional[str] = None, 
                  tensorboard_log: str = "./logs/",
                  offline: bool = False,
-                 learning_rate: float = 2.5e-4):
+                 learning_rate: float = 2.5e-4,
+                 sim_envs: int = 0,
+                 serials: Optional[List[str]] = None,
+                 async_reward: bool = False):
 
         
         # 1. Setup Environment
         # We need to wrap the raw Env to handle Frame Stacking (4 frames)
         # We also need Monitor to track Episode Stats for Tensorboard.
-        self.env = BenjiBananasEnv(offline=offline)
-        self.env = Monitor(self.env) # Add Monitor Wrapper
+        # Async reward: OCR runs on a worker thread, late rewards are credited
+        # to the right step by DelayedRewardCallback (sim has no OCR)
+        self.async_reward = async_reward and sim_envs == 0
         
-        self.venv = DummyVecEnv([lambda: self.env])
-        self.venv = VecFrameStack(self.venv, n_stack=4)
+        if sim_envs > 0:
+            # Surrogate simulator (pretraining, no device): already batched and
+            # reports episode stats itself, just needs the same frame stacking.
+            self.env = None
+            self.venv = make_sim_venv(num_envs=sim_envs)
+        elif serials:
+            # One env per device, each in its own process (own ScrcpyClient,
+            # capture and OCR), so they step in parallel.
+            print(f"Using {len(serials)} devices: {', '.join(serials)}")
+            self.env = None
+            self.venv = SubprocVecEnv([make_device_env(s, offline, self.async_reward) for s in serials])
+            self.venv = VecFrameStack(self.venv, n_stack=4)
+        else:
+            self.env = BenjiBananasEnv(offline=offline)
+            if self.async_reward:
+                self.env = AsyncRewardWrapper(self.env)
+            self.env = Monitor(self.env) # Add Monitor Wrapper
+            
+            self.venv = DummyVecEnv([lambda: self.env])
+            self.venv = VecFrameStack(self.venv, n_stack=4)
         
 
         # Handle VecNormalize Loading/Creation
@@ -116,7 +155,15 @@ class BenjiAgent:
             }
         }
 
-        print("Initializing PPO Agent with optimized hyperparameters (n_steps=512, ent_coef=0.05)...")
+        if sim_envs > 0:
+            # Hundreds of envs: keep the rollout (n_steps * n_envs) around 8k samples
+            ppo_kwargs["n_steps"] = max(16, 8192 // sim_envs)
+            ppo_kwargs["batch_size"] = 512
+        elif serials and len(serials) > 1:
+            # Keep the same rollout size per update; more devices just fill it faster
+            ppo_kwargs["n_steps"] = max(64, 512 // len(serials))
+
+        print(f"Initializing PPO Agent with optimized hyperparameters (n_steps={ppo_kwargs['n_steps']}, ent_coef=0.05)...")
         self.model = PPO(**ppo_kwargs)
         
         if model_path and os.path.exists(model_path):
@@ -158,6 +205,10 @@ class BenjiAgent:
         # Combine callbacks
         callbacks = [checkpoint_callback, tb_callback, pause_callback]
         
+        # 4. Late rewards from the async OCR worker
+        if self.async_reward:
+            callbacks.append(DelayedRewardCallback())
+        
         # Force a new PPO_N directory even if continuing
         tb_log_name = "PPO"
         if self.model.tensorboard_log and os.path.exists(self.model.tensorboard_log):
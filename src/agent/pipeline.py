@@ -0,0 +1,134 @@
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyStats:
+    """Collects per-step timings (seconds) and summarizes them in ms."""
+    def __init__(self):
+        self.samples = {}
+
+    def record(self, name, seconds):
+        self.samples.setdefault(name, []).append(seconds)
+
+    def summary(self):
+        out = {}
+        for name, values in self.samples.items():
+            ms = np.array(values) * 1000
+            out[name] = {"mean": float(ms.mean()), "p95": float(np.percentile(ms, 95)), "max": float(ms.max())}
+        return out
+
+    def report(self, title):
+        print(f"\n--- {title} ---")
+        for name, s in self.summary().items():
+            print(f"{name:<14} mean {s['mean']:7.2f} ms | p95 {s['p95']:7.2f} ms | max {s['max']:7.2f} ms")
+
+
+class PolicyRunner:
+    """
+    Drives a VecEnv with a policy, serial or pipelined.
+
+    Serial: predict(obs_t) -> env.step(a_t) -> obs_t+1, back to back, so
+    the loop period is inference + control + capture + preprocessing + OCR.
+
+    Pipelined: env.step (capture, preprocessing, reward OCR) runs on a worker
+    thread while the main thread runs the policy on the newest observation.
+    The loop period drops to max(step, inference); the price is that the
+    action sent with each step was decided from the previous observation
+    (one step of action delay). Torch and OpenCV release the GIL, so the
+    two really overlap.
+
+    Timings (LatencyStats):
+    - inference: model.predict
+    - env_step: env.step
+    - decision: observation returned by the env -> its action sent to the env
+    - loop: interval between consecutive env steps
+    """
+    def __init__(self, model, env, pipelined=False, deterministic=True):
+        self.model = model
+        self.env = env
+        self.pipelined = pipelined
+        self.deterministic = deterministic
+        self.stats = LatencyStats()
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="env-step") if pipelined else None
+        self._future = None
+        self._obs = None
+        self._obs_time = 0.0
+        self._action = None # Pipelined: next action, decided from self._obs
+        self._last_submit = None
+
+    def _predict(self, obs):
+        t0 = time.perf_counter()
+        action, _ = self.model.predict(obs, deterministic=self.deterministic)
+        self.stats.record("inference", time.perf_counter() - t0)
+        return action
+
+    def _timed_step(self, action):
+        t0 = time.perf_counter()
+        result = self.env.step(action)
+        self.stats.record("env_step", time.perf_counter() - t0)
+        return result
+
+    def _submit(self, action, obs_time):
+        now = time.perf_counter()
+        self.stats.record("decision", now - obs_time)
+        if self._last_submit is not None:
+            self.stats.record("loop", now - self._last_submit)
+        self._last_submit = now
+        if self.pipelined:
+            self._future = self._executor.submit(self._timed_step, action)
+            return None
+        return self._timed_step(action)
+
+    def reset(self):
+        self._wait_pending()
+        self._obs = self.env.reset()
+        self._obs_time = time.perf_counter()
+        self._last_submit = None
+        if self.pipelined:
+            # Nothing to overlap with yet: first action is decided synchronously
+            self._action = self._predict(self._obs)
+            self._submit(self._action, self._obs_time)
+        return self._obs
+
+    def step(self):
+        """Advances one env step; returns (obs, rewards, dones, infos) of that step."""
+        if not self.pipelined:
+            action = self._predict(self._obs)
+            obs, rewards, dones, infos = self._submit(action, self._obs_time)
+            self._obs, self._obs_time = obs, time.perf_counter()
+            return obs, rewards, dones, infos
+
+        # Action decided (in the background of this step) from the obs before it
+        obs, rewards, dones, infos = self._future.result()
+        decided_from = self._obs_time
+        self._obs, self._obs_time = obs, time.perf_counter()
+
+        if dones.any():
+            # obs is the first frame of a new episode: don't carry a stale
+            # action across the reset
+            self._action = self._predict(obs)
+            decided_from = self._obs_time
+        self._submit(self._action, decided_from)
+
+        # Overlaps with the step just submitted
+        self._action = self._predict(obs)
+        return obs, rewards, dones, infos
+
+    def _wait_pending(self):
+        if self._future is not None:
+            try:
+                self._future.result()
+            except Exception as e:
+                logger.warning(f"Pending env step failed: {e}")
+            self._future = None
+
+    def close(self):
+        self._wait_pending()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
@@ -3,6 +3,8 @@ import sys
 import time
 import cv2
 import csv
+import json
+import threading
 from datetime import datetime
 from pynput import mouse
 
@@ -10,10 +12,21 @@ from pynput import mouse
 sys.path.append(os.path.join(os.path.dirname(__file__), '../'))
 
 from env.scrcpy_client import ScrcpyClient
+from data.frame_writer import AsyncFrameWriter, VideoFrameWriter
+from data.pacing import DeadlinePacer
 
 class DataCollector:
-    def __init__(self, fps_limit=30):
+    def __init__(self, fps_limit=30, record_mode="jpeg", headless=False, preview_fps=10):
+        """
+        record_mode: "jpeg" writes frames/frame_XXXXXX.jpg,
+        "video" writes one lossless frames.mkv plus a frames_index.csv sidecar.
+        headless: no preview window, only a status line.
+        preview_fps: rate of the preview, which runs off the capture thread.
+        """
         self.fps_limit = fps_limit
+        self.record_mode = record_mode
+        self.headless = headless
+        self.preview_fps = preview_fps
         self.is_recording = False
         self.is_holding = False
         self.was_holding = False # Track previous state for edge detection
@@ -22,15 +35,26 @@ class DataCollector:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.session_dir = os.path.join("data", "raw", f"session_{timestamp}")
         self.frames_dir = os.path.join(self.session_dir, "frames")
-        os.makedirs(self.frames_dir, exist_ok=True)
+        os.makedirs(self.session_dir, exist_ok=True)
         
         self.csv_path = os.path.join(self.session_dir, "actions.csv")
+        self.meta_path = os.path.join(self.session_dir, "session.json")
         
         # Setup Scrcpy
         self.client = ScrcpyClient(max_width=800)
         
         # Action Queue for synchronization
         self.frame_count = 0
+        self.pacer = DeadlinePacer(fps_limit)
+        self._latest = None # (frame, action, frame_id) for the preview thread
+        self._capture_thread = None
+        self._stopped = False
+        
+        # Disk writes happen on background threads, never in the capture loop
+        if record_mode == "video":
+            self.writer = VideoFrameWriter(self.session_dir, fps=fps_limit)
+        else:
+            self.writer = AsyncFrameWriter(self.frames_dir)
         
         # Mouse Listener
         self.mouse_listener = mouse.Listener(
@@ -48,9 +72,9 @@ class DataCollector:
             # Async command handling is in main loop
 
     def start(self):
-        print(f"Starting Data Collector...")
+        print("Starting Data Collector...")
         print(f"Saving to: {self.session_dir}")
-        print("Controls: LEFT CLICK to Swing (Hold). Close window or Ctrl+C to stop.")
+        print("Controls: LEFT CLICK to Swing (Hold). Close window, 'q' or Ctrl+C to stop.")
         
         self.client.start()
         # Wait for video
@@ -59,82 +83,154 @@ class DataCollector:
         self.mouse_listener.start()
         
         self.is_recording = True
+        self.start_time = datetime.now().isoformat()
+        
+        # Capture runs on its own thread at a fixed rate; the preview
+        # (main thread, HighGUI-safe) only samples the latest frame.
+        self._capture_thread = threading.Thread(target=self._capture_loop, name="capture", daemon=True)
+        self._capture_thread.start()
+        
+        try:
+            self._preview_loop()
+        except KeyboardInterrupt:
+            print("\nStopping recording...")
+        finally:
+            self.stop()
+
+    def _capture_loop(self):
+        """Grab frame, record action, enqueue - nothing else on this thread."""
+        # CSV timestamps are wall-clock, derived from the monotonic pacing clock
+        wall_anchor = time.time()
+        mono_anchor = time.perf_counter()
         
-        # Open CSV
         with open(self.csv_path, 'w', newline='') as f:
             writer = csv.writer(f)
             writer.writerow(["frame_id", "action", "timestamp", "reward"])
             
-            last_time = time.time()
-            frame_interval = 1.0 / self.fps_limit
-            
-            try:
-                while self.is_recording:
-                    current_time = time.time()
-                    
-                    if current_time - last_time >= frame_interval:
-                        # 1. Capture Frame
-                        frame = self.client.get_frame()
-                        
-                        if frame is not None:
-                            # 2. Get Action State
-                            action = 1 if self.is_holding else 0
-                            
-                            # 3. Send Action to Device (Feedback)
-                            if action == 1:
-                                    # Start Asynchronous Swipe if not already holding
-                                    if not self.was_holding:
-                                        # Use client method (handles scaling)
-                                        self.client.start_async_hold(self.TOUCH_X, self.TOUCH_Y)
-                            
-                            elif self.was_holding and action == 0:
-                                # Release Logic: Kill the swipe
-                                self.client.stop_async_hold(self.TOUCH_X, self.TOUCH_Y)
-                            
-                            self.was_holding = (action == 1) 
+            while self.is_recording:
+                tick = self.pacer.wait()
+                current_time = wall_anchor + (tick - mono_anchor)
+                
+                # 1. Capture Frame
+                frame = self.client.get_frame()
+                
+                if frame is None:
+                    print("Warning: No frame received")
+                    time.sleep(0.1)
+                    continue
+                
+                # 2. Get Action State
+                action = 1 if self.is_holding else 0
+                
+                # 3. Send Action to Device (Feedback)
+                if action == 1:
+                    # Start Asynchronous Swipe if not already holding
+                    if not self.was_holding:
+                        # Use client method (handles scaling)
+                        self.client.start_async_hold(self.TOUCH_X, self.TOUCH_Y)
+                
+                elif self.was_holding and action == 0:
+                    # Release Logic: Kill the swipe
+                    self.client.stop_async_hold(self.TOUCH_X, self.TOUCH_Y)
+                
+                self.was_holding = (action == 1)
+                
+                # 4. Save Data
+                # Enqueue frame (Raw); a full queue drops it rather than blocking
+                self.writer.submit(self.frame_count, frame, current_time)
+                
+                # Log action
+                # Reward is 0 for now (calculated offline or in Phase 3)
+                writer.writerow([self.frame_count, action, current_time, 0])
+                
+                self._latest = (frame, action, self.frame_count)
+                self.frame_count += 1
 
-                            # 4. Save Data
-                            frame_filename = f"frame_{self.frame_count:06d}.jpg"
-                            frame_path = os.path.join(self.frames_dir, frame_filename)
-                            
-                            # Save frame (Raw)
-                            cv2.imwrite(frame_path, frame)
-                            
-                            # Log action
-                            # Reward is 0 for now (calculated offline or in Phase 3)
-                            writer.writerow([self.frame_count, action, current_time, 0])
-                            
-                            # 5. Visualization
-                            # Show "Recording" indicator
-                            display_frame = frame.copy()
-                            color = (0, 0, 255) if action == 1 else (0, 255, 0)
-                            text = "HOLD" if action == 1 else "RELEASE"
-                            cv2.putText(display_frame, f"REC: {self.frame_count} | {text}", 
-                                      (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
-                            cv2.circle(display_frame, (self.TOUCH_X, self.TOUCH_Y), 10, color, -1)
-                            
-                            cv2.imshow("Data Collector preview", display_frame)
-                            if cv2.waitKey(1) & 0xFF == ord('q'):
-                                break
-                            
-                            self.frame_count += 1
-                            last_time = current_time
-                        else:
-                            print("Warning: No frame received")
-                            time.sleep(0.1)
-                            
-            except KeyboardInterrupt:
-                print("\nStopping recording...")
-            finally:
-                self.stop()
+    def _preview_loop(self):
+        """Draws the preview at preview_fps until recording stops."""
+        interval = 1.0 / self.preview_fps
+        while self.is_recording and self._capture_thread.is_alive():
+            time.sleep(interval)
+            latest = self._latest
+            if latest is None:
+                continue
+            frame, action, frame_id = latest
+            text = "HOLD" if action == 1 else "RELEASE"
+            
+            if self.headless:
+                stats = self.pacer.stats()
+                print(f"REC: {frame_id} | {text} | jitter {stats['jitter_mean_ms']:.1f} ms | "
+                      f"missed {stats['missed_deadlines']} | dropped {self.writer.dropped}", end='\r')
+                continue
+            
+            # Show "Recording" indicator
+            display_frame = frame.copy()
+            color = (0, 0, 255) if action == 1 else (0, 255, 0)
+            cv2.putText(display_frame, f"REC: {frame_id} | {text}",
+                        (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+            cv2.circle(display_frame, (self.TOUCH_X, self.TOUCH_Y), 10, color, -1)
+            
+            cv2.imshow("Data Collector preview", display_frame)
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
 
     def stop(self):
+        if self._stopped:
+            return
+        self._stopped = True
         self.is_recording = False
+        client_stopped = False
+        if self._capture_thread is not None:
+            # Normally exits within one tick; if it is stuck in get_frame(),
+            # stopping the client makes the blocked read return
+            self._capture_thread.join(timeout=1.0)
+            if self._capture_thread.is_alive():
+                self.client.stop()
+                client_stopped = True
+                self._capture_thread.join(timeout=2.0)
+                if self._capture_thread.is_alive():
+                    print("Warning: capture thread did not exit, saving what was recorded so far")
         self.mouse_listener.stop()
-        self.client.stop()
-        cv2.destroyAllWindows()
-        print(f"Session saved. Total frames: {self.frame_count}")
+        if not client_stopped:
+            self.client.stop()
+        if not self.headless:
+            cv2.destroyAllWindows()
+        
+        print("\nFlushing frame writer...")
+        self.writer.close()
+        self._write_metadata()
+        
+        stats = self.pacer.stats()
+        print(f"Session saved. Total frames: {self.frame_count} | Written: {self.writer.written} | "
+              f"Dropped: {self.writer.dropped} | Failed: {self.writer.failed}")
+        print(f"Timing: jitter {stats['jitter_mean_ms']:.2f} +/- {stats['jitter_std_ms']:.2f} ms "
+              f"(max {stats['jitter_max_ms']:.1f}) | Missed deadlines: {stats['missed_deadlines']} | "
+              f"Late: {stats['late_ticks']}")
+
+    def _write_metadata(self):
+        """Session summary next to actions.csv (capture timing, writer stats)."""
+        meta = {
+            "start_time": getattr(self, "start_time", None),
+            "record_mode": self.record_mode,
+            "fps_limit": self.fps_limit,
+            "frame_count": self.frame_count,
+            "frames_written": self.writer.written,
+            "frames_dropped": self.writer.dropped,
+            "frames_failed": self.writer.failed,
+            "timing": self.pacer.stats(),
+        }
+        with open(self.meta_path, 'w') as f:
+            json.dump(meta, f, indent=2)
 
 if __name__ == "__main__":
-    collector = DataCollector()
+    import argparse
+    parser = argparse.ArgumentParser(description="Record expert gameplay")
+    parser.add_argument("--fps", type=int, default=30, help="Capture rate")
+    parser.add_argument("--video", action="store_true", help="Record a single lossless video instead of JPEG frames")
+    parser.add_argument("--headless", action="store_true", help="No preview window, status line only")
+    parser.add_argument("--preview_fps", type=int, default=10, help="Preview refresh rate")
+    args = parser.parse_args()
+    
+    collector = DataCollector(fps_limit=args.fps, record_mode="video" if args.video else "jpeg",
+                              headless=args.headless, preview_fps=args.preview_fps)
     collector.start()
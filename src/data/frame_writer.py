@@ -0,0 +1,199 @@
+import os
+import csv
+import queue
+import threading
+import logging
+
+import cv2
+
+logger = logging.getLogger(__name__)
+
+
+def _keepable(frame):
+    """
+    frame itself if the writer may hold on to it, else a copy. Views that
+    own no data or are read-only (e.g. FrameRingReader frames, whose slot
+    is refilled a few frames later) are borrowed, so they are copied.
+    """
+    if frame.flags.owndata and frame.flags.writeable:
+        return frame
+    return frame.copy()
+
+
+class AsyncFrameWriter:
+    """
+    Writes frames to disk off the capture thread.
+    
+    submit() only enqueues; a small pool of writer threads drains a bounded
+    queue with cv2.imwrite (which releases the GIL while encoding). If the
+    queue is full the frame is dropped and counted instead of stalling
+    capture. close() flushes everything still queued.
+    
+    Arrays that own their data are queued as is and must not be modified
+    afterwards by the caller; borrowed ones (views, read-only ring frames)
+    are copied on submit.
+    """
+    def __init__(self, frames_dir, max_queue=128, num_threads=2):
+        self.frames_dir = frames_dir
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+        
+        os.makedirs(frames_dir, exist_ok=True)
+        self._threads = [
+            threading.Thread(target=self._run, name=f"frame-writer-{i}", daemon=True)
+            for i in range(num_threads)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def frame_path(self, frame_id):
+        return os.path.join(self.frames_dir, f"frame_{frame_id:06d}.jpg")
+
+    def submit(self, frame_id, frame, timestamp=0.0):
+        """Queues a frame for writing. Returns False if it had to be dropped."""
+        try:
+            self.queue.put_nowait((frame_id, _keepable(frame)))
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                self.queue.task_done()
+                return
+            frame_id, frame = item
+            ok = cv2.imwrite(self.frame_path(frame_id), frame)
+            with self._lock:
+                if ok:
+                    self.written += 1
+                else:
+                    self.failed += 1
+            if not ok:
+                logger.warning(f"Failed to write frame {frame_id}")
+            self.queue.task_done()
+
+    def close(self):
+        """Blocks until every queued frame is on disk, then stops the threads."""
+        for _ in self._threads:
+            self.queue.put(None) # Sentinels queue up behind pending frames
+        for t in self._threads:
+            t.join()
+
+
+# Video session layout (see VideoFrameWriter)
+VIDEO_FILE = "frames.mkv"
+VIDEO_INDEX_FILE = "frames_index.csv"
+
+
+class VideoFrameWriter:
+    """
+    Records a session as a single lossless FFV1 video instead of one JPEG
+    per frame, with a sidecar CSV (frame_id, video_index, timestamp) that
+    aligns video frames with actions.csv rows.
+    
+    Same interface as AsyncFrameWriter: submit() enqueues, one encoder
+    thread appends to the video in order, close() flushes and finalizes.
+    Dropped frames are simply absent from the sidecar. Same frame ownership
+    contract as AsyncFrameWriter.submit.
+    """
+    def __init__(self, session_dir, fps=30, max_queue=128, fourcc="FFV1"):
+        self.video_path = os.path.join(session_dir, VIDEO_FILE)
+        self.index_path = os.path.join(session_dir, VIDEO_INDEX_FILE)
+        self.fps = fps
+        self.fourcc = fourcc
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+        self._video = None # Opened on the first frame, once the size is known
+        
+        os.makedirs(session_dir, exist_ok=True)
+        self._index_file = open(self.index_path, 'w', newline='')
+        self._index_writer = csv.writer(self._index_file)
+        self._index_writer.writerow(["frame_id", "video_index", "timestamp"])
+        
+        self._thread = threading.Thread(target=self._run, name="video-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, frame_id, frame, timestamp=0.0):
+        """Queues a frame for encoding. Returns False if it had to be dropped."""
+        try:
+            self.queue.put_nowait((frame_id, _keepable(frame), timestamp))
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+    def _open(self, frame):
+        h, w = frame.shape[:2]
+        self._video = cv2.VideoWriter(self.video_path, cv2.VideoWriter_fourcc(*self.fourcc),
+                                      self.fps, (w, h))
+        if not self._video.isOpened():
+            logger.error(f"Could not open {self.fourcc} video writer for {self.video_path}")
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                self.queue.task_done()
+                return
+            frame_id, frame, timestamp = item
+            if self._video is None:
+                self._open(frame)
+            if self._video.isOpened():
+                self._video.write(frame)
+                self._index_writer.writerow([frame_id, self.written, timestamp])
+                with self._lock:
+                    self.written += 1
+            else:
+                with self._lock:
+                    self.failed += 1
+            self.queue.task_done()
+
+    def close(self):
+        """Blocks until every queued frame is encoded, then finalizes the files."""
+        if self._index_file.closed:
+            return
+        self.queue.put(None)
+        self._thread.join()
+        if self._video is not None:
+            self._video.release()
+        self._index_file.close()
+
+
+def read_video_index(session_path):
+    """Returns {frame_id: video_index} for a video session, or None for JPEG sessions."""
+    index_path = os.path.join(session_path, VIDEO_INDEX_FILE)
+    if not os.path.exists(index_path) or not os.path.exists(os.path.join(session_path, VIDEO_FILE)):
+        return None
+    with open(index_path, 'r') as f:
+        return {int(row['frame_id']): int(row['video_index']) for row in csv.DictReader(f)}
+
+
+def iter_video_frames(video_path, video_indices):
+    """
+    Decodes a session video sequentially, yielding the BGR frames at the
+    given (increasing) video_indices. Frames in between are grabbed but not
+    converted. Yields None for frames past the end of a truncated video.
+    """
+    cap = cv2.VideoCapture(video_path)
+    pos = 0
+    try:
+        for target in video_indices:
+            while pos < target:
+                cap.grab()
+                pos += 1
+            ok, frame = cap.read()
+            pos += 1
+            yield frame if ok else None
+    finally:
+        cap.release()
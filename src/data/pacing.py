@@ -0,0 +1,66 @@
+import time
+import math
+
+
+class DeadlinePacer:
+    """
+    Fixed-rate scheduler on a monotonic clock.
+    
+    wait() sleeps until the next deadline (start + n * interval) instead of
+    busy-polling, so timestamps stay on a regular grid and the loop costs no
+    CPU while idle. If a tick runs later than a full interval, the deadlines
+    it overran are counted as missed and skipped (no catch-up burst).
+    """
+    def __init__(self, fps):
+        self.interval = 1.0 / fps
+        self.next_deadline = None
+        self.ticks = 0
+        self.missed = 0 # Deadlines skipped entirely
+        self.late = 0 # Ticks served more than half an interval after their deadline
+        
+        # Running jitter stats (seconds), constant memory
+        self._jitter_sum = 0.0
+        self._jitter_sq_sum = 0.0
+        self._jitter_max = 0.0
+
+    def wait(self):
+        """Blocks until the next deadline; returns the monotonic time it woke up."""
+        now = time.perf_counter()
+        if self.next_deadline is None:
+            self.next_deadline = now
+        
+        if now < self.next_deadline:
+            time.sleep(self.next_deadline - now)
+            now = time.perf_counter()
+        
+        jitter = now - self.next_deadline
+        if jitter >= self.interval:
+            skipped = int(jitter // self.interval)
+            self.missed += skipped
+            self.next_deadline += skipped * self.interval
+            jitter = now - self.next_deadline
+        if jitter > 0.5 * self.interval:
+            self.late += 1
+        
+        self.ticks += 1
+        self._jitter_sum += jitter
+        self._jitter_sq_sum += jitter * jitter
+        self._jitter_max = max(self._jitter_max, jitter)
+        
+        self.next_deadline += self.interval
+        return now
+
+    def stats(self):
+        """Timing summary suitable for session metadata."""
+        n = max(self.ticks, 1)
+        mean = self._jitter_sum / n
+        std = math.sqrt(max(self._jitter_sq_sum / n - mean * mean, 0.0))
+        return {
+            "target_fps": 1.0 / self.interval,
+            "ticks": self.ticks,
+            "missed_deadlines": self.missed,
+            "late_ticks": self.late,
+            "jitter_mean_ms": mean * 1000,
+            "jitter_std_ms": std * 1000,
+            "jitter_max_ms": self._jitter_max * 1000,
+        }
@@ -0,0 +1,155 @@
+import queue
+import logging
+import threading
+from typing import NamedTuple
+
+import gymnasium as gym
+
+logger = logging.getLogger(__name__)
+
+
+class RewardEvent(NamedTuple):
+    """Reward read from the frame captured at step `seq`."""
+    seq: int
+    reward: float
+    components: dict
+
+
+class AsyncRewardWorker:
+    """
+    Runs calculator.calculate(frame, done) on a background thread.
+
+    Every frame is processed, in submission order: the calculator's
+    per-frame terms (survival bonus, death penalty, ...) can't be recovered
+    from a later frame, so nothing is dropped. submit() only blocks the step
+    loop when max_queue frames are already waiting (counted in `stalls`).
+    Results come back as RewardEvents via poll()/flush().
+    """
+    def __init__(self, calculator, max_queue=4):
+        self.calculator = calculator
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._events = []
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._pending = 0
+        self.processed = 0
+        self.stalls = 0
+        self._thread = threading.Thread(target=self._run, name="async-reward", daemon=True)
+        self._thread.start()
+
+    def submit(self, seq, frame, done=False):
+        with self._lock:
+            self._pending += 1
+        item = (seq, frame, done)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            # Worker is max_queue frames behind: wait for it rather than lose a frame
+            self.stalls += 1
+            self._queue.put(item)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            seq, frame, done = item
+            try:
+                reward, components = self.calculator.calculate(frame, done)
+                event = RewardEvent(seq, float(reward), components)
+            except Exception as e:
+                logger.warning(f"Reward worker failed on frame {seq}: {e}")
+                event = None
+            with self._idle:
+                if event is not None:
+                    self._events.append(event)
+                self.processed += 1
+                self._pending -= 1
+                self._idle.notify_all()
+
+    def poll(self):
+        """Events finished so far (non-blocking)."""
+        with self._lock:
+            events, self._events = self._events, []
+        return events
+
+    def flush(self, timeout=5.0):
+        """Waits until every submitted frame is processed, then poll()s."""
+        with self._idle:
+            if not self._idle.wait_for(lambda: self._pending == 0, timeout):
+                logger.warning("Reward worker flush timed out")
+        return self.poll()
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=2.0)
+
+
+class _RewardProxy:
+    """Stands in for env.reward_calculator: queues the frame, returns no reward yet."""
+    def __init__(self, wrapper, calculator):
+        self._wrapper = wrapper
+        self._calculator = calculator
+
+    def calculate(self, frame, done):
+        # The capture buffer may be reused for the next frame
+        self._wrapper.worker.submit(self._wrapper.seq, frame.copy(), done)
+        return 0.0, {}
+
+    def __getattr__(self, name):
+        # ROIs, reset(), etc. still come from the real calculator
+        return getattr(self._calculator, name)
+
+
+class AsyncRewardWrapper(gym.Wrapper):
+    """
+    Moves BenjiReward OCR off the step critical path.
+
+    The env's reward_calculator is swapped for a proxy that hands each frame
+    (tagged with the step's sequence number) to an AsyncRewardWorker and
+    returns 0, so step() costs only capture + preprocessing. Finished events
+    are added to the reward of the step they arrive on, and reported with
+    their origin:
+    - info["reward_seq"]: this step's sequence number
+    - info["delayed_rewards"]: [(seq, reward)] for earlier steps that
+      finished since the last step (already included in this step's reward);
+      DelayedRewardCallback moves them back to their own rollout-buffer slot
+    - info["reward_components"]: from the newest event, when there is one
+
+    So everything downstream of the wrapper (Monitor episode returns,
+    VecNormalize's return statistics) sees every reward exactly once.
+    On episode end the worker is flushed, so every reward of the episode is
+    counted by its terminal step at the latest.
+    """
+    def __init__(self, env, max_queue=4):
+        super().__init__(env)
+        calculator = env.unwrapped.reward_calculator
+        self.worker = AsyncRewardWorker(calculator, max_queue=max_queue)
+        env.unwrapped.reward_calculator = _RewardProxy(self, calculator)
+        self.seq = 0
+
+    def reset(self, **kwargs):
+        # Stale events from the previous episode are discarded
+        self.worker.flush()
+        return self.env.reset(**kwargs)
+
+    def step(self, action):
+        self.seq += 1
+        obs, reward, terminated, truncated, info = self.env.step(action)
+
+        events = self.worker.flush() if (terminated or truncated) else self.worker.poll()
+        delayed = []
+        for event in events:
+            reward += event.reward
+            if event.seq != self.seq:
+                delayed.append((event.seq, event.reward))
+        if events:
+            # Newest counters read, for logging
+            info["reward_components"] = events[-1].components
+        info["reward_seq"] = self.seq
+        info["delayed_rewards"] = delayed
+        return obs, reward, terminated, truncated, info
+
+    def close(self):
+        self.worker.close()
+        return self.env.close()
@@ -0,0 +1,142 @@
+import os
+import stat
+import time
+import logging
+import threading
+from typing import Optional
+
+try:
+    import av
+except ImportError:
+    av = None
+
+from env.frame_ring import FrameRef
+
+logger = logging.getLogger(__name__)
+
+
+def scaled_size(width, height, max_width):
+    """
+    Output (w, h) for a width x height stream: unchanged up to max_width,
+    else same rule as scrcpy --max-size (keep aspect, even dimensions).
+    """
+    if not max_width or width <= max_width:
+        return width, height
+    return max_width, int(round(height * max_width / width / 2)) * 2
+
+
+class AVFrameSource:
+    """
+    In-process decoder backend (PyAV) as an alternative to the
+    FIFO -> ffmpeg subprocess -> raw pipe path.
+    
+    A daemon thread demuxes and decodes the stream inside this process and
+    converts each frame straight to a BGR ndarray (libswscale), so there is
+    no second process and no raw-frame pipe. Same get_frame() contract as
+    ScrcpyClient: newest BGR frame, or None if nothing decoded yet.
+    
+    `source` is the scrcpy recording FIFO or any local video file, so this
+    can be tested with no device attached. realtime=True paces file input
+    at its timestamps, like a live stream.
+    """
+    def __init__(self, source, max_width=800, realtime=False, container_format=None):
+        if av is None:
+            raise ImportError("PyAV is not installed: pip install av (or .[av])")
+        self.source = source
+        self.max_width = max_width
+        self.realtime = realtime
+        self.container_format = container_format
+        
+        self.latest_seq = -1
+        self.eof = False
+        self._frame = None
+        self._timestamp = 0.0
+        self._running = False
+        self._cond = threading.Condition()
+        self._thread = None
+        self._container = None
+
+    def _is_live(self):
+        """FIFO/pipe/device input (the scrcpy recording), as opposed to a regular file."""
+        try:
+            return not stat.S_ISREG(os.stat(self.source).st_mode)
+        except (OSError, TypeError, ValueError):
+            return True # URLs, pipe: protocols, file objects
+
+    def start(self):
+        options = {}
+        if self._is_live():
+            # Low-delay demux: don't buffer/probe ahead more than needed.
+            # Live input only: on regular files FFV1/mkv fails to open and H.264 decodes nothing
+            options = {"fflags": "nobuffer", "flags": "low_delay"}
+        self._container = av.open(self.source, format=self.container_format, options=options)
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="av-decoder", daemon=True)
+        self._thread.start()
+        return self
+
+    def _out_size(self, stream):
+        w, h = stream.codec_context.width, stream.codec_context.height
+        size = scaled_size(w, h, self.max_width)
+        return None if size == (w, h) else size
+
+    def _run(self):
+        try:
+            stream = self._container.streams.video[0]
+            size = self._out_size(stream)
+            start = time.perf_counter()
+            for frame in self._container.decode(stream):
+                if not self._running:
+                    break
+                if self.realtime and frame.time is not None:
+                    delay = start + frame.time - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                if size is None:
+                    img = frame.to_ndarray(format="bgr24")
+                else:
+                    img = frame.to_ndarray(format="bgr24", width=size[0], height=size[1])
+                with self._cond:
+                    # Fresh array per frame, so publishing is a reference swap
+                    self._frame = img
+                    self._timestamp = time.perf_counter()
+                    self.latest_seq += 1
+                    self._cond.notify_all()
+        except (av.error.FFmpegError, OSError) as e:
+            if self._running:
+                logger.warning(f"AV decoder stopped: {e}")
+        finally:
+            # The decode thread owns the container: it is only closed once
+            # decode() can no longer be running
+            self._container.close()
+            with self._cond:
+                self.eof = True
+                self._cond.notify_all()
+
+    def get_frame(self):
+        """Newest decoded BGR frame, or None."""
+        with self._cond:
+            return self._frame
+
+    def latest(self) -> Optional[FrameRef]:
+        with self._cond:
+            if self.latest_seq < 0:
+                return None
+            return FrameRef(self.latest_seq, self._timestamp, self._frame)
+
+    def wait_next(self, after_seq: int = -1, timeout: Optional[float] = None) -> Optional[FrameRef]:
+        """Same semantics as FrameRingReader.wait_next."""
+        with self._cond:
+            ready = self._cond.wait_for(lambda: self.latest_seq > after_seq or self.eof, timeout)
+            if not ready or self.latest_seq <= after_seq:
+                return None
+            return FrameRef(self.latest_seq, self._timestamp, self._frame)
+
+    def stop(self, timeout=1.0):
+        """Stops decoding; the decode thread closes the container on its way out."""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                logger.warning("AV decoder thread still blocked in decode(), container closes when it returns")
+            self._thread = None
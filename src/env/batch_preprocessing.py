@@ -0,0 +1,175 @@
+import logging
+from math import gcd
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class AreaDownscaler:
+    """
+    Integer reimplementation of cv2.resize(..., INTER_AREA) for one fixed
+    downscale (src_size -> dst_size, both (w, h)), from an integral image.
+
+    With the source split into groups of gx = W / gcd(W, w) columns (and
+    gy rows) per gcd-th of the output, every area weight is a multiple of
+    1 / (dst per group), so each output pixel is S / D for an integer box sum
+    S and D = gx * gy (25 * 7 = 175 for 800x448 -> 128x128). S comes from
+    four bilinear lookups into cv2.integral: the integral of a piecewise
+    constant image is exactly bilinear between pixel corners.
+
+    OpenCV computes the same value in float32 (error well below 1e-3 for
+    uint8), so when D is odd (no exact .5 ties) and small, rounding S / D
+    reproduces it bit for bit. `supported` is False otherwise; callers still
+    verify against the real resize (see BatchPreprocessor).
+    """
+    MAX_DENOMINATOR = 1000 # Ties S / D closer than 0.5 / D to .5 need the float path
+
+    def __init__(self, src_size: Tuple[int, int], dst_size: Tuple[int, int]):
+        (sw, sh), (dw, dh) = src_size, dst_size
+        self.src_size = src_size
+        self.dst_size = dst_size
+        gx, gy = sw // gcd(sw, dw), sh // gcd(sh, dh) # Source pixels per group
+        ux, uy = dw // gcd(sw, dw), dh // gcd(sh, dh) # Output pixels per group
+        self.denominator = gx * gy
+        # Integer scales take OpenCV's fast area path, which rounds differently
+        self.supported = (sw > dw and sh > dh and ux > 1 and uy > 1
+                          and self.denominator % 2 == 1 and self.denominator <= self.MAX_DENOMINATOR)
+
+        # Output cell edges in units of 1/u source pixels: pixel index + remainder
+        x0, xr = np.divmod(np.arange(dw + 1) * gx, ux)
+        y0, yr = np.divmod(np.arange(dh + 1) * gy, uy)
+        x1, y1 = np.minimum(x0 + 1, sw), np.minimum(y0 + 1, sh)
+        # Bilinear corner lookups as flat indices into the (H + 1, W + 1)
+        # integral, with integer weights (sum ux * uy)
+        stride = sw + 1
+        self._index = [(ya[:, None] * stride + xa[None, :]).ravel() for ya in (y0, y1) for xa in (x0, x1)]
+        # Scaled corner values must fit the accumulator
+        self._dtype = np.int32 if sw * sh * 255 * ux * uy < 2 ** 31 else np.int64
+        wy, wx = (uy - yr, yr), (ux - xr, xr)
+        self._weights = [np.outer(wy[i], wx[j]).ravel().astype(self._dtype) for i in (0, 1) for j in (0, 1)]
+
+    def __call__(self, integrals, out):
+        """integrals: (n, H + 1, W + 1) int32 from cv2.integral; out: (n, h, w) uint8."""
+        n = len(integrals)
+        flat = integrals.reshape(n, -1)
+        corners = np.zeros((n, self._index[0].size), dtype=self._dtype)
+        for index, weights in zip(self._index, self._weights):
+            corners += np.take(flat, index, axis=1) * weights
+        dh, dw = out.shape[1:]
+        corners = corners.reshape(n, dh + 1, dw + 1)
+        s = corners[:, 1:, 1:] - corners[:, :-1, 1:] - corners[:, 1:, :-1] + corners[:, :-1, :-1]
+        d = self.denominator
+        np.floor_divide(2 * s + d, 2 * d, out=s)
+        out[...] = s
+        return out
+
+
+class BatchPreprocessor:
+    """
+    BenjiPreprocessor.process_frame over many frames at once, into one
+    preallocated (N, h, w) uint8 array.
+
+    Per chunk of frames (small enough to stay in cache):
+    1. per frame: cvtColor to gray into one reused buffer, then its integral
+       image (~0.1 ms vs ~0.8 ms for INTER_AREA at 800x448)
+    2. AreaDownscaler for every frame of the chunk in one vectorized pass
+
+    The first time a frame shape is seen, the result is checked against
+    preprocessor.process_frame on that frame and on a noise frame; if it is
+    not identical (a different preprocessing pipeline, an unsupported
+    scale), that shape falls back to calling process_frame per frame.
+    """
+    def __init__(self, preprocessor, size: Tuple[int, int] = (128, 128), chunk_size=8):
+        self.preprocessor = preprocessor
+        self.size = size # (w, h)
+        self.chunk_size = chunk_size
+        self._fast = {} # frame shape -> verified AreaDownscaler, or None for the fallback
+        self._gray = None
+        self._integrals = None
+
+    def _buffers(self, n, h, w):
+        """Gray frame and (n, H + 1, W + 1) integral buffers, reallocated only when they grow."""
+        if self._gray is None or self._gray.shape != (h, w) or len(self._integrals) < n:
+            self._gray = np.empty((h, w), dtype=np.uint8)
+            self._integrals = np.empty((max(n, self.chunk_size), h + 1, w + 1), dtype=np.int32)
+        return self._gray, self._integrals
+
+    def _reference(self, frame):
+        out = self.preprocessor.process_frame(frame)
+        if out.ndim == 3 and out.shape[0] == 1:
+            out = out[0]
+        return out
+
+    def _downscaler(self, frame) -> Optional[AreaDownscaler]:
+        shape = frame.shape
+        if shape not in self._fast:
+            self._fast[shape] = self._check_fast_path(frame)
+        return self._fast[shape]
+
+    def _check_fast_path(self, frame) -> Optional[AreaDownscaler]:
+        """The fast path for frame's shape, if it matches process_frame on frame and on noise."""
+        if frame.ndim != 3 or frame.shape[2] != 3:
+            return None
+        h, w = frame.shape[:2]
+        downscaler = AreaDownscaler((w, h), self.size)
+        if not downscaler.supported:
+            return None
+        noise = np.random.default_rng(0).integers(0, 256, frame.shape, dtype=np.uint8)
+        probe = np.stack([frame, noise])
+        out = np.empty((2, self.size[1], self.size[0]), dtype=np.uint8)
+        self._process_chunk(probe, out, downscaler)
+        if not all(np.array_equal(out[i], self._reference(probe[i])) for i in range(2)):
+            logger.warning(f"Batch preprocessing does not match process_frame for {frame.shape} frames, "
+                           "falling back to per-frame processing")
+            return None
+        return downscaler
+
+    def _process_chunk(self, frames, out, downscaler):
+        n = len(frames)
+        h, w = frames[0].shape[:2]
+        gray, integrals = self._buffers(n, h, w)
+        # Frame by frame, into reused buffers: stays in cache (one cvtColor
+        # over a whole stacked chunk is slower)
+        for i, frame in enumerate(frames):
+            cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray)
+            cv2.integral(gray, sum=integrals[i], sdepth=cv2.CV_32S)
+        downscaler(integrals[:n], out)
+
+    def process_batch(self, frames, out=None):
+        """
+        frames: (N, H, W, 3) uint8 array or a list of BGR frames (None entries,
+        e.g. corrupted reads, give black frames). Returns out, (N, h, w) uint8.
+        """
+        n = len(frames)
+        w, h = self.size
+        if out is None:
+            out = np.empty((n, h, w), dtype=np.uint8)
+        elif out.shape != (n, h, w) or out.dtype != np.uint8:
+            raise ValueError(f"out must be a ({n}, {h}, {w}) uint8 array, got {out.shape} {out.dtype}")
+        if n == 0:
+            return out
+
+        # Same-shaped runs go through the fast path together
+        start = 0
+        while start < n:
+            first = frames[start]
+            if first is None:
+                out[start] = 0
+                start += 1
+                continue
+            end = start + 1
+            while end < n and end - start < self.chunk_size and frames[end] is not None \
+                    and frames[end].shape == first.shape:
+                end += 1
+
+            downscaler = self._downscaler(first)
+            if downscaler is None:
+                for i in range(start, end):
+                    out[i] = self._reference(frames[i])
+            else:
+                self._process_chunk(frames[start:end], out[start:end], downscaler)
+            start = end
+        return out
@@ -0,0 +1,111 @@
+import logging
+from typing import Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# HSV ranges (OpenCV: H 0-179) from tools/test_preprocessing.py::process_color_filter
+BENJI_HSV = ((10, 50, 200), (25, 160, 255)) # Pale orange, low saturation
+VINE_HSV = ((15, 180, 180), (24, 255, 255)) # Vivid orange
+BANANA_HSV = ((25, 150, 180), (35, 255, 255)) # Bright yellow
+
+# Output intensities, in priority order (higher wins)
+BENJI, BANANA, VINE = 85, 170, 255
+
+
+def hsv_class_masks(img_bgr):
+    """(benji, vine, banana) boolean masks straight from cvtColor + inRange."""
+    hsv = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2HSV)
+    return tuple(cv2.inRange(hsv, np.array(lo), np.array(hi)) > 0 for lo, hi in (BENJI_HSV, VINE_HSV, BANANA_HSV))
+
+
+def reference_color_mask(img_bgr):
+    """
+    The prototype pipeline (cvtColor, 3x inRange, 3 morphology passes,
+    priority merge), kept as the ground truth for ColorMaskLUT.
+    """
+    benji, vine, banana = (m.astype(np.uint8) * 255 for m in hsv_class_masks(img_bgr))
+    kernel = np.ones((3, 3), np.uint8)
+    vine = cv2.dilate(vine, kernel, iterations=1)
+    benji = cv2.morphologyEx(benji, cv2.MORPH_OPEN, kernel)
+    banana = cv2.dilate(banana, kernel, iterations=1)
+    combined = np.zeros_like(vine)
+    combined[benji > 0] = BENJI
+    combined[banana > 0] = BANANA
+    combined[vine > 0] = VINE
+    return combined
+
+
+class ColorMaskLUT:
+    """
+    Semantic colour-mask observation (Benji 85 / banana 170 / vine 255 / else 0)
+    without per-frame HSV conversion.
+
+    Setup: every BGR colour is classified once through the HSV ranges and
+    reduced to a 3D table over `bits` bits per channel (each cell takes the
+    majority class of the colours it covers; bits=8 is exact, but the table
+    is 32 MB and building it peaks around 100 MB; bits=6 is 512 KB).
+    Each entry packs two planes into a uint16:
+    - low byte: vine/banana level (0/170/255), already priority-merged
+    - high byte: Benji (0/85)
+
+    Per frame (on the 128x128 BGR obs), the prototype's three inRange masks,
+    three morphology passes and priority merge become:
+    1. one table lookup per pixel (the index is built from a uint32 view of
+       the BGRA pixels, no per-channel arithmetic)
+    2. out = dilate(max(vine_banana, erode(benji))): dilation commutes with
+       max, so one dilate thickens vines and bananas and finishes Benji's
+       opening; max also applies the priority (255 > 170 > 85)
+    """
+    def __init__(self, bits=6, size: Tuple[int, int] = (128, 128)):
+        if not 1 <= bits <= 8:
+            raise ValueError(f"bits must be in 1..8, got {bits}")
+        self.bits = bits
+        self.size = size
+        self.shift = 8 - bits
+        self.kernel = np.ones((3, 3), np.uint8)
+        self.lut = self._build_table()
+
+    def _build_table(self):
+        n, cell = 1 << self.bits, 1 << self.shift
+        # Votes per (class, r, g, b) cell; one red level at a time: a 256x256
+        # image of every (G, B) pair. Smallest counter that holds cell ** 3
+        # (one byte per entry at bits=8, where each cell is one colour)
+        dtype = np.min_scalar_type(cell ** 3)
+        votes = np.zeros((3, n, n, n), dtype=dtype)
+        g, b = np.meshgrid(np.arange(256, dtype=np.uint8), np.arange(256, dtype=np.uint8), indexing="ij")
+        for r in range(256):
+            img = np.dstack([b, g, np.full_like(g, r)])
+            for k, mask in enumerate(hsv_class_masks(img)):
+                votes[k, r >> self.shift] += mask.reshape(n, cell, n, cell).sum(axis=(1, 3), dtype=dtype)
+        votes = votes.reshape(3, -1)
+        majority = cell ** 3 // 2 # votes > majority, without doubling (overflow)
+
+        # One class mask at a time, to keep the peak down at bits=8
+        lut = np.zeros(n ** 3, dtype="<u2")
+        lut[votes[2] > majority] = BANANA
+        lut[votes[1] > majority] = VINE
+        lut[votes[0] > majority] |= BENJI << 8
+        return lut
+
+    def index(self, small_bgr):
+        """Table index (r, g, b major to minor) per pixel of an (H, W, 3) uint8 image."""
+        u = cv2.cvtColor(small_bgr, cv2.COLOR_BGR2BGRA).view("<u4")[..., 0] # B | G << 8 | R << 16 | A << 24
+        if not self.shift:
+            return u & 0xFFFFFF
+        s, m = self.shift, (1 << self.bits) - 1
+        return ((u >> s) & m) | ((u >> 2 * s) & (m << self.bits)) | ((u >> 3 * s) & (m << 2 * self.bits))
+
+    def apply(self, small_bgr):
+        """(H, W) uint8 mask of an already-resized BGR image."""
+        planes = np.take(self.lut, self.index(small_bgr)).view(np.uint8).reshape(*small_bgr.shape[:2], 2)
+        vine_banana = cv2.extractChannel(planes, 0)
+        benji = cv2.erode(cv2.extractChannel(planes, 1), self.kernel)
+        return cv2.dilate(cv2.max(vine_banana, benji), self.kernel)
+
+    def process_frame(self, frame):
+        """Full BGR frame -> (1, H, W) uint8 mask, like the grayscale obs."""
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        return self.apply(small)[np.newaxis, :, :]
@@ -0,0 +1,140 @@
+import os
+import logging
+import subprocess
+from typing import Dict, Optional, Tuple
+
+from env.frame_ring import FrameRingReader
+
+logger = logging.getLogger(__name__)
+
+# HUD counters in 800x448 stream coordinates (x, y, w, h), as used by BenjiReward
+DEFAULT_ROIS = {
+    "dist": (715, 39, 55, 19),
+    "banana": (715, 59, 55, 19),
+}
+
+
+class CompactCapture:
+    """
+    Optional capture mode for ScrcpyClient: ffmpeg does the downscaling.
+    
+    Instead of piping full 800x448 BGR frames (~1 MB each) into Python, one
+    ffmpeg filter graph splits the decoded stream into compact outputs,
+    each on its own pipe:
+    - "obs": obs_size grayscale (area scaling), what BenjiPreprocessor produces
+    - one BGR crop per HUD ROI (what BenjiReward reads)
+    - "full": full-resolution BGR, only if full_res=True (debug/visualization)
+    
+    Each output is read by a FrameRingReader. All outputs come from the same
+    decoded frames, so equal sequence numbers refer to the same source frame.
+    
+    `source` is the scrcpy FIFO, or any video file ffmpeg can read.
+    Note: ffmpeg's area scaler is close to, but not bit-identical with,
+    cv2.INTER_AREA.
+    """
+    def __init__(self, source, frame_size=(800, 448), obs_size=(128, 128),
+                 rois: Optional[Dict[str, Tuple[int, int, int, int]]] = None,
+                 full_res=False, ring_size=4, ffmpeg_path="ffmpeg", realtime=False):
+        self.source = source
+        self.frame_size = frame_size
+        self.obs_size = obs_size
+        self.rois = dict(DEFAULT_ROIS if rois is None else rois)
+        self.full_res = full_res
+        self.ring_size = ring_size
+        self.ffmpeg_path = ffmpeg_path
+        self.realtime = realtime # -re: pace file input at its native rate
+        
+        self.process = None
+        self.readers: Dict[str, FrameRingReader] = {}
+        self._pipes = []
+
+    def _outputs(self):
+        """(name, filter chain, pix_fmt, frame shape) for every output."""
+        ow, oh = self.obs_size
+        outputs = [("obs", f"scale={ow}:{oh}:flags=area,format=gray", "gray", (oh, ow))]
+        for name, (x, y, w, h) in self.rois.items():
+            outputs.append((name, f"crop={w}:{h}:{x}:{y},format=bgr24", "bgr24", (h, w, 3)))
+        if self.full_res:
+            fw, fh = self.frame_size
+            outputs.append(("full", "format=bgr24", "bgr24", (fh, fw, 3)))
+        return outputs
+
+    def build_command(self, fds):
+        """ffmpeg argv writing output i as rawvideo to pipe:fds[i]."""
+        outputs = self._outputs()
+        labels = [f"[s{i}]" for i in range(len(outputs))]
+        graph = f"[0:v]split={len(outputs)}{''.join(labels)}"
+        for i, (name, chain, _, _) in enumerate(outputs):
+            graph += f";{labels[i]}{chain}[{name}]"
+        
+        cmd = [self.ffmpeg_path, "-loglevel", "error", "-nostdin"]
+        if self.realtime:
+            cmd.append("-re")
+        cmd += ["-i", self.source, "-filter_complex", graph]
+        for (name, _, pix_fmt, _), fd in zip(outputs, fds):
+            cmd += ["-map", f"[{name}]", "-f", "rawvideo", "-pix_fmt", pix_fmt, f"pipe:{fd}"]
+        return cmd
+
+    def start(self):
+        outputs = self._outputs()
+        self._pipes = []
+        try:
+            for _ in outputs:
+                self._pipes.append(os.pipe())
+            write_fds = [w for _, w in self._pipes]
+            cmd = self.build_command(write_fds)
+            logger.info(f"Starting compact capture: {' '.join(cmd)}")
+            
+            self.process = subprocess.Popen(cmd, pass_fds=write_fds,
+                                            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL)
+        except Exception:
+            # ffmpeg missing, out of fds, ...: don't leak the pipes made so far
+            for r, w in self._pipes:
+                os.close(r)
+                os.close(w)
+            self._pipes = []
+            raise
+        
+        # Parent keeps only the read ends, so readers see EOF when ffmpeg exits
+        for (name, _, _, shape), (r, w) in zip(outputs, self._pipes):
+            os.close(w)
+            stream = os.fdopen(r, 'rb', buffering=0)
+            self.readers[name] = FrameRingReader(stream, frame_shape=shape, ring_size=self.ring_size).start()
+        return self
+
+    def get_views(self, after_seq: int = -1, timeout: Optional[float] = None):
+        """
+        Blocks for a frame newer than after_seq and returns (seq, timestamp,
+        {name: array}) with every output taken from that same source frame,
+        or None at end of stream. Arrays are ring views; copy to keep them.
+        """
+        ref = self.readers["obs"].wait_next(after_seq, timeout)
+        if ref is None:
+            return None
+        seq = ref.seq
+        views = {"obs": ref.frame}
+        for name, reader in self.readers.items():
+            if name == "obs":
+                continue
+            # Outputs advance in lockstep but on separate pipes: wait for this seq
+            other = reader.wait_next(seq - 1, timeout)
+            if other is None:
+                return None
+            if other.seq != seq:
+                # Overrun (consumer too slow); realign on the newest common frame
+                return self.get_views(other.seq - 1, timeout)
+            views[name] = other.frame
+        return seq, ref.timestamp, views
+
+    def stop(self):
+        if self.process is not None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+            self.process = None
+        for reader in self.readers.values():
+            reader.stop()
+            reader.stream.close()
+        self.readers = {}
@@ -0,0 +1,105 @@
+import time
+import logging
+from collections import defaultdict
+from typing import Optional, Tuple
+
+import cv2
+
+logger = logging.getLogger(__name__)
+
+
+class FrameContextStats:
+    """Hit/miss counts and compute time per derived view, shared across frames."""
+    def __init__(self):
+        self.hits = defaultdict(int)
+        self.misses = defaultdict(int)
+        self.compute_time = defaultdict(float)
+
+    def saved_ms(self):
+        """Estimated time saved: each hit would otherwise have recomputed the view."""
+        return sum(self.hits[k] * self.compute_time[k] / self.misses[k] for k in self.misses if self.misses[k]) * 1000
+
+    def summary(self):
+        return {
+            key: {
+                "hits": self.hits[key],
+                "misses": self.misses[key],
+                "compute_ms": self.compute_time[key] * 1000 / max(self.misses[key], 1),
+            }
+            for key in sorted(set(self.misses) | set(self.hits))
+        }
+
+    def report(self):
+        print(f"{'view':<24}{'hits':>8}{'misses':>8}{'ms/compute':>12}")
+        for key, s in self.summary().items():
+            print(f"{key:<24}{s['hits']:>8}{s['misses']:>8}{s['compute_ms']:>12.3f}")
+        print(f"Estimated time saved: {self.saved_ms():.1f} ms")
+
+
+class FrameContext:
+    """
+    One raw BGR frame plus lazily computed, memoized derived views.
+
+    Created once per env step and handed to the preprocessor, the reward
+    calculator and the game-over check, so each colour conversion / resize
+    happens at most once per frame no matter how many consumers need it:
+    - gray: full-res grayscale
+    - small_gray(size): downscaled gray (INTER_AREA), e.g. the 128x128 obs
+    - hsv: full-res HSV
+    - roi(rect) / roi_gray(rect): (x, y, w, h) crops (views, no copy)
+    - prev: the previous step's context (motion terms use prev.small_gray)
+
+    Only the previous context is kept, so memory stays bounded.
+    """
+    def __init__(self, frame, seq=0, prev: Optional["FrameContext"] = None,
+                 stats: Optional[FrameContextStats] = None):
+        self.frame = frame
+        self.seq = seq
+        self.stats = stats if stats is not None else FrameContextStats()
+        self._cache = {}
+        if prev is not None:
+            prev.prev = None # Don't chain the whole history
+        self.prev = prev
+
+    def next(self, frame):
+        """Context for the next frame, linked to this one."""
+        return FrameContext(frame, self.seq + 1, prev=self, stats=self.stats)
+
+    def _get(self, key, compute):
+        value = self._cache.get(key)
+        if value is not None:
+            self.stats.hits[key] += 1
+            return value
+        t0 = time.perf_counter()
+        value = compute()
+        self.stats.compute_time[key] += time.perf_counter() - t0
+        self.stats.misses[key] += 1
+        self._cache[key] = value
+        return value
+
+    @property
+    def gray(self):
+        return self._get("gray", lambda: cv2.cvtColor(self.frame, cv2.COLOR_BGR2GRAY))
+
+    @property
+    def hsv(self):
+        return self._get("hsv", lambda: cv2.cvtColor(self.frame, cv2.COLOR_BGR2HSV))
+
+    def small_gray(self, size: Tuple[int, int] = (128, 128)):
+        """Gray resized to size (w, h) with INTER_AREA."""
+        key = f"small_gray {size[0]}x{size[1]}"
+        gray = None if key in self._cache else self.gray # Timed as its own view
+        return self._get(key, lambda: cv2.resize(gray, size, interpolation=cv2.INTER_AREA))
+
+    def roi(self, rect):
+        x, y, w, h = rect
+        return self.frame[y:y + h, x:x + w]
+
+    def roi_gray(self, rect):
+        """Gray crop; sliced from the full gray if that exists, else converted alone."""
+        x, y, w, h = rect
+        key = f"roi_gray {x},{y},{w},{h}"
+        if "gray" in self._cache:
+            self.stats.hits[key] += 1
+            return self._cache["gray"][y:y + h, x:x + w]
+        return self._get(key, lambda: cv2.cvtColor(self.roi(rect), cv2.COLOR_BGR2GRAY))
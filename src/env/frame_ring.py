@@ -0,0 +1,121 @@
+import time
+import logging
+import threading
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class FrameRef(NamedTuple):
+    """A frame in the ring plus its sequence number and capture time (perf_counter)."""
+    seq: int
+    timestamp: float
+    frame: np.ndarray
+
+
+class FrameRingReader:
+    """
+    Background reader for ffmpeg's raw BGR output (ScrcpyClient's pipe).
+    
+    A daemon thread readinto()s the stream straight into a preallocated ring
+    of NumPy frame buffers, so reading a frame costs no allocation and no
+    longer sits on the caller's critical path. Each frame gets a sequence
+    number and a capture timestamp.
+    
+    - latest(): non-blocking, newest complete frame (or None)
+    - wait_next(after_seq): blocks until a frame newer than after_seq exists
+    
+    Returned frames are read-only views into the ring. The reader starts
+    refilling a frame's slot as soon as ring_size - 1 newer frames have
+    arrived, so copy frames that must live longer than that (the frame
+    writers do this themselves for such views).
+    """
+    def __init__(self, stream, frame_shape=(448, 800, 3), ring_size=4):
+        self.stream = stream
+        self.frame_shape = tuple(frame_shape)
+        self.frame_bytes = int(np.prod(self.frame_shape))
+        self.ring_size = ring_size
+        
+        self._buffers = [np.empty(self.frame_shape, dtype=np.uint8) for _ in range(ring_size)]
+        self._views = [memoryview(b.reshape(-1)) for b in self._buffers]
+        # What callers get: read-only, and marked as not owning their memory
+        self._frames = [b.view() for b in self._buffers]
+        for frame in self._frames:
+            frame.flags.writeable = False
+        self._timestamps = [0.0] * ring_size
+        
+        self.latest_seq = -1 # Sequence number of the newest complete frame
+        self.eof = False
+        self._running = False
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="frame-ring-reader", daemon=True)
+        self._thread.start()
+        return self
+
+    def _read_exact(self, view):
+        got = 0
+        while got < self.frame_bytes:
+            n = self.stream.readinto(view[got:])
+            if not n:
+                return False
+            got += n
+        return True
+
+    def _run(self):
+        try:
+            while self._running:
+                seq = self.latest_seq + 1
+                slot = seq % self.ring_size
+                # The slot being filled is never the published one, so
+                # latest() always sees a complete frame.
+                if not self._read_exact(self._views[slot]):
+                    break
+                with self._cond:
+                    self._timestamps[slot] = time.perf_counter()
+                    self.latest_seq = seq
+                    self._cond.notify_all()
+        except (OSError, ValueError) as e:
+            # Stream closed under us (ffmpeg killed / stop())
+            if self._running:
+                logger.warning(f"Frame reader stopped: {e}")
+        finally:
+            with self._cond:
+                self.eof = True
+                self._cond.notify_all()
+
+    def _ref(self, seq):
+        slot = seq % self.ring_size
+        return FrameRef(seq, self._timestamps[slot], self._frames[slot])
+
+    def latest(self) -> Optional[FrameRef]:
+        """Newest complete frame without blocking, or None if none arrived yet."""
+        with self._cond:
+            if self.latest_seq < 0:
+                return None
+            return self._ref(self.latest_seq)
+
+    def wait_next(self, after_seq: int = -1, timeout: Optional[float] = None) -> Optional[FrameRef]:
+        """
+        Blocks until a frame with seq > after_seq is available and returns
+        the newest one. Returns None on timeout or end of stream.
+        """
+        with self._cond:
+            ready = self._cond.wait_for(lambda: self.latest_seq > after_seq or self.eof, timeout)
+            if not ready or self.latest_seq <= after_seq:
+                return None
+            return self._ref(self.latest_seq)
+
+    def stop(self, timeout=1.0):
+        """
+        Stops the reader. A thread blocked in readinto() only returns once
+        the stream is closed (e.g. the ffmpeg process is terminated).
+        """
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout)
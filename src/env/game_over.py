@@ -0,0 +1,88 @@
+import os
+import logging
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TEMPLATE = os.path.join(os.path.dirname(__file__), "game_start.jpg")
+# Where tools/crop_template.py cuts the template from (x, y, w, h), 800x448 frame
+DEFAULT_ROI = (0, 250, 120, 190)
+
+
+class GameOverDetector:
+    """
+    Cheap game-over (death screen) check for _check_and_restart.
+
+    Per call, in order of cost:
+    1. check interval: only every `check_interval`-th call looks at the frame
+    2. pre-filter: mean colour of every few rows of the ROI must be within
+       `color_tolerance` of the template's; ordinary gameplay frames stop here
+    3. match: normalized template matching on a downscaled pyramid level of
+       the ROI (plus `margin` px of slack for small shifts)
+
+    detect() returns True when the match score reaches `threshold`.
+    """
+    def __init__(self, template_path=DEFAULT_TEMPLATE, roi=DEFAULT_ROI, level=2,
+                 threshold=0.7, check_interval=3, color_tolerance=40.0, margin=8, sample_stride=4):
+        template = cv2.imread(template_path)
+        if template is None:
+            raise FileNotFoundError(f"Game-over template not found: {template_path}")
+        self.roi = roi
+        self.level = level
+        self.threshold = threshold
+        self.check_interval = max(1, check_interval)
+        self.color_tolerance = color_tolerance
+        self.margin = margin
+        self.sample_stride = sample_stride
+
+        self.template_mean = self._mean_color(template)
+        self.template_small = self._downscale(cv2.cvtColor(template, cv2.COLOR_BGR2GRAY))
+
+        self.calls = 0
+        self.prefilter_rejects = 0
+        self.matches = 0
+        self.last_score = 0.0
+
+    def _mean_color(self, region):
+        # Every sample_stride-th row: a row-strided view cv2.mean reads without copying
+        return np.array(cv2.mean(region[::self.sample_stride])[:3])
+
+    def _downscale(self, img):
+        for _ in range(self.level):
+            img = cv2.pyrDown(img)
+        return img
+
+    def _search_region(self, frame):
+        x, y, w, h = self.roi
+        m = self.margin
+        fh, fw = frame.shape[:2]
+        return frame[max(0, y - m):min(fh, y + h + m), max(0, x - m):min(fw, x + w + m)]
+
+    def detect(self, frame) -> bool:
+        """Rate-limited check; frames between checks report False."""
+        self.calls += 1
+        if (self.calls - 1) % self.check_interval:
+            return False
+        return self.check(frame)
+
+    def check(self, frame) -> bool:
+        """Pre-filter + pyramid match on this frame, no rate limit."""
+        x, y, w, h = self.roi
+        roi = frame[y:y + h, x:x + w]
+        if np.abs(self._mean_color(roi) - self.template_mean).max() > self.color_tolerance:
+            self.prefilter_rejects += 1
+            return False
+
+        self.matches += 1
+        region = self._downscale(cv2.cvtColor(self._search_region(frame), cv2.COLOR_BGR2GRAY))
+        if region.shape[0] < self.template_small.shape[0] or region.shape[1] < self.template_small.shape[1]:
+            return False
+        scores = cv2.matchTemplate(region, self.template_small, cv2.TM_CCOEFF_NORMED)
+        self.last_score = float(scores.max())
+        return self.last_score >= self.threshold
+
+    def reset(self):
+        """Next detect() call checks immediately (e.g. right after a restart)."""
+        self.calls = 0
@@ -0,0 +1,179 @@
+import os
+import csv
+import glob
+import logging
+import threading
+from collections import Counter
+from typing import Optional
+
+import cv2
+
+from data.pacing import DeadlinePacer
+from data.frame_writer import VIDEO_FILE, read_video_index, iter_video_frames
+
+logger = logging.getLogger(__name__)
+
+
+def iter_source_frames(source):
+    """
+    Yields BGR frames from a recorded source, in capture order:
+    - a data/raw/session_* directory (JPEG frames or frames.mkv + sidecar)
+    - any video file OpenCV can read
+    """
+    if os.path.isdir(source):
+        video_index = read_video_index(source)
+        if video_index is not None:
+            yield from (f for f in iter_video_frames(os.path.join(source, VIDEO_FILE),
+                                                     sorted(video_index.values())) if f is not None)
+            return
+        
+        csv_path = os.path.join(source, "actions.csv")
+        if os.path.exists(csv_path):
+            with open(csv_path, 'r') as f:
+                ids = sorted(int(row['frame_id']) for row in csv.DictReader(f))
+            paths = [os.path.join(source, "frames", f"frame_{i:06d}.jpg") for i in ids]
+        else:
+            paths = sorted(glob.glob(os.path.join(source, "frames", "*.jpg")))
+        for path in paths:
+            frame = cv2.imread(path)
+            if frame is not None:
+                yield frame
+        return
+    
+    cap = cv2.VideoCapture(source)
+    try:
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            yield frame
+    finally:
+        cap.release()
+
+
+class ReplayClient:
+    """
+    Stand-in for ScrcpyClient that replays a recorded session or video, so
+    BenjiBananasEnv's step() (preprocessing, reward OCR, game-over checks)
+    can be profiled and regression-tested with no device attached.
+    
+    Clock:
+    - fps=N: a background thread advances frames at N FPS like a live
+      stream (DeadlinePacer); get_frame() returns the current one.
+    - fps=None: step-locked, every get_frame() call returns the next frame.
+      Fully deterministic.
+    
+    With loop=False, `eof` is set once the source is exhausted and
+    get_frame() returns None from then on, in both clock modes.
+    
+    Control calls (tap/swipe/holds) are no-ops, counted in control_calls.
+    preload=True decodes everything up front so decoding does not show up
+    in step timings.
+    """
+    def __init__(self, source, fps: Optional[float] = 15, loop=True, preload=False):
+        if not os.path.exists(source):
+            raise FileNotFoundError(f"Replay source not found: {source}")
+        self.source = source
+        self.fps = fps
+        self.loop = loop
+        self.preload = preload
+        
+        self.frames_served = 0
+        self.control_calls = Counter()
+        self.eof = False
+        self._frames = None # Preloaded frames
+        self._iter = None
+        self._current = None
+        self._lock = threading.Lock()
+        self._running = False
+        self._thread = None
+        self.pacer = None
+
+    def start(self):
+        if self.preload:
+            self._frames = list(iter_source_frames(self.source))
+            if not self._frames:
+                raise RuntimeError(f"No frames in replay source: {self.source}")
+            logger.info(f"Replay: preloaded {len(self._frames)} frames from {self.source}")
+        self._iter = self._frame_iter()
+        
+        if self.fps:
+            self._current = self._advance()
+            self.pacer = DeadlinePacer(self.fps)
+            self.pacer.wait() # Starts the clock: frame 0 is current for one interval from now
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="replay-clock", daemon=True)
+            self._thread.start()
+        return self
+
+    def _frame_iter(self):
+        while True:
+            frames = self._frames if self._frames is not None else iter_source_frames(self.source)
+            empty = True
+            for frame in frames:
+                empty = False
+                yield frame
+            if not self.loop or empty:
+                return
+            logger.debug("Replay: looping source")
+
+    def _advance(self):
+        frame = next(self._iter, None)
+        if frame is None:
+            self.eof = True
+        return frame
+
+    def _run(self):
+        while self._running:
+            self.pacer.wait()
+            frame = self._advance()
+            with self._lock:
+                # None at the end, so callers don't replay the last frame forever
+                self._current = frame
+            if frame is None:
+                break
+
+    def get_frame(self):
+        """Current frame (fps clock) or the next frame (step-locked). None at end of a non-looping source."""
+        if self.fps:
+            with self._lock:
+                frame = self._current
+        else:
+            frame = self._advance()
+        if frame is not None:
+            self.frames_served += 1
+        return frame
+
+    # --- Controls: no-ops ---
+    def tap(self, x, y):
+        self.control_calls["tap"] += 1
+
+    def swipe(self, x1, y1, x2, y2, duration_ms=100):
+        self.control_calls["swipe"] += 1
+
+    def start_async_hold(self, x, y):
+        self.control_calls["start_async_hold"] += 1
+
+    def stop_async_hold(self, x, y):
+        self.control_calls["stop_async_hold"] += 1
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+
+def make_replay_env(source, fps: Optional[float] = 15, loop=True, preload=False, render_mode=None):
+    """
+    BenjiBananasEnv fed by a ReplayClient instead of a device: built in
+    offline mode, then the client is swapped in so step() runs the real
+    capture -> preprocessing -> reward -> game-over path on recorded frames.
+    With loop=False, check env.client.eof to stop once the recording ends.
+    """
+    from env.benji_env import BenjiBananasEnv
+    
+    env = BenjiBananasEnv(render_mode=render_mode, offline=True)
+    env.client = ReplayClient(source, fps=fps, loop=loop, preload=preload).start()
+    env.offline = False
+    return env
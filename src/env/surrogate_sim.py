@@ -0,0 +1,330 @@
+import logging
+from typing import List, Optional
+
+import numpy as np
+import gymnasium as gym
+from stable_baselines3.common.vec_env import VecEnv, VecFrameStack
+
+logger = logging.getLogger(__name__)
+
+# World is in observation pixels: 128 rows tall, x grows to the right.
+OBS_SIZE = 128
+PLAYER_COL = 40 # Camera keeps the player at this column
+GROUND_Y = 116 # Touching the ground/water ends the run
+VINE_SPACING = 28.0
+VINE_MIN_Y, VINE_MAX_Y = 14, 58 # Anchor (vine tip) height range
+MAX_ROPE = 60.0 # Hold only grabs a vine tip within this distance
+BANANA_RADIUS = 5.0
+
+GRAVITY = 160.0 # px/s^2
+SWING_BOOST = 60.0 # px/s^2 along the rope tangent on forward swings (the game's pump)
+DT = 1.0 / 15 # One env step = one real env step at 15 FPS
+SUBSTEPS = 4
+
+# Gray levels roughly matching the preprocessed game frames
+BG, VINE, ROPE, PLAYER, BANANA, GROUND = 90, 40, 60, 230, 200, 20
+
+# Pixel offsets for small sprites
+_PLAYER_OFFS = np.array([(dy, dx) for dy in range(-2, 3) for dx in range(-2, 3)])
+_BANANA_OFFS = np.array([(dy, dx) for dy in range(-1, 2) for dx in range(-1, 2)])
+_ROPE_SAMPLES = np.linspace(0.0, 1.0, 24)
+
+
+def _hash(seeds, k, salt):
+    """Stateless per-(env, vine) pseudo random uint32, so levels need no storage."""
+    h = (k.astype(np.uint64) * np.uint64(0x9E3779B1) + seeds[:, None] * np.uint64(0x85EBCA77)
+         + np.uint64(salt)) & np.uint64(0xFFFFFFFF)
+    h ^= h >> np.uint64(15)
+    h = (h * np.uint64(0x2C1B3C6D)) & np.uint64(0xFFFFFFFF)
+    h ^= h >> np.uint64(12)
+    h = (h * np.uint64(0x297A2D39)) & np.uint64(0xFFFFFFFF)
+    h ^= h >> np.uint64(15)
+    return h
+
+
+class BenjiSimVecEnv(VecEnv):
+    """
+    Batched NumPy surrogate of Benji's vine swinging, for pretraining.
+
+    Approximates the core mechanic for num_envs levels at once:
+    - hold (action 1) grabs the nearest vine tip in reach and swings on it
+      (pendulum), release (action 0) lets go and flies (projectile)
+    - touching the ground ends the episode
+    - distance and bananas (one per vine gap) are counted
+
+    Observations are single (1, 128, 128) uint8 gray frames like
+    BenjiBananasEnv's; wrap in VecFrameStack(4) (make_sim_venv) for the
+    (4, 128, 128) policy input. info["reward_components"] uses the real
+    env's keys so TensorboardCallback works unchanged.
+
+    Done envs auto-reset (terminal_observation in info), per VecEnv rules.
+    """
+    def __init__(self, num_envs=256, max_steps=3000, seed=0):
+        observation_space = gym.spaces.Box(low=0, high=255, shape=(1, OBS_SIZE, OBS_SIZE), dtype=np.uint8)
+        action_space = gym.spaces.Discrete(2)
+        self.render_mode = None
+        super().__init__(num_envs, observation_space, action_space)
+        self.max_steps = max_steps
+        self.rng = np.random.default_rng(seed)
+
+        n = num_envs
+        self.level_seeds = np.zeros(n, dtype=np.uint64)
+        self.pos = np.zeros((n, 2)) # (x, y)
+        self.vel = np.zeros((n, 2))
+        self.attached = np.zeros(n, dtype=bool)
+        self.anchor = np.zeros((n, 2))
+        self.rope_len = np.zeros(n)
+        self.theta = np.zeros(n) # Rope angle from vertical (positive = right of anchor)
+        self.omega = np.zeros(n)
+        self.next_banana = np.zeros(n, dtype=np.int64) # Index of the next banana not yet passed
+        self.bananas = np.zeros(n, dtype=np.int64)
+        self.steps = np.zeros(n, dtype=np.int64)
+        self.episode_returns = np.zeros(n)
+        self._actions = np.zeros(n, dtype=np.int64)
+        self._obs = np.empty((n, 1, OBS_SIZE, OBS_SIZE), dtype=np.uint8)
+
+        self._reset_envs(np.ones(n, dtype=bool))
+
+    # --- Level ---
+    def _vine_tips(self, k, seeds=None):
+        """Anchor positions (x, y) of vines k, shape k.shape + (2,)."""
+        seeds = self.level_seeds if seeds is None else seeds
+        jitter = _hash(seeds, k, 1) % np.uint64(9)
+        height = _hash(seeds, k, 2) % np.uint64(VINE_MAX_Y - VINE_MIN_Y)
+        x = k * VINE_SPACING + jitter.astype(np.float64) - 4.0
+        y = VINE_MIN_Y + height.astype(np.float64)
+        return np.stack([x, y], axis=-1)
+
+    def _banana_pos(self, k, seeds=None):
+        """Bananas float between vines, at a height the swing can reach."""
+        seeds = self.level_seeds if seeds is None else seeds
+        height = _hash(seeds, k, 3) % np.uint64(40)
+        x = (k + 0.5) * VINE_SPACING
+        y = 50.0 + height.astype(np.float64)
+        return np.stack([x, y], axis=-1)
+
+    def _reset_envs(self, mask):
+        idx = np.flatnonzero(mask)
+        if len(idx) == 0:
+            return
+        self.level_seeds[idx] = self.rng.integers(0, 2**32, size=len(idx), dtype=np.uint64)
+        # Start hanging from vine 1, at rest
+        tip = self._vine_tips(np.ones((len(idx), 1), dtype=np.int64), self.level_seeds[idx])[:, 0]
+        self.attached[idx] = True
+        self.anchor[idx] = tip
+        self.rope_len[idx] = 30.0
+        self.theta[idx] = -0.6
+        self.omega[idx] = 0.0
+        self.pos[idx, 0] = tip[:, 0] + 30.0 * np.sin(-0.6)
+        self.pos[idx, 1] = tip[:, 1] + 30.0 * np.cos(-0.6)
+        self.vel[idx] = 0.0
+        self.next_banana[idx] = 1
+        self.bananas[idx] = 0
+        self.steps[idx] = 0
+        self.episode_returns[idx] = 0.0
+
+    # --- Physics ---
+    def _grab(self, want):
+        """Attach envs in `want` to the nearest vine tip within reach."""
+        k0 = np.floor(self.pos[:, 0] / VINE_SPACING).astype(np.int64)
+        cand = k0[:, None] + np.arange(-1, 3)[None, :]
+        tips = self._vine_tips(cand)
+        d = np.linalg.norm(tips - self.pos[:, None, :], axis=-1)
+        # Can only grab tips above the player
+        d = np.where(tips[..., 1] < self.pos[:, None, 1], d, np.inf)
+        best = np.argmin(d, axis=1)
+        dist = d[np.arange(self.num_envs), best]
+        grab = want & (dist <= MAX_ROPE)
+        if not grab.any():
+            return
+        tip = tips[np.arange(self.num_envs), best][grab]
+        rel = self.pos[grab] - tip
+        self.anchor[grab] = tip
+        self.rope_len[grab] = dist[grab]
+        self.theta[grab] = np.arctan2(rel[:, 0], rel[:, 1])
+        # Keep the tangential part of the velocity
+        tangent = np.stack([np.cos(self.theta[grab]), -np.sin(self.theta[grab])], axis=-1)
+        self.omega[grab] = np.sum(self.vel[grab] * tangent, axis=-1) / self.rope_len[grab]
+        self.attached[grab] = True
+
+    def _release(self, let_go):
+        if not let_go.any():
+            return
+        th, om, r = self.theta[let_go], self.omega[let_go], self.rope_len[let_go]
+        self.vel[let_go, 0] = r * om * np.cos(th)
+        self.vel[let_go, 1] = -r * om * np.sin(th)
+        self.attached[let_go] = False
+
+    def _integrate(self):
+        h = DT / SUBSTEPS
+        att = self.attached
+        for _ in range(SUBSTEPS):
+            # Swinging: pendulum, semi-implicit Euler
+            accel = -GRAVITY * np.sin(self.theta[att]) + SWING_BOOST * (self.omega[att] > 0)
+            self.omega[att] += accel / self.rope_len[att] * h
+            self.theta[att] += self.omega[att] * h
+            # Flying: projectile
+            free = ~att
+            self.vel[free, 1] += GRAVITY * h
+            self.pos[free] += self.vel[free] * h
+        self.pos[att, 0] = self.anchor[att, 0] + self.rope_len[att] * np.sin(self.theta[att])
+        self.pos[att, 1] = self.anchor[att, 1] + self.rope_len[att] * np.cos(self.theta[att])
+        # Can't leave the top of the screen
+        top = self.pos[:, 1] < 2.0
+        self.pos[top, 1] = 2.0
+        self.vel[top, 1] = np.maximum(self.vel[top, 1], 0.0)
+
+    def _collect_bananas(self):
+        """Bananas the player passed this step; collected if close enough."""
+        got = np.zeros(self.num_envs, dtype=np.int64)
+        # A fast flight can pass more than one banana per step
+        for _ in range(3):
+            b = self._banana_pos(self.next_banana[:, None])[:, 0]
+            passed = self.pos[:, 0] >= b[:, 0]
+            if not passed.any():
+                break
+            hit = passed & (np.abs(self.pos[:, 1] - b[:, 1]) <= BANANA_RADIUS + 3.0)
+            got += hit
+            self.next_banana += passed
+        return got
+
+    # --- Rendering ---
+    def _render(self, out):
+        n = self.num_envs
+        out[:] = BG
+        out[:, 0, GROUND_Y:, :] = GROUND
+        cam = self.pos[:, 0] - PLAYER_COL # World x at screen column 0
+
+        # Vines: hang from the top of the screen down to their tip
+        k0 = np.floor(cam / VINE_SPACING).astype(np.int64) - 1
+        ks = k0[:, None] + np.arange(int(OBS_SIZE / VINE_SPACING) + 3)[None, :]
+        tips = self._vine_tips(ks)
+        cols = np.rint(tips[..., 0] - cam[:, None]).astype(np.int64)
+        rows = np.arange(OBS_SIZE)
+        env_i, vine_i, row_i = np.nonzero(rows[None, None, :] <= tips[..., 1, None])
+        c = cols[env_i, vine_i]
+        ok = (c >= 0) & (c < OBS_SIZE)
+        out[env_i[ok], 0, row_i[ok], c[ok]] = VINE
+
+        # Bananas not yet passed
+        kb = self.next_banana[:, None] + np.arange(4)[None, :]
+        bpos = self._banana_pos(kb)
+        self._draw_points(out, bpos[..., 1], bpos[..., 0] - cam[:, None], _BANANA_OFFS, BANANA)
+
+        # Rope
+        att = np.flatnonzero(self.attached)
+        if len(att):
+            a, p = self.anchor[att], self.pos[att]
+            ry = a[:, 1, None] + (p[:, 1] - a[:, 1])[:, None] * _ROPE_SAMPLES
+            rx = a[:, 0, None] + (p[:, 0] - a[:, 0])[:, None] * _ROPE_SAMPLES - cam[att, None]
+            self._draw_points(out, ry, rx, None, ROPE, env_idx=att)
+
+        # Player
+        self._draw_points(out, self.pos[:, 1, None], np.full((n, 1), float(PLAYER_COL)), _PLAYER_OFFS, PLAYER)
+        return out
+
+    def _draw_points(self, out, ys, xs, offsets, value, env_idx=None):
+        """Scatter (E, P) points (plus sprite offsets) into out, clipped to the frame."""
+        env_idx = np.arange(self.num_envs) if env_idx is None else env_idx
+        ys = np.rint(ys).astype(np.int64)
+        xs = np.rint(xs).astype(np.int64)
+        e = np.broadcast_to(env_idx[:, None], ys.shape)
+        if offsets is not None:
+            ys = (ys[..., None] + offsets[:, 0]).reshape(len(env_idx), -1)
+            xs = (xs[..., None] + offsets[:, 1]).reshape(len(env_idx), -1)
+            e = np.broadcast_to(env_idx[:, None], ys.shape)
+        ok = (ys >= 0) & (ys < OBS_SIZE) & (xs >= 0) & (xs < OBS_SIZE)
+        out[e[ok], 0, ys[ok], xs[ok]] = value
+
+    # --- VecEnv API ---
+    def reset(self):
+        if any(s is not None for s in self._seeds):
+            seeds = [s for s in self._seeds if s is not None]
+            self.rng = np.random.default_rng(seeds[0])
+        self._reset_seeds()
+        self._reset_envs(np.ones(self.num_envs, dtype=bool))
+        return self._render(self._obs).copy()
+
+    def step_async(self, actions):
+        self._actions = np.asarray(actions).reshape(self.num_envs)
+
+    def step_wait(self):
+        hold = self._actions == 1
+        self._release(self.attached & ~hold)
+        self._grab(~self.attached & hold)
+
+        prev_x = self.pos[:, 0].copy()
+        self._integrate()
+        got = self._collect_bananas()
+        self.bananas += got
+        self.steps += 1
+
+        crashed = self.pos[:, 1] >= GROUND_Y
+        truncated = self.steps >= self.max_steps
+        dones = crashed | truncated
+
+        # Same shape of reward as BenjiReward: progress + bananas + momentum + survival
+        dx = self.pos[:, 0] - prev_x
+        dist_reward = 0.1 * dx
+        banana_reward = 1.0 * got
+        momentum_reward = np.where(self.attached, 0.0, 0.002 * np.clip(self.vel[:, 0], 0.0, None))
+        survival_reward = np.full(self.num_envs, 0.01)
+        rewards = dist_reward + banana_reward + momentum_reward + survival_reward
+        rewards = np.where(crashed, -5.0, rewards).astype(np.float32)
+        self.episode_returns += rewards
+
+        obs = self._render(self._obs)
+        infos = []
+        for i in range(self.num_envs):
+            info = {
+                "reward_components": {
+                    "raw_dist": float(self.pos[i, 0] / VINE_SPACING),
+                    "raw_bananas": int(self.bananas[i]),
+                    "dist_reward": float(dist_reward[i]),
+                    "banana_reward": float(banana_reward[i]),
+                    "momentum_reward": float(momentum_reward[i]),
+                    "survival_reward": float(survival_reward[i]),
+                }
+            }
+            if dones[i]:
+                info["terminal_observation"] = obs[i].copy()
+                info["TimeLimit.truncated"] = bool(truncated[i] and not crashed[i])
+                info["episode"] = {"r": float(self.episode_returns[i]), "l": int(self.steps[i])}
+            infos.append(info)
+
+        if dones.any():
+            self._reset_envs(dones)
+            obs = self._render(self._obs)
+        return obs.copy(), rewards, dones, infos
+
+    def close(self):
+        pass
+
+    def get_attr(self, attr_name, indices=None):
+        return [getattr(self, attr_name)] * len(self._get_indices(indices))
+
+    def set_attr(self, attr_name, value, indices=None):
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        # pause/unpause (PauseCallback) mean nothing for a simulator
+        if method_name in ("pause", "unpause"):
+            return [None] * len(self._get_indices(indices))
+        method = getattr(self, method_name)
+        return [method(*method_args, **method_kwargs)] * len(self._get_indices(indices))
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False] * len(self._get_indices(indices))
+
+    def _get_indices(self, indices) -> List[int]:
+        if indices is None:
+            return list(range(self.num_envs))
+        if isinstance(indices, int):
+            return [indices]
+        return list(indices)
+
+
+def make_sim_venv(num_envs=256, n_stack=4, max_steps=3000, seed: Optional[int] = 0):
+    """Surrogate VecEnv with the same frame stacking as BenjiAgent: (4, 128, 128) uint8 obs."""
+    venv = BenjiSimVecEnv(num_envs=num_envs, max_steps=max_steps, seed=seed)
+    return VecFrameStack(venv, n_stack=n_stack)
@@ -0,0 +1,195 @@
+import sys
+import os
+import threading
+import time
+import numpy as np
+import gymnasium as gym
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src'))
+
+from env.async_reward import AsyncRewardWorker, AsyncRewardWrapper
+from agent.callbacks import DelayedRewardCallback
+
+
+class GatedCalculator:
+    """Reward = the frame's value; calculate() waits until the gate is open."""
+    def __init__(self, delay=0.0):
+        self.gate = threading.Event()
+        self.gate.set()
+        self.delay = delay
+        self.calls = []
+
+    def calculate(self, frame, done):
+        self.gate.wait()
+        time.sleep(self.delay)
+        self.calls.append((int(frame[0, 0]), done))
+        return float(frame[0, 0]), {"value": int(frame[0, 0])}
+
+
+class RewardEnv(gym.Env):
+    """Minimal BenjiBananasEnv stand-in: rewards come from reward_calculator, frame i on step i."""
+    observation_space = gym.spaces.Box(0, 255, (1, 2, 2), dtype=np.uint8)
+    action_space = gym.spaces.Discrete(2)
+
+    def __init__(self, calculator, episode_len=3):
+        self.reward_calculator = calculator
+        self.episode_len = episode_len
+        self.t = 0
+
+    def reset(self, seed=None, options=None):
+        self.t = 0
+        return np.zeros((1, 2, 2), dtype=np.uint8), {}
+
+    def step(self, action):
+        self.t += 1
+        frame = np.full((2, 2), self.t, dtype=np.uint8)
+        done = self.t >= self.episode_len
+        reward, components = self.reward_calculator.calculate(frame, done)
+        return frame[np.newaxis], reward, done, False, {"reward_components": components}
+
+
+def _wait_processed(worker, n, timeout=2.0):
+    deadline = time.time() + timeout
+    while worker.processed < n and time.time() < deadline:
+        time.sleep(0.001)
+
+
+def test_worker_keeps_every_frame_in_order():
+    calc = GatedCalculator(delay=0.002)
+    worker = AsyncRewardWorker(calc, max_queue=2)
+    for seq in range(1, 21):
+        worker.submit(seq, np.full((2, 2), seq, dtype=np.uint8), done=(seq == 20))
+    events = worker.flush()
+    worker.close()
+
+    # A full queue stalls submit() instead of dropping frames
+    assert [e.seq for e in events] == list(range(1, 21))
+    assert [e.reward for e in events] == [float(s) for s in range(1, 21)]
+    assert calc.calls[-1] == (20, True)
+    assert worker.stalls > 0
+
+
+def test_worker_flush_waits_for_pending_frames():
+    calc = GatedCalculator()
+    calc.gate.clear()
+    worker = AsyncRewardWorker(calc, max_queue=4)
+    worker.submit(1, np.full((2, 2), 1, dtype=np.uint8))
+    worker.submit(2, np.full((2, 2), 2, dtype=np.uint8), done=True)
+    assert worker.poll() == []
+    threading.Timer(0.05, calc.gate.set).start()
+    assert [e.seq for e in worker.flush()] == [1, 2]
+    worker.close()
+
+
+def test_wrapper_reports_delayed_rewards_with_their_step():
+    calc = GatedCalculator()
+    env = AsyncRewardWrapper(RewardEnv(calc, episode_len=3))
+    env.reset()
+
+    # Step 1: its frame is still being read
+    calc.gate.clear()
+    _, reward, terminated, _, info = env.step(0)
+    assert (reward, info["reward_seq"], info["delayed_rewards"]) == (0.0, 1, [])
+
+    # Step 2: step 1's reward arrives late, counted here and reported with its seq
+    calc.gate.set()
+    _wait_processed(env.worker, 1)
+    calc.gate.clear()
+    _, reward, terminated, _, info = env.step(0)
+    assert info["reward_seq"] == 2
+    assert info["delayed_rewards"] == [(1, 1.0)]
+    assert reward == 1.0
+
+    # Step 3 (terminal): flushed, so steps 2 and 3 both come in
+    calc.gate.set()
+    _, reward, terminated, _, info = env.step(0)
+    assert terminated
+    assert info["reward_seq"] == 3
+    assert info["delayed_rewards"] == [(2, 2.0)]
+    assert reward == 2.0 + 3.0
+    assert info["reward_components"] == {"value": 3}
+    env.close()
+
+
+class FakeBuffer:
+    def __init__(self, n_steps=8, n_envs=2):
+        self.rewards = np.zeros((n_steps, n_envs), dtype=np.float32)
+        self.pos = 0
+
+    def add(self, rewards):
+        self.rewards[self.pos] = rewards
+        self.pos += 1
+
+
+class PlainVecEnv:
+    """No VecNormalize: rewards go in unscaled."""
+
+
+class ScaledVecEnv:
+    """VecNormalize.normalize_reward stand-in (fixed return std of 2)."""
+    def normalize_reward(self, reward):
+        return reward / 2.0
+
+
+class FakeModel:
+    def __init__(self, buffer, env=None):
+        self.rollout_buffer = buffer
+        self.num_timesteps = 0
+        self.env = env or PlainVecEnv()
+
+    def get_env(self):
+        return self.env
+
+
+def _step(callback, buffer, rewards, infos):
+    """What PPO.collect_rollouts does around callback.on_step()."""
+    rewards = np.array(rewards, dtype=np.float32)
+    callback.update_locals({"rewards": rewards, "infos": infos})
+    callback.on_step()
+    buffer.add(rewards)
+
+
+def test_callback_moves_delayed_reward_to_its_slot():
+    buffer = FakeBuffer()
+    callback = DelayedRewardCallback()
+    callback.init_callback(FakeModel(buffer))
+    callback.on_rollout_start()
+
+    _step(callback, buffer, [0.0, 0.5], [{"reward_seq": 1, "delayed_rewards": []},
+                                         {"reward_seq": 1, "delayed_rewards": []}])
+    _step(callback, buffer, [0.0, 0.0], [{"reward_seq": 2, "delayed_rewards": []},
+                                         {"reward_seq": 2, "delayed_rewards": []}])
+    # Env 0's rewards for steps 1 and 2 arrive on step 3, after both were stored
+    _step(callback, buffer, [3.5, 0.0], [{"reward_seq": 3, "delayed_rewards": [(1, 1.0), (2, 2.0)]},
+                                         {"reward_seq": 3, "delayed_rewards": []}])
+
+    np.testing.assert_allclose(buffer.rewards[:3], [[1.0, 0.5], [2.0, 0.0], [0.5, 0.0]])
+    assert buffer.rewards[:3].sum() == 4.0 # Same total the wrapper reported
+    assert callback.credited == 2 and callback.carried_over == 0
+
+
+def test_callback_keeps_rewards_of_previous_rollout_on_current_step():
+    buffer = FakeBuffer(n_envs=1)
+    callback = DelayedRewardCallback()
+    callback.init_callback(FakeModel(buffer))
+    callback.on_rollout_start()
+    _step(callback, buffer, [0.0], [{"reward_seq": 7, "delayed_rewards": []}])
+
+    # New rollout: step 7's slot was already trained on
+    buffer.pos = 0
+    callback.on_rollout_start()
+    _step(callback, buffer, [1.0], [{"reward_seq": 8, "delayed_rewards": [(7, 1.0)]}])
+    assert buffer.rewards[0, 0] == 1.0
+    assert callback.credited == 0 and callback.carried_over == 1
+
+
+def test_callback_scales_moved_reward_like_vecnormalize():
+    buffer = FakeBuffer(n_envs=1)
+    callback = DelayedRewardCallback()
+    callback.init_callback(FakeModel(buffer, ScaledVecEnv()))
+    callback.on_rollout_start()
+    _step(callback, buffer, [0.0], [{"reward_seq": 1, "delayed_rewards": []}])
+    # Wrapper reported 4.0 on step 2 (normalized to 2.0), all of it from step 1
+    _step(callback, buffer, [2.0], [{"reward_seq": 2, "delayed_rewards": [(1, 4.0)]}])
+    np.testing.assert_allclose(buffer.rewards[:2, 0], [2.0, 0.0])
@@ -0,0 +1,77 @@
+import sys
+import os
+import cv2
+import numpy as np
+import pytest
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src'))
+
+pytest.importorskip("av")
+
+from data.frame_writer import VideoFrameWriter, VIDEO_FILE
+from env.av_decoder import AVFrameSource
+
+SHAPE = (48, 64, 3)
+N_FRAMES = 8
+
+def _frame(i):
+    # Flat blocks, so the comparison doesn't depend on chroma subsampling
+    frame = np.zeros(SHAPE, dtype=np.uint8)
+    frame[:, :32] = 20 * i
+    frame[:, 32:] = 255 - 20 * i
+    return frame
+
+FPS = 10
+
+def _write_clip(session_dir):
+    writer = VideoFrameWriter(str(session_dir), fps=FPS)
+    for i in range(N_FRAMES):
+        assert writer.submit(i, _frame(i), i / FPS)
+    writer.close()
+    return os.path.join(str(session_dir), VIDEO_FILE)
+
+def _opencv_decode(path):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+def test_av_decoder_reads_recorded_file(tmp_path):
+    path = _write_clip(tmp_path)
+    expected = _opencv_decode(path)
+    assert len(expected) == N_FRAMES
+    
+    # realtime paces decoding at the clip's 10 fps (100 ms per frame), so
+    # every frame is picked up before the next one replaces it
+    source = AVFrameSource(path, realtime=True).start()
+    frames = []
+    seq = -1
+    while True:
+        ref = source.wait_next(seq, timeout=2.0)
+        if ref is None:
+            break
+        assert ref.seq == seq + 1, f"frame {seq + 1} was skipped"
+        seq = ref.seq
+        frames.append(ref.frame)
+    source.stop()
+
+    assert source.eof
+    assert source.latest_seq == N_FRAMES - 1
+    assert len(frames) == N_FRAMES
+    for i, frame in enumerate(frames):
+        assert np.array_equal(frame, expected[i]), f"frame {i} differs from OpenCV's decode"
+        assert np.array_equal(frame, _frame(i)), f"frame {i} differs from what was written"
+
+def test_av_decoder_stop_closes_container(tmp_path):
+    path = _write_clip(tmp_path)
+    source = AVFrameSource(path, realtime=True).start()
+    source.wait_next(-1, timeout=2.0)
+    source.stop(timeout=2.0)
+    assert source._thread is None
+    assert source.eof
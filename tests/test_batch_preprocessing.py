@@ -0,0 +1,64 @@
+import sys
+import os
+import numpy as np
+import cv2
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src'))
+
+from env.batch_preprocessing import AreaDownscaler, BatchPreprocessor
+
+
+class GrayAreaPreprocessor:
+    """Same pipeline as BenjiPreprocessor: gray, then INTER_AREA to 128x128."""
+    def process_frame(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(gray, (128, 128), interpolation=cv2.INTER_AREA)[np.newaxis, :, :]
+
+
+class ResizeFirstPreprocessor:
+    """Different order: the fast path must not be used for it."""
+    def process_frame(self, frame):
+        small = cv2.resize(frame, (128, 128), interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)[np.newaxis, :, :]
+
+
+def make_frames(n):
+    rng = np.random.default_rng(0)
+    frames = rng.integers(0, 256, (n, 448, 800, 3), dtype=np.uint8)
+    # Smooth regions too, where rounding sits close to .5 more often
+    frames[:, :200] = np.linspace(0, 255, 800, dtype=np.uint8)[None, None, :, None]
+    return frames
+
+
+def test_matches_process_frame():
+    preprocessor = GrayAreaPreprocessor()
+    batch = BatchPreprocessor(preprocessor)
+    frames = make_frames(11)
+    out = np.empty((11, 128, 128), dtype=np.uint8)
+    assert batch.process_batch(frames, out) is out
+    expected = np.stack([preprocessor.process_frame(f)[0] for f in frames])
+    assert np.array_equal(out, expected)
+    assert batch._fast[(448, 800, 3)] is not None
+
+    # Lists, with a corrupted (None) frame
+    frames = list(frames)
+    frames[3] = None
+    out = batch.process_batch(frames)
+    expected[3] = 0
+    assert np.array_equal(out, expected)
+
+
+def test_falls_back_when_pipeline_differs():
+    preprocessor = ResizeFirstPreprocessor()
+    batch = BatchPreprocessor(preprocessor)
+    frames = make_frames(3)
+    out = batch.process_batch(frames)
+    assert batch._fast[(448, 800, 3)] is None
+    assert np.array_equal(out, np.stack([preprocessor.process_frame(f)[0] for f in frames]))
+
+
+def test_unsupported_scales():
+    assert AreaDownscaler((800, 448), (128, 128)).supported
+    assert not AreaDownscaler((512, 512), (128, 128)).supported # Integer scale
+    assert not AreaDownscaler((100, 100), (128, 128)).supported # Upscale
@@ -0,0 +1,58 @@
+import sys
+import os
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src'))
+
+from env.color_mask import ColorMaskLUT, reference_color_mask, hsv_class_masks, BENJI, BANANA, VINE
+
+
+def make_scene(high=255):
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, high, (128, 128, 3), dtype=np.uint8)
+    img[10:40, 10:40] = (164, 217, 253) # Benji
+    img[60:62, 0:128] = (21, 181, 255) # Vine, thin
+    img[90:93, 50:53] = (8, 240, 253) # Banana, small
+    img[30:50, 30:33] = (21, 181, 255) # Vine across Benji's corner
+    return img
+
+
+# Scene colours plus neutral ones, well inside or well outside the HSV ranges
+REFERENCE_PIXELS = [
+    (164, 217, 253), # Benji
+    (21, 181, 255), # Vine
+    (8, 240, 253), # Banana
+    (0, 0, 0), (255, 255, 255), (128, 128, 128),
+    (235, 206, 135), # Sky blue
+    (34, 139, 34), # Green
+]
+
+
+def test_table_classifies_reference_pixels():
+    lut = ColorMaskLUT(bits=6)
+    img = np.array([REFERENCE_PIXELS], dtype=np.uint8)
+    benji, vine, banana = hsv_class_masks(img)
+    expected_low = np.where(vine, VINE, np.where(banana, BANANA, 0))
+    entries = lut.lut[lut.index(img)]
+    np.testing.assert_array_equal(entries & 0xFF, expected_low)
+    np.testing.assert_array_equal(entries >> 8, np.where(benji, BENJI, 0))
+    assert (entries[0, :3] != 0).all() and (entries[0, 3:] == 0).all()
+
+
+def test_scene_classes():
+    img = make_scene()
+    out = ColorMaskLUT(bits=6).apply(img)
+    assert out[20, 20] == BENJI
+    assert out[61, 64] == VINE and out[59, 64] == VINE # Dilated
+    assert out[91, 51] == BANANA
+
+
+def test_quantized_table():
+    # Quantization only moves colours right at the range edges, so stay clear
+    # of them in the background
+    img = make_scene(high=150)
+    lut = ColorMaskLUT(bits=6)
+    assert lut.lut.size == 64 ** 3
+    assert np.array_equal(lut.apply(img), reference_color_mask(img))
+    assert lut.process_frame(np.zeros((448, 800, 3), dtype=np.uint8)).shape == (1, 128, 128)
@@ -0,0 +1,131 @@
+import sys
+import os
+import shutil
+import numpy as np
+import pytest
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src'))
+
+from env.frame_ring import FrameRef
+from env.compact_capture import CompactCapture
+
+ROIS = {"dist": (4, 2, 6, 3), "banana": (10, 8, 5, 4)}
+
+
+def test_build_command_maps_each_output_to_its_pipe():
+    capture = CompactCapture("in.fifo", frame_size=(32, 16), obs_size=(8, 4), rois=ROIS,
+                             full_res=True, ffmpeg_path="/opt/ffmpeg", realtime=True)
+    cmd = capture.build_command([11, 12, 13, 14])
+
+    assert cmd[:5] == ["/opt/ffmpeg", "-loglevel", "error", "-nostdin", "-re"]
+    assert cmd[cmd.index("-i") + 1] == "in.fifo"
+    graph = cmd[cmd.index("-filter_complex") + 1]
+    assert graph == ("[0:v]split=4[s0][s1][s2][s3]"
+                     ";[s0]scale=8:4:flags=area,format=gray[obs]"
+                     ";[s1]crop=6:3:4:2,format=bgr24[dist]"
+                     ";[s2]crop=5:4:10:8,format=bgr24[banana]"
+                     ";[s3]format=bgr24[full]")
+    maps = cmd[cmd.index("-map"):]
+    assert maps == ["-map", "[obs]", "-f", "rawvideo", "-pix_fmt", "gray", "pipe:11",
+                    "-map", "[dist]", "-f", "rawvideo", "-pix_fmt", "bgr24", "pipe:12",
+                    "-map", "[banana]", "-f", "rawvideo", "-pix_fmt", "bgr24", "pipe:13",
+                    "-map", "[full]", "-f", "rawvideo", "-pix_fmt", "bgr24", "pipe:14"]
+
+
+def test_build_command_defaults():
+    cmd = CompactCapture("clip.mkv").build_command([3, 4, 5])
+    assert "-re" not in cmd
+    assert cmd.count("-map") == 3 # obs + the two default HUD ROIs
+
+
+class ScriptedReader:
+    """FrameRingReader stand-in: frames arrive with the scripted sequence numbers, then EOF."""
+    def __init__(self, seqs, shape=(2, 2)):
+        self.seqs = seqs
+        self.shape = shape
+        self.pos = 0
+
+    def wait_next(self, after_seq=-1, timeout=None):
+        while self.pos < len(self.seqs) and self.seqs[self.pos] <= after_seq:
+            self.pos += 1
+        if self.pos == len(self.seqs):
+            return None
+        seq = self.seqs[self.pos]
+        return FrameRef(seq, float(seq), np.full(self.shape, seq, dtype=np.uint8))
+
+
+def _capture_with(readers):
+    capture = CompactCapture("unused")
+    capture.readers = readers
+    return capture
+
+
+def test_get_views_in_lockstep():
+    capture = _capture_with({"obs": ScriptedReader([0, 1]), "dist": ScriptedReader([0, 1])})
+    seq, timestamp, views = capture.get_views()
+    assert (seq, timestamp) == (0, 0.0)
+    assert views["obs"][0, 0] == 0 and views["dist"][0, 0] == 0
+    assert capture.get_views(seq)[0] == 1
+
+
+def test_get_views_realigns_on_newest_common_frame():
+    # The ROI pipe already lapped frames 5 and 6; obs catches up later
+    capture = _capture_with({"obs": ScriptedReader([5, 6, 7, 8]),
+                             "dist": ScriptedReader([7, 8]),
+                             "banana": ScriptedReader([6, 8])})
+    seq, _, views = capture.get_views(4)
+    assert seq == 8
+    assert all(view[0, 0] == 8 for view in views.values())
+    assert set(views) == {"obs", "dist", "banana"}
+
+
+def test_get_views_end_of_stream():
+    assert _capture_with({"obs": ScriptedReader([])}).get_views() is None
+    # An auxiliary output ends first
+    capture = _capture_with({"obs": ScriptedReader([0, 1]), "dist": ScriptedReader([0])})
+    assert capture.get_views()[0] == 0
+    assert capture.get_views(0) is None
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="needs /proc to count open fds")
+def test_start_failure_closes_pipes(tmp_path):
+    before = len(os.listdir("/proc/self/fd"))
+    for _ in range(3):
+        capture = CompactCapture("in.fifo", ffmpeg_path=str(tmp_path / "no-ffmpeg"))
+        with pytest.raises(FileNotFoundError):
+            capture.start()
+        assert capture._pipes == []
+    assert len(os.listdir("/proc/self/fd")) == before
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not on PATH")
+def test_compact_capture_reads_video(tmp_path):
+    from data.frame_writer import VideoFrameWriter, VIDEO_FILE
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (16, 32, 3), dtype=np.uint8) for _ in range(5)]
+    writer = VideoFrameWriter(str(tmp_path), fps=10)
+    for i, frame in enumerate(frames):
+        writer.submit(i, frame, i / 10)
+    writer.close()
+
+    capture = CompactCapture(os.path.join(str(tmp_path), VIDEO_FILE), frame_size=(32, 16),
+                             obs_size=(8, 4), rois=ROIS, full_res=True, ring_size=len(frames) + 1).start()
+    results = []
+    seq = -1
+    while True:
+        out = capture.get_views(seq, timeout=5.0)
+        if out is None:
+            break
+        seq, _, views = out
+        results.append((seq, {name: view.copy() for name, view in views.items()}))
+    capture.stop()
+
+    # get_views() returns the newest frame, so a fast ffmpeg may skip some
+    seqs = [s for s, _ in results]
+    assert seqs == sorted(set(seqs)) and seqs[-1] == len(frames) - 1
+    for seq, views in results:
+        assert views["obs"].shape == (4, 8)
+        np.testing.assert_array_equal(views["full"], frames[seq])
+        x, y, w, h = ROIS["dist"]
+        np.testing.assert_array_equal(views["dist"], frames[seq][y:y + h, x:x + w])
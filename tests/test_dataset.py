@@ -0,0 +1,196 @@
+import sys
+import os
+import types
+from collections import namedtuple
+import cv2
+import numpy as np
+import pytest
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src'))
+
+
+class StubPreprocessor:
+    """Cheap stand-in for BenjiPreprocessor: the frame's value (+ OFFSET) as a flat 128x128 frame."""
+    OFFSET = 0
+
+    def __init__(self):
+        self.offset = self.OFFSET
+
+    def process_frame(self, raw_bgr):
+        return np.full((1, 128, 128), (int(raw_bgr[0, 0, 0]) + self.offset) % 256, dtype=np.uint8)
+
+
+# agent.dataset imports env.preprocessing at load time; the tests never use
+# the real one, so a checkout without it (CI) still collects them
+try:
+    import env.preprocessing # noqa: F401
+except ImportError:
+    stub = types.ModuleType("env.preprocessing")
+    stub.BenjiPreprocessor = StubPreprocessor
+    sys.modules["env.preprocessing"] = stub
+
+import agent.dataset as dataset
+from agent.dataset import (BenjiBCDataset, BenjiBCStreamDataset, build_frame_store,
+                           stack_indices, collate_batch)
+
+SESSION_LENGTHS = [3, 5, 2]
+
+
+def _write_frame(path, value):
+    # PNG bytes under the collector's .jpg name: imread sniffs the format, and it's lossless
+    ok, buf = cv2.imencode(".png", np.full((16, 16, 3), value, dtype=np.uint8))
+    with open(path, 'wb') as f:
+        f.write(buf.tobytes())
+
+
+def _frame_value(session, k):
+    return 10 * (session + 1) + k # Never 0, so padding stands out
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset, "BenjiPreprocessor", StubPreprocessor)
+    root = tmp_path / "raw"
+    for s, length in enumerate(SESSION_LENGTHS):
+        session = root / f"session_{s:03d}"
+        (session / "frames").mkdir(parents=True)
+        with open(session / "actions.csv", 'w') as f:
+            f.write("frame_id,action\n")
+            for k in range(length):
+                f.write(f"{k},{(s + k) % 3}\n")
+                _write_frame(str(session / "frames" / f"frame_{k:06d}.jpg"), _frame_value(s, k))
+    return str(root)
+
+
+def _expected_stacks():
+    """Chronological, zero-padded stacks for every sample, session by session."""
+    stacks = []
+    for s, length in enumerate(SESSION_LENGTHS):
+        for k in range(length):
+            stack = [_frame_value(s, j) if j >= 0 else 0 for j in range(k - 3, k + 1)]
+            stacks.append(stack)
+    return np.array(stacks, dtype=np.uint8)
+
+
+def _stack_values(states):
+    # Stub frames are flat: one value per stacked frame
+    return states.numpy()[..., 0, 0]
+
+
+def test_stack_indices_pad_at_session_start():
+    np.testing.assert_array_equal(stack_indices(5, 3, 4), [[-1, -1, -1, 5],
+                                                           [-1, -1, 5, 6],
+                                                           [-1, 5, 6, 7]])
+    assert stack_indices(0, 0, 4).shape == (0, 4)
+
+
+def test_dataset_stacks_never_cross_sessions(data_dir):
+    ds = BenjiBCDataset(data_dir, num_workers=1)
+    assert len(ds) == sum(SESSION_LENGTHS)
+    states = np.stack([_stack_values(ds[i][0]) for i in range(len(ds))])
+    np.testing.assert_array_equal(states, _expected_stacks())
+
+
+def test_getitems_matches_getitem(data_dir):
+    ds = BenjiBCDataset(data_dir, num_workers=1)
+    indices = [0, 3, 4, 7, len(ds) - 1, 3]
+    states, actions = collate_batch(ds.__getitems__(indices))
+    assert states.shape == (len(indices), 4, 128, 128)
+    for b, i in enumerate(indices):
+        state, action = ds[i]
+        assert state.dtype == states.dtype and state.shape == states[b].shape
+        assert (state == states[b]).all()
+        assert int(action) == int(actions[b])
+
+
+def test_frame_store_matches_in_memory_dataset(data_dir, tmp_path):
+    store_dir = str(tmp_path / "processed")
+    build_frame_store(data_dir, store_dir, num_workers=1)
+    in_ram = BenjiBCDataset(data_dir, num_workers=1)
+
+    # Opened twice: the store is reused as is, nothing is decoded again
+    for _ in range(2):
+        stored = BenjiBCDataset(store_dir=store_dir)
+        assert isinstance(stored.frames, np.memmap)
+        np.testing.assert_array_equal(stored.frames, in_ram.frames)
+        np.testing.assert_array_equal(stored.stack_indices, in_ram.stack_indices)
+        np.testing.assert_array_equal(stored.actions, in_ram.actions)
+
+
+@pytest.fixture
+def decoded(monkeypatch):
+    """Frames decoded per BenjiBCDataset build (cache misses)."""
+    counts = []
+    real_decode_into = dataset.decode_into
+
+    def counting_decode_into(out, positions, img_paths, videos, *args, **kwargs):
+        counts.append(len(positions) + sum(len(v[2]) for v in videos))
+        return real_decode_into(out, positions, img_paths, videos, *args, **kwargs)
+    monkeypatch.setattr(dataset, "decode_into", counting_decode_into)
+    return counts
+
+
+def test_cache_reused_until_session_changes(data_dir, tmp_path, decoded):
+    cache_dir = str(tmp_path / "cache")
+    first = BenjiBCDataset(data_dir, num_workers=1, cache_dir=cache_dir)
+    second = BenjiBCDataset(data_dir, num_workers=1, cache_dir=cache_dir)
+    assert decoded == [sum(SESSION_LENGTHS), 0]
+    np.testing.assert_array_equal(first.frames, second.frames)
+
+    # Collector rewrites a frame of session 1: only that session is decoded again
+    _write_frame(os.path.join(data_dir, "session_001", "frames", "frame_000002.jpg"), 200)
+    third = BenjiBCDataset(data_dir, num_workers=1, cache_dir=cache_dir)
+    assert decoded[-1] == SESSION_LENGTHS[1]
+    changed = SESSION_LENGTHS[0] + 2
+    assert third.frames[changed, 0, 0] == 200
+    np.testing.assert_array_equal(np.delete(third.frames, changed, axis=0),
+                                  np.delete(first.frames, changed, axis=0))
+
+
+def test_cache_invalidated_by_preprocessor_change(data_dir, tmp_path, decoded, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    BenjiBCDataset(data_dir, num_workers=1, cache_dir=cache_dir)
+    monkeypatch.setattr(StubPreprocessor, "OFFSET", 1)
+    ds = BenjiBCDataset(data_dir, num_workers=1, cache_dir=cache_dir)
+    assert decoded == [sum(SESSION_LENGTHS)] * 2
+    assert ds.frames[0, 0, 0] == _frame_value(0, 0) + 1
+
+
+WorkerInfo = namedtuple("WorkerInfo", ["id", "num_workers"])
+
+
+def test_stream_workers_split_sessions(data_dir, monkeypatch):
+    ds = BenjiBCStreamDataset(data_dir, shuffle_buffer=4)
+    everything, _ = ds._worker_sessions()
+    assert sorted(everything) == ds.session_dirs
+
+    shares = []
+    for worker_id in range(2):
+        monkeypatch.setattr(dataset, "get_worker_info", lambda: WorkerInfo(worker_id, 2))
+        sessions, wid = ds._worker_sessions()
+        assert wid == worker_id
+        shares.append(sessions)
+    assert not set(shares[0]) & set(shares[1])
+    assert sorted(shares[0] + shares[1]) == ds.session_dirs
+
+
+def test_stream_shuffle_depends_on_epoch(data_dir):
+    ds = BenjiBCStreamDataset(data_dir, shuffle_buffer=4, seed=0)
+    orders = {}
+    for epoch in range(4):
+        ds.set_epoch(epoch)
+        orders[epoch] = [tuple(_stack_values(state)) for state, _ in ds]
+        ds.set_epoch(epoch)
+        assert [tuple(_stack_values(state)) for state, _ in ds] == orders[epoch] # Reproducible
+        # Same samples as the map-style dataset, just reordered
+        assert sorted(orders[epoch]) == sorted(map(tuple, _expected_stacks()))
+    assert len(set(map(tuple, orders.values()))) > 1
+
+
+def test_stream_len_counts_only_existing_frames(data_dir):
+    # Collector dropped a frame: its actions.csv row stays, the JPEG is missing
+    os.remove(os.path.join(data_dir, "session_001", "frames", "frame_000003.jpg"))
+    ds = BenjiBCStreamDataset(data_dir, shuffle_buffer=4)
+    assert len(ds) == sum(SESSION_LENGTHS) - 1
+    assert len(ds) == len(list(ds)) == len(BenjiBCDataset(data_dir, num_workers=1))
@@ -0,0 +1,93 @@
+import sys
+import os
+import gc
+import weakref
+import cv2
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src'))
+
+from env.frame_context import FrameContext, FrameContextStats
+
+RECT = (30, 10, 25, 12)
+
+
+def _frame(seed=0):
+    return np.random.default_rng(seed).integers(0, 256, (90, 160, 3), dtype=np.uint8)
+
+
+def test_views_computed_once_and_counted():
+    ctx = FrameContext(_frame())
+    first = ctx.small_gray((32, 18))
+    assert ctx.small_gray((32, 18)) is first
+    assert ctx.small_gray((32, 18)) is first
+    assert ctx.stats.misses["small_gray 32x18"] == 1
+    assert ctx.stats.hits["small_gray 32x18"] == 2
+    # The full gray it was built from is a view of its own, computed once
+    assert ctx.stats.misses["gray"] == 1
+    assert ctx.gray is ctx.gray
+    assert ctx.stats.misses["gray"] == 1 and ctx.stats.hits["gray"] == 2
+
+    summary = ctx.stats.summary()
+    assert summary["small_gray 32x18"]["hits"] == 2
+    assert summary["small_gray 32x18"]["misses"] == 1
+    assert ctx.stats.saved_ms() >= 0
+
+
+def test_roi_gray_alone_is_converted_once():
+    ctx = FrameContext(_frame())
+    first = ctx.roi_gray(RECT)
+    assert ctx.roi_gray(RECT) is first
+    key = "roi_gray 30,10,25,12"
+    assert (ctx.stats.misses[key], ctx.stats.hits[key]) == (1, 1)
+    assert "gray" not in ctx.stats.misses # No full-frame conversion for a crop
+
+
+def test_roi_gray_matches_cvtcolor_of_crop():
+    frame = _frame()
+    x, y, w, h = RECT
+    expected = cv2.cvtColor(frame[y:y + h, x:x + w], cv2.COLOR_BGR2GRAY)
+
+    alone = FrameContext(frame)
+    np.testing.assert_array_equal(alone.roi_gray(RECT), expected)
+
+    # Sliced from the full gray once that exists
+    sliced = FrameContext(frame)
+    sliced.gray
+    np.testing.assert_array_equal(sliced.roi_gray(RECT), expected)
+    assert sliced.stats.misses["roi_gray 30,10,25,12"] == 0
+    assert sliced.stats.hits["roi_gray 30,10,25,12"] == 1
+
+
+def test_views_match_standalone_opencv():
+    frame = _frame()
+    ctx = FrameContext(frame)
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    np.testing.assert_array_equal(ctx.gray, gray)
+    np.testing.assert_array_equal(ctx.hsv, cv2.cvtColor(frame, cv2.COLOR_BGR2HSV))
+    for size in [(128, 128), (32, 18)]:
+        np.testing.assert_array_equal(ctx.small_gray(size), cv2.resize(gray, size, interpolation=cv2.INTER_AREA))
+    x, y, w, h = RECT
+    np.testing.assert_array_equal(ctx.roi(RECT), frame[y:y + h, x:x + w])
+
+
+def test_next_links_prev_and_cuts_chain():
+    stats = FrameContextStats()
+    first = FrameContext(_frame(0), stats=stats)
+    second = first.next(_frame(1))
+    assert second.prev is first and second.seq == 1
+    assert second.stats is stats
+
+    third = second.next(_frame(2))
+    assert third.prev is second and third.seq == 2
+    # Only one step of history: the first frame is no longer reachable
+    assert second.prev is None
+    first_ref = weakref.ref(first)
+    del first
+    gc.collect()
+    assert first_ref() is None
+
+    # Views of prev stay available (motion terms)
+    third.prev.small_gray((32, 18))
+    assert stats.misses["small_gray 32x18"] == 1
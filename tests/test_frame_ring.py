@@ -0,0 +1,50 @@
+import sys
+import os
+import threading
+import time
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src'))
+
+from env.frame_ring import FrameRingReader
+
+SHAPE = (8, 10, 3)
+
+def _feed(write_fd, n_frames):
+    with os.fdopen(write_fd, 'wb') as w:
+        for i in range(n_frames):
+            w.write(np.full(SHAPE, i, dtype=np.uint8).tobytes())
+            w.flush()
+            time.sleep(0.005) # Paced like a real stream, so the ring never laps the reader
+
+def test_frame_ring_sequence_and_latest():
+    read_fd, write_fd = os.pipe()
+    stream = os.fdopen(read_fd, 'rb', buffering=0)
+    reader = FrameRingReader(stream, frame_shape=SHAPE, ring_size=3).start()
+    
+    assert reader.latest() is None
+    
+    feeder = threading.Thread(target=_feed, args=(write_fd, 10))
+    feeder.start()
+    
+    seen = []
+    seq = -1
+    while True:
+        ref = reader.wait_next(seq, timeout=2.0)
+        if ref is None:
+            break
+        # Each frame is complete and matches its sequence number
+        assert ref.frame.shape == SHAPE
+        assert (ref.frame == ref.seq).all()
+        # Borrowed ring memory: read-only, so writers know to copy it
+        assert not ref.frame.flags.writeable and not ref.frame.flags.owndata
+        seen.append(ref.seq)
+        seq = ref.seq
+    feeder.join()
+    
+    assert reader.eof
+    assert seen == sorted(seen) and seen[-1] == 9
+    assert reader.latest().seq == 9
+    reader.stop()
+    stream.close()
@@ -0,0 +1,50 @@
+import sys
+import os
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src'))
+
+from data.frame_writer import (AsyncFrameWriter, VideoFrameWriter, VIDEO_FILE,
+                               read_video_index, iter_video_frames)
+
+SHAPE = (16, 32, 3)
+
+
+def _borrowed(buffer):
+    """Read-only view, like a FrameRingReader frame."""
+    view = buffer.view()
+    view.flags.writeable = False
+    return view
+
+
+def test_jpeg_writer_copies_borrowed_frames(tmp_path):
+    # No writer threads: submitted frames stay queued, like behind a backlog
+    writer = AsyncFrameWriter(str(tmp_path), num_threads=0)
+    ring = np.zeros(SHAPE, dtype=np.uint8)
+    assert writer.submit(0, _borrowed(ring))
+    ring[:] = 255 # Slot refilled with a newer frame
+    _, queued = writer.queue.get_nowait()
+    assert queued.max() == 0
+
+
+def test_owned_frames_are_not_copied(tmp_path):
+    writer = AsyncFrameWriter(str(tmp_path), num_threads=0)
+    frame = np.zeros(SHAPE, dtype=np.uint8)
+    assert writer.submit(0, frame)
+    assert writer.queue.get_nowait()[1] is frame
+
+
+def test_video_writer_copies_borrowed_frames(tmp_path):
+    ring = np.zeros((2, *SHAPE), dtype=np.uint8)
+    writer = VideoFrameWriter(str(tmp_path), fps=10)
+    for i in range(6):
+        slot = ring[i % 2] # Two-slot ring: refilled while earlier frames may still be queued
+        slot[:] = 40 * i
+        assert writer.submit(i, _borrowed(slot), i / 10)
+    writer.close()
+
+    index = read_video_index(str(tmp_path))
+    frames = list(iter_video_frames(os.path.join(str(tmp_path), VIDEO_FILE), [index[i] for i in range(6)]))
+    for i, frame in enumerate(frames):
+        assert np.array_equal(frame, np.full(SHAPE, 40 * i, dtype=np.uint8)), f"frame {i} was overwritten"
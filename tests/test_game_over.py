@@ -0,0 +1,48 @@
+import sys
+import os
+import numpy as np
+import cv2
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src'))
+
+from env.game_over import GameOverDetector, DEFAULT_ROI
+
+
+def make_screens(tmp_path):
+    rng = np.random.default_rng(0)
+    # Death screen: a grey "stone" with some structure where the template is cut
+    death = rng.integers(0, 255, (448, 800, 3), dtype=np.uint8)
+    x, y, w, h = DEFAULT_ROI
+    stone = np.full((h, w, 3), 120, dtype=np.uint8)
+    cv2.circle(stone, (60, 95), 50, (200, 200, 200), -1)
+    cv2.rectangle(stone, (20, 20), (100, 40), (40, 40, 40), -1)
+    death[y:y + h, x:x + w] = stone
+    path = str(tmp_path / "game_start.jpg")
+    cv2.imwrite(path, stone)
+    
+    # Gameplay: jungle green in that corner
+    gameplay = death.copy()
+    gameplay[y:y + h, x:x + w] = (40, 140, 60)
+    return path, death, gameplay
+
+
+def test_detects_death_screen(tmp_path):
+    path, death, gameplay = make_screens(tmp_path)
+    detector = GameOverDetector(path, check_interval=1)
+    assert detector.check(death)
+    # Small shift of the overlay is still caught
+    assert detector.check(np.roll(death, 4, axis=0))
+    assert not detector.check(gameplay)
+    assert detector.prefilter_rejects == 1
+
+
+def test_check_interval(tmp_path):
+    path, death, gameplay = make_screens(tmp_path)
+    detector = GameOverDetector(path, check_interval=3)
+    hits = [detector.detect(death) for _ in range(6)]
+    assert hits == [True, False, False, True, False, False]
+    # Gameplay frames never reach the template match
+    for _ in range(6):
+        assert not detector.detect(gameplay)
+    assert detector.matches == 2
@@ -0,0 +1,59 @@
+import sys
+import os
+import numpy as np
+import cv2
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src'))
+
+from env.glyph_ocr import GlyphOCR
+
+ROIS = {"dist": (715, 39, 55, 19), "banana": (715, 59, 55, 19)}
+
+
+def make_digits(digits_dir):
+    # Same glyphs the HUD mock in benchmark_reward.py uses
+    for i in range(10):
+        img = np.zeros((20, 15), dtype=np.uint8)
+        cv2.putText(img, str(i), (2, 15), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255), 1)
+        cv2.imwrite(os.path.join(digits_dir, f"{i}.png"), img)
+
+
+def make_frame(dist, bananas, bg=(40, 120, 60)):
+    frame = np.zeros((448, 800, 3), dtype=np.uint8)
+    frame[:] = bg
+    cv2.putText(frame, str(dist), (720, 55), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+    cv2.putText(frame, str(bananas), (720, 75), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+    return frame
+
+
+def test_reads_counters_on_varied_backgrounds(tmp_path):
+    make_digits(str(tmp_path))
+    ocr = GlyphOCR(str(tmp_path))
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        dist = int(rng.integers(0, 10000))
+        bananas = int(rng.integers(0, 1000))
+        bg = tuple(int(c) for c in rng.integers(0, 150, 3))
+        assert ocr.read_frame(make_frame(dist, bananas, bg), ROIS) == {"dist": dist, "banana": bananas}
+
+
+def test_touching_digits_are_split(tmp_path):
+    # The 4s' crossbars join into one column run
+    make_digits(str(tmp_path))
+    ocr = GlyphOCR(str(tmp_path))
+    assert ocr.read_frame(make_frame(4444, 44), ROIS) == {"dist": 4444, "banana": 44}
+
+
+def test_blank_roi_and_unchanged_skip(tmp_path):
+    make_digits(str(tmp_path))
+    ocr = GlyphOCR(str(tmp_path))
+    blank = np.zeros((448, 800, 3), dtype=np.uint8)
+    assert ocr.read_frame(blank, ROIS) == {"dist": None, "banana": None}
+    
+    frame = make_frame(123, 45)
+    ocr.read_frame(frame, ROIS)
+    misses = ocr.misses
+    assert ocr.read_frame(frame.copy(), ROIS) == {"dist": 123, "banana": 45}
+    assert ocr.misses == misses
+    assert ocr.hits == 2
@@ -0,0 +1,57 @@
+import sys
+import os
+import numpy as np
+import torch.nn as nn
+from stable_baselines3 import PPO
+from stable_baselines3.common.torch_layers import BaseFeaturesExtractor
+from stable_baselines3.common.vec_env import VecNormalize
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src'))
+
+from env.surrogate_sim import make_sim_venv
+from agent.inference import export_policy, PolicyRuntime
+
+
+class SmallCNN(BaseFeaturesExtractor):
+    """CustomCNN stand-in (agent.model needs the device env to import)."""
+    def __init__(self, observation_space, features_dim=32):
+        super().__init__(observation_space, features_dim)
+        self.net = nn.Sequential(
+            nn.Conv2d(observation_space.shape[0], 8, kernel_size=8, stride=8),
+            nn.ReLU(),
+            nn.Flatten(),
+            nn.Linear(8 * 16 * 16, features_dim),
+            nn.ReLU(),
+        )
+
+    def forward(self, observations):
+        return self.net(observations)
+
+
+def test_exported_policy_matches_sb3(tmp_path):
+    venv = VecNormalize(make_sim_venv(num_envs=1), norm_obs=True, norm_reward=True)
+    rng = np.random.default_rng(0)
+    venv.obs_rms.mean = rng.uniform(0, 100, venv.obs_rms.mean.shape)
+    venv.obs_rms.var = rng.uniform(10, 5000, venv.obs_rms.var.shape)
+    venv.training = False
+    model = PPO("CnnPolicy", venv, n_steps=16, batch_size=16, device="cpu",
+                policy_kwargs={"features_extractor_class": SmallCNN, "normalize_images": True})
+
+    path = str(tmp_path / "policy.pt")
+    meta = export_policy(model, path, venv=venv)
+    assert meta["normalized"] and meta["obs_shape"] == [4, 128, 128]
+    runtime = PolicyRuntime(path)
+
+    # Same rollout through VecFrameStack + VecNormalize and through the runtime's own stack
+    obs = venv.reset()
+    runtime.reset()
+    raw = venv.get_original_obs()
+    for _ in range(40):
+        expected, _ = model.predict(obs, deterministic=True)
+        assert runtime.act(raw[0, -1:]) == int(expected[0])
+        obs, _, dones, _ = venv.step(expected)
+        raw = venv.get_original_obs()
+        if dones[0]:
+            runtime.reset()
+    assert len(runtime.stats.samples["inference"]) == 40
@@ -0,0 +1,102 @@
+import sys
+import os
+import numpy as np
+import pytest
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src'))
+
+from agent.pipeline import PolicyRunner, LatencyStats
+
+EPISODE_LEN = 4
+
+
+class CountingVecEnv:
+    """
+    One-env VecEnv stand-in: the obs after step t is t, episodes last
+    EPISODE_LEN steps and the auto-reset obs of episode e is 100 + e.
+    Records every action it receives.
+    """
+    def __init__(self):
+        self.t = 0
+        self.episode = 0
+        self.actions = [] # (obs the action was applied to, action)
+        self._obs = None
+
+    def reset(self):
+        self._obs = np.array([[100 + self.episode]])
+        return self._obs
+
+    def step(self, action):
+        self.actions.append((int(self._obs[0, 0]), int(action[0])))
+        self.t += 1
+        done = self.t % EPISODE_LEN == 0
+        if done:
+            self.episode += 1
+            self._obs = np.array([[100 + self.episode]])
+        else:
+            self._obs = np.array([[self.t]])
+        return self._obs, np.zeros(1), np.array([done]), [{}]
+
+
+class EchoModel:
+    """Stub policy: the action is the obs it was computed from, so the env log shows what was decided from what."""
+    def predict(self, obs, deterministic=True):
+        return np.array([int(obs[0, 0])]), None
+
+
+def _run(pipelined, steps):
+    env = CountingVecEnv()
+    runner = PolicyRunner(EchoModel(), env, pipelined=pipelined)
+    runner.reset()
+    observations = [int(runner.step()[0][0, 0]) for _ in range(steps)]
+    runner.close()
+    return env, runner, observations
+
+
+def test_serial_acts_on_current_obs():
+    env, _, _ = _run(pipelined=False, steps=3)
+    assert env.actions == [(100, 100), (1, 1), (2, 2)]
+
+
+def test_pipelined_acts_one_step_late():
+    env, _, _ = _run(pipelined=True, steps=3)
+    # runner.step() N returns env step N and has submitted env step N + 1
+    assert len(env.actions) == 4
+    # Step 1 has no earlier obs; after that each step carries the action
+    # decided from the obs before the one it is applied to
+    assert env.actions == [(100, 100), (1, 100), (2, 1), (3, 2)]
+
+
+def test_pipelined_reset_drops_stale_action():
+    env, _, observations = _run(pipelined=True, steps=EPISODE_LEN + 1)
+    assert observations[EPISODE_LEN - 1] == 101 # Auto-reset obs
+    # Without the reset check, the new episode would start with the action
+    # decided from obs 3 of the old one
+    assert env.actions[EPISODE_LEN] == (101, 101)
+
+
+def test_runner_records_documented_timings():
+    _, runner, _ = _run(pipelined=True, steps=3)
+    summary = runner.stats.summary()
+    assert set(summary) == {"inference", "env_step", "decision", "loop"}
+    assert len(runner.stats.samples["env_step"]) == 4
+    assert len(runner.stats.samples["loop"]) == 3 # Between consecutive submits
+
+
+def test_latency_stats_summary(capsys):
+    stats = LatencyStats()
+    for ms in range(1, 101):
+        stats.record("step", ms / 1000)
+    stats.record("other", 0.002)
+    summary = stats.summary()
+    assert set(summary) == {"step", "other"}
+    assert set(summary["step"]) == {"mean", "p95", "max"}
+    assert summary["step"]["mean"] == pytest.approx(50.5)
+    assert summary["step"]["p95"] == pytest.approx(np.percentile(np.arange(1, 101), 95))
+    assert summary["step"]["max"] == pytest.approx(100.0)
+    assert summary["other"] == pytest.approx({"mean": 2.0, "p95": 2.0, "max": 2.0})
+
+    stats.report("TEST")
+    out = capsys.readouterr().out
+    assert "--- TEST ---" in out and "p95" in out and "step" in out
@@ -0,0 +1,108 @@
+import sys
+import os
+import time
+import cv2
+import numpy as np
+import pytest
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src'))
+
+from env.replay_client import ReplayClient
+
+N_FRAMES = 6
+
+
+@pytest.fixture
+def session_dir(tmp_path):
+    """JPEG-mode session whose frame i is flat with value 10 * (i + 1)."""
+    session = tmp_path / "session_000"
+    (session / "frames").mkdir(parents=True)
+    with open(session / "actions.csv", 'w') as f:
+        f.write("frame_id,action\n")
+        for i in range(N_FRAMES):
+            f.write(f"{i},0\n")
+            # PNG bytes under the collector's .jpg name: imread sniffs the format, and it's lossless
+            ok, buf = cv2.imencode(".png", np.full((8, 8, 3), 10 * (i + 1), dtype=np.uint8))
+            with open(session / "frames" / f"frame_{i:06d}.jpg", 'wb') as img:
+                img.write(buf.tobytes())
+    return str(session)
+
+
+def _value(frame):
+    return int(frame[0, 0, 0])
+
+
+def _drain(client, limit=100):
+    values = []
+    for _ in range(limit):
+        frame = client.get_frame()
+        if frame is None:
+            break
+        values.append(_value(frame))
+    return values
+
+
+@pytest.mark.parametrize("preload", [False, True])
+def test_step_locked_replay_is_deterministic(session_dir, preload):
+    runs = []
+    for _ in range(2):
+        client = ReplayClient(session_dir, fps=None, loop=False, preload=preload).start()
+        runs.append(_drain(client))
+        client.stop()
+    assert runs[0] == runs[1] == [10 * (i + 1) for i in range(N_FRAMES)]
+
+
+def test_step_locked_signals_end_of_source(session_dir):
+    client = ReplayClient(session_dir, fps=None, loop=False).start()
+    assert len(_drain(client)) == N_FRAMES
+    assert client.eof
+    assert client.get_frame() is None
+    assert client.frames_served == N_FRAMES
+
+
+def test_step_locked_loop_wraps_around(session_dir):
+    client = ReplayClient(session_dir, fps=None, loop=True).start()
+    values = _drain(client, limit=2 * N_FRAMES + 1)
+    assert values == [10 * (i % N_FRAMES + 1) for i in range(2 * N_FRAMES + 1)]
+    assert not client.eof
+
+
+def test_fps_clock_paces_frames_and_ends(session_dir):
+    fps = 20
+    client = ReplayClient(session_dir, fps=fps, loop=False, preload=True).start()
+    changes = [] # (time, value) each time a new frame becomes current
+    deadline = time.perf_counter() + 5.0
+    while time.perf_counter() < deadline:
+        frame = client.get_frame()
+        if frame is None:
+            break
+        if not changes or _value(frame) != changes[-1][1]:
+            changes.append((time.perf_counter(), _value(frame)))
+        time.sleep(0.002)
+    client.stop()
+
+    assert [v for _, v in changes] == [10 * (i + 1) for i in range(N_FRAMES)]
+    assert client.eof
+    # Each frame stays current for one interval; generous slack for timer/scheduler jitter
+    intervals = np.diff([t for t, _ in changes])
+    assert abs(intervals.mean() - 1 / fps) < 0.5 / fps
+    assert intervals.min() > 0.25 / fps
+
+
+def test_controls_are_counted_noops(session_dir):
+    client = ReplayClient(session_dir, fps=None).start()
+    client.tap(1, 2)
+    client.tap(3, 4)
+    client.swipe(0, 0, 10, 10)
+    client.start_async_hold(5, 5)
+    client.stop_async_hold(5, 5)
+    assert dict(client.control_calls) == {"tap": 2, "swipe": 1, "start_async_hold": 1, "stop_async_hold": 1}
+    # Frames are unaffected
+    assert _value(client.get_frame()) == 10
+    client.stop()
+
+
+def test_missing_source_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ReplayClient(str(tmp_path / "nope"))
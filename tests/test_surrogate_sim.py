@@ -0,0 +1,53 @@
+import sys
+import os
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src'))
+
+from env.surrogate_sim import BenjiSimVecEnv, make_sim_venv
+
+
+def test_stacked_obs_format():
+    venv = make_sim_venv(num_envs=8)
+    obs = venv.reset()
+    assert obs.shape == (8, 4, 128, 128)
+    assert obs.dtype == np.uint8
+    
+    obs, rewards, dones, infos = venv.step(np.ones(8, dtype=np.int64))
+    assert obs.shape == (8, 4, 128, 128)
+    assert rewards.shape == (8,)
+    assert "dist_reward" in infos[0]["reward_components"]
+
+
+def test_seeded_rollouts_are_deterministic():
+    actions = np.random.default_rng(0).integers(0, 2, size=(50, 16))
+    runs = []
+    for _ in range(2):
+        venv = BenjiSimVecEnv(num_envs=16, seed=3)
+        venv.reset()
+        total = np.zeros(16)
+        for a in actions:
+            obs, rewards, dones, infos = venv.step(a)
+            total += rewards
+        runs.append((total, obs))
+    assert np.array_equal(runs[0][0], runs[1][0])
+    assert np.array_equal(runs[0][1], runs[1][1])
+
+
+def test_crash_auto_resets():
+    # Letting go immediately drops every env onto the ground
+    venv = BenjiSimVecEnv(num_envs=4, seed=0)
+    venv.reset()
+    crashed = np.zeros(4, dtype=bool)
+    for _ in range(100):
+        obs, rewards, dones, infos = venv.step(np.zeros(4, dtype=np.int64))
+        for i in np.flatnonzero(dones & ~crashed):
+            assert "terminal_observation" in infos[i]
+            assert rewards[i] < 0
+            # Fresh episode starts hanging from a vine
+            assert venv.attached[i] and venv.steps[i] == 0
+        crashed |= dones
+        if crashed.all():
+            break
+    assert crashed.all()
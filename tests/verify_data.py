@@ -4,6 +4,11 @@ import csv
 import sys
 import glob
 
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src'))
+
+from data.frame_writer import VIDEO_FILE, read_video_index, iter_video_frames
+
 def verify_session(session_name):
     base_path = os.path.join("data", "raw", session_name)
     csv_path = os.path.join(base_path, "actions.csv")
@@ -24,6 +29,12 @@ def verify_session(session_name):
             
     print(f"CSV Rows: {len(actions)}")
     
+    # Video sessions: frames live in one file, aligned by the index sidecar
+    video_index = read_video_index(base_path)
+    if video_index is not None:
+        verify_video_session(base_path, actions, video_index)
+        return
+    
     # 2. Check Frames
     if not os.path.exists(frames_dir):
         print("FAIL: frames/ directory not found!")
@@ -80,6 +91,43 @@ def verify_session(session_name):
     video_writer.release()
     print(f"Video saved to {output_video}")
 
+def verify_video_session(base_path, actions, video_index):
+    print(f"Video Frames: {len(video_index)}")
+    if len(actions) != len(video_index):
+        print(f"WARNING: {len(actions) - len(video_index)} CSV rows have no video frame (dropped)!")
+    else:
+        print("PASS: Video frame count matches CSV count.")
+    
+    print("Generating Verification Video (first 300 frames)...")
+    output_video = "verification.avi"
+    
+    actions.sort(key=lambda x: int(x['frame_id']))
+    rows = [row for row in actions if int(row['frame_id']) in video_index][:300]
+    indices = [video_index[int(row['frame_id'])] for row in rows]
+    
+    video_writer = None
+    for row, img in zip(rows, iter_video_frames(os.path.join(base_path, VIDEO_FILE), indices)):
+        if img is None:
+            print(f"Missing frame: {row['frame_id']}")
+            continue
+        if video_writer is None:
+            height, width, _ = img.shape
+            video_writer = cv2.VideoWriter(output_video, cv2.VideoWriter_fourcc(*'MJPG'), 30, (width, height))
+        
+        action = int(row['action'])
+        color = (0, 0, 255) if action == 1 else (0, 255, 0)
+        text = "HOLD" if action == 1 else "RELEASE"
+        cv2.putText(img, f"Frame: {row['frame_id']}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+        cv2.putText(img, f"Action: {text}", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+        cv2.circle(img, (750, 400), 10, color, -1)
+        video_writer.write(img)
+    
+    if video_writer is None:
+        print("FAIL: Could not read any video frame")
+        return
+    video_writer.release()
+    print(f"Video saved to {output_video}")
+
 if __name__ == "__main__":
     if len(sys.argv) > 1:
         session = sys.argv[1]
@@ -1,16 +1,28 @@
 import sys
 import os
 import time
+import argparse
 import numpy as np
 
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '../src'))
 
 from env.benji_env import BenjiBananasEnv
+from env.replay_client import make_replay_env
 
 def main():
+    parser = argparse.ArgumentParser(description="Env step latency/throughput benchmark")
+    parser.add_argument("--replay", type=str, default=None, help="Replay a recorded session dir or video instead of a live device")
+    parser.add_argument("--replay_fps", type=float, default=15, help="Replay clock (0 = step-locked, one new frame per get_frame)")
+    parser.add_argument("--replay_once", action="store_true", help="Stop at the end of the replay source instead of looping it")
+    args = parser.parse_args()
+    
     print("Initializing Environment...")
-    env = BenjiBananasEnv(render_mode=None, offline=False)
+    if args.replay:
+        print(f"Replay mode: {args.replay} @ {args.replay_fps or 'step-locked'}")
+        env = make_replay_env(args.replay, fps=args.replay_fps or None, loop=not args.replay_once, preload=True)
+    else:
+        env = BenjiBananasEnv(render_mode=None, offline=False)
     
     print("\n" + "="*40)
     print("      LATENCY & THROUGHPUT TEST      ")
@@ -33,6 +45,9 @@ def main():
     start_time = time.time()
     
     for i in range(steps):
+        if args.replay and env.client.eof:
+            print(f"Replay source ended after {i} steps.")
+            break
         step_start = time.time()
         
         # Alternate Holding to trigger input logic
@@ -47,7 +62,11 @@ def main():
         durations.append(dur)
         
     total_time = time.time() - start_time
+    steps = len(durations)
     env.close()
+    if not steps:
+        print("No steps measured.")
+        return
     
     # Analysis
     avg_dur = np.mean(durations)
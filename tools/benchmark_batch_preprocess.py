@@ -0,0 +1,67 @@
+import sys
+import os
+import time
+import argparse
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src'))
+
+from env.preprocessing import BenjiPreprocessor
+from env.batch_preprocessing import BatchPreprocessor
+from env.replay_client import iter_source_frames
+
+
+def run_loop(preprocessor, frames, out):
+    """One process_frame call per frame (current behaviour)."""
+    t0 = time.perf_counter()
+    for i, frame in enumerate(frames):
+        out[i] = preprocessor.process_frame(frame)[0]
+    return time.perf_counter() - t0
+
+
+def run_batch(batch, frames, out):
+    t0 = time.perf_counter()
+    batch.process_batch(frames, out)
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="process_frame loop vs BatchPreprocessor.process_batch")
+    parser.add_argument("--source", type=str, default=None, help="Session dir or video to read frames from (default: synthetic frames)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 4, 16, 64, 256, 1024], help="Batch sizes")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per size (best is reported)")
+    args = parser.parse_args()
+
+    n = max(args.sizes)
+    if args.source:
+        frames = []
+        for frame in iter_source_frames(args.source):
+            frames.append(frame)
+            if len(frames) >= n:
+                break
+        # Short recordings are cycled up to the largest batch
+        frames = [frames[i % len(frames)] for i in range(n)]
+    else:
+        rng = np.random.default_rng(0)
+        frames = [rng.integers(0, 255, (448, 800, 3), dtype=np.uint8) for _ in range(min(n, 64))]
+        frames = [frames[i % len(frames)] for i in range(n)]
+    frames = np.stack(frames)
+
+    preprocessor = BenjiPreprocessor()
+    batch = BatchPreprocessor(preprocessor)
+    print(f"Frames: {frames.shape} ({'recorded' if args.source else 'synthetic'})")
+
+    print(f"\n{'batch':>6}{'loop ms/frame':>16}{'batch ms/frame':>16}{'speedup':>10}")
+    for size in args.sizes:
+        chunk = frames[:size]
+        out_loop = np.empty((size, 128, 128), dtype=np.uint8)
+        out_batch = np.empty((size, 128, 128), dtype=np.uint8)
+        t_loop = min(run_loop(preprocessor, chunk, out_loop) for _ in range(args.repeats)) / size
+        t_batch = min(run_batch(batch, chunk, out_batch) for _ in range(args.repeats)) / size
+        assert np.array_equal(out_loop, out_batch), "process_batch must match process_frame bit for bit"
+        print(f"{size:>6}{t_loop * 1000:>16.3f}{t_batch * 1000:>16.3f}{t_loop / t_batch:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
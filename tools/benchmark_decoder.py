@@ -0,0 +1,103 @@
+import sys
+import os
+import time
+import argparse
+import subprocess
+import numpy as np
+import av
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src'))
+
+from env.frame_ring import FrameRingReader
+from env.av_decoder import AVFrameSource, scaled_size
+
+
+def output_size(video, max_width):
+    """Native and output (w, h) of the video, with the AV backend's scaling rule."""
+    with av.open(video) as container:
+        ctx = container.streams.video[0].codec_context
+        native = (ctx.width, ctx.height)
+    return native, scaled_size(*native, max_width)
+
+
+def open_pipe_backend(video, native, size, ffmpeg, realtime):
+    """The existing path: ffmpeg subprocess -> raw BGR pipe -> FrameRingReader."""
+    width, height = size
+    cmd = [ffmpeg, "-loglevel", "error", "-nostdin"]
+    if realtime:
+        cmd.append("-re")
+    cmd += ["-i", video]
+    if size != native:
+        # Scale only when the AV backend does too, so both do the same work
+        cmd += ["-vf", f"scale={width}:{height}"]
+    cmd += ["-f", "rawvideo", "-pix_fmt", "bgr24", "pipe:1"]
+    proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, bufsize=0)
+    reader = FrameRingReader(proc.stdout, frame_shape=(height, width, 3), ring_size=8).start()
+    
+    def stop():
+        proc.terminate()
+        proc.wait()
+        reader.stop()
+    return reader, stop
+
+
+def open_av_backend(video, width, realtime):
+    source = AVFrameSource(video, max_width=width, realtime=realtime).start()
+    return source, source.stop
+
+
+def run(name, source, stop, start_time, max_frames):
+    """Consumes frames as fast as they arrive, timing each get."""
+    seq = -1
+    first = None
+    intervals = []
+    received = 0
+    last = time.perf_counter()
+    while received < max_frames:
+        ref = source.wait_next(seq, timeout=5.0)
+        if ref is None:
+            break
+        now = time.perf_counter()
+        if first is None:
+            first = now - start_time
+        else:
+            intervals.append((now - last) * 1000)
+        last = now
+        received += 1
+        seq = ref.seq
+    total = time.perf_counter() - start_time
+    skipped = seq + 1 - received
+    stop()
+    
+    intervals = np.array(intervals) if intervals else np.zeros(1)
+    print(f"\n--- {name} ---")
+    print(f"First Frame:    {first * 1000 if first is not None else float('nan'):.1f} ms")
+    print(f"Frames:         {received} (skipped by consumer: {skipped})")
+    print(f"Throughput:     {received / total:.1f} FPS")
+    print(f"Frame Interval: mean {intervals.mean():.2f} ms | p95 {np.percentile(intervals, 95):.2f} ms | max {intervals.max():.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the ffmpeg pipe and in-process PyAV decoder backends on a local video")
+    parser.add_argument("video", type=str, help="Recorded video file (e.g. a session's frames.mkv or a scrcpy .mkv)")
+    parser.add_argument("--width", type=int, default=800, help="Max output width for both backends (aspect kept, like scrcpy --max-size)")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--realtime", action="store_true", help="Pace input at its native frame rate (like a live stream)")
+    parser.add_argument("--ffmpeg", type=str, default="ffmpeg", help="ffmpeg binary for the pipe backend")
+    args = parser.parse_args()
+    
+    native, size = output_size(args.video, args.width)
+    print(f"Video: {args.video} | {native[0]}x{native[1]} -> {size[0]}x{size[1]} | realtime={args.realtime}")
+    
+    t0 = time.perf_counter()
+    reader, stop = open_pipe_backend(args.video, native, size, args.ffmpeg, args.realtime)
+    run("ffmpeg subprocess + pipe", reader, stop, t0, args.frames)
+    
+    t0 = time.perf_counter()
+    source, stop = open_av_backend(args.video, args.width, args.realtime)
+    run("PyAV in-process", source, stop, t0, args.frames)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import sys
+import os
+import time
+import argparse
+import numpy as np
+import cv2
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src'))
+
+from env.frame_context import FrameContext, FrameContextStats
+from env.replay_client import iter_source_frames
+
+# Same regions the env uses
+DIST_ROI = (715, 39, 55, 19)
+BANANA_ROI = (715, 59, 55, 19)
+GAME_OVER_ROI = (0, 250, 120, 190)
+OBS_SIZE = (128, 128)
+
+
+def crop(img, rect):
+    x, y, w, h = rect
+    return img[y:y + h, x:x + w]
+
+
+def run_independent(frames, template):
+    """Each consumer converts the raw frame on its own (current behaviour)."""
+    prev_small = None
+    t0 = time.perf_counter()
+    for frame in frames:
+        # Preprocessor: grayscale + resize
+        obs = cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), OBS_SIZE, interpolation=cv2.INTER_AREA)
+        # Reward: counter ROIs + motion term on its own small gray
+        for rect in (DIST_ROI, BANANA_ROI):
+            cv2.threshold(cv2.cvtColor(crop(frame, rect), cv2.COLOR_BGR2GRAY), 200, 255, cv2.THRESH_BINARY)
+        small = cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), OBS_SIZE, interpolation=cv2.INTER_AREA)
+        if prev_small is not None:
+            cv2.absdiff(small, prev_small).mean()
+        prev_small = small
+        # Game over: template match on a gray crop
+        cv2.matchTemplate(cv2.cvtColor(crop(frame, GAME_OVER_ROI), cv2.COLOR_BGR2GRAY), template, cv2.TM_CCOEFF_NORMED)
+    return (time.perf_counter() - t0) / len(frames), obs
+
+
+def run_shared(frames, template, stats):
+    """All consumers read from one FrameContext per frame."""
+    ctx = None
+    t0 = time.perf_counter()
+    for frame in frames:
+        ctx = FrameContext(frame, stats=stats) if ctx is None else ctx.next(frame)
+        obs = ctx.small_gray(OBS_SIZE)
+        for rect in (DIST_ROI, BANANA_ROI):
+            cv2.threshold(ctx.roi_gray(rect), 200, 255, cv2.THRESH_BINARY)
+        small = ctx.small_gray(OBS_SIZE)
+        if ctx.prev is not None:
+            cv2.absdiff(small, ctx.prev.small_gray(OBS_SIZE)).mean()
+        cv2.matchTemplate(ctx.roi_gray(GAME_OVER_ROI), template, cv2.TM_CCOEFF_NORMED)
+    return (time.perf_counter() - t0) / len(frames), obs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-step frame conversions: independent consumers vs shared FrameContext")
+    parser.add_argument("--source", type=str, default=None, help="Session dir or video to replay (default: synthetic frames)")
+    parser.add_argument("--frames", type=int, default=300)
+    args = parser.parse_args()
+    
+    if args.source:
+        frames = []
+        for frame in iter_source_frames(args.source):
+            frames.append(frame)
+            if len(frames) >= args.frames:
+                break
+    else:
+        rng = np.random.default_rng(0)
+        frames = [rng.integers(0, 255, (448, 800, 3), dtype=np.uint8) for _ in range(args.frames)]
+    template = cv2.cvtColor(crop(frames[0], GAME_OVER_ROI), cv2.COLOR_BGR2GRAY)[40:120, 20:100].copy()
+    
+    print(f"Frames: {len(frames)} ({'replay' if args.source else 'synthetic'})")
+    
+    independent, obs_a = run_independent(frames, template)
+    stats = FrameContextStats()
+    shared, obs_b = run_shared(frames, template, stats)
+    assert np.array_equal(obs_a, obs_b), "Shared path must produce the same observation"
+    
+    print(f"\nIndependent: {independent*1000:.3f} ms per step")
+    print(f"Shared:      {shared*1000:.3f} ms per step ({(1 - shared / independent) * 100:.0f}% less)\n")
+    stats.report()
+
+
+if __name__ == "__main__":
+    main()
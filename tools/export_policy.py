@@ -0,0 +1,85 @@
+import sys
+import os
+import time
+import argparse
+import subprocess
+import numpy as np
+
+# Add src to path
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../src')
+sys.path.append(SRC_DIR)
+
+from agent.model import BenjiAgent
+from agent.inference import export_policy, PolicyRuntime
+from agent.pipeline import LatencyStats
+
+# Time from interpreter start to the first action, for each way of loading the policy
+STARTUP_SB3 = """
+import sys, time, numpy as np
+sys.path.append({src!r})
+from agent.model import BenjiAgent
+agent = BenjiAgent(model_path={model!r}, offline=True)
+agent.model.predict(np.zeros((1, 4, 128, 128), dtype=np.uint8), deterministic=True)
+"""
+STARTUP_EXPORTED = """
+import sys
+sys.path.append({src!r})
+from agent.inference import PolicyRuntime
+PolicyRuntime({path!r}).predict()
+"""
+
+
+def time_startup(code):
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - t0
+
+
+def compare(agent, runtime, steps):
+    """
+    Same random observations through SB3 (VecNormalize.normalize_obs, as the
+    venv does in play.py, + model.predict) and through the exported policy.
+    """
+    rng = np.random.default_rng(0)
+    sb3 = LatencyStats()
+    agree = 0
+    for _ in range(steps):
+        obs = rng.integers(0, 255, (1, 4, 128, 128), dtype=np.uint8)
+        t0 = time.perf_counter()
+        expected, _ = agent.model.predict(agent.venv.normalize_obs(obs), deterministic=True)
+        sb3.record("inference", time.perf_counter() - t0)
+        agree += int(runtime.predict(obs[0]) == int(expected[0]))
+    sb3.report("SB3 model.predict")
+    runtime.stats.report("EXPORTED POLICY")
+    print(f"Action agreement: {agree}/{steps}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the PPO policy (+ VecNormalize stats) to TorchScript for play.py --policy")
+    parser.add_argument("--model", type=str, required=True, help="Path to trained model (.zip)")
+    parser.add_argument("--out", type=str, default=None, help="Output file (default: <model>_policy.pt)")
+    parser.add_argument("--compare", type=int, default=0, metavar="STEPS", help="Compare latency/actions against SB3 over STEPS random observations")
+    parser.add_argument("--startup", action="store_true", help="Also time process startup to first action for both (subprocesses)")
+    args = parser.parse_args()
+
+    out = args.out or args.model.replace(".zip", "") + "_policy.pt"
+
+    agent = BenjiAgent(model_path=args.model, offline=True)
+    venv = agent.venv
+    venv.training = False # Freeze the statistics being exported
+    meta = export_policy(agent.model, out, venv=venv)
+    print(f"Exported policy to {out} ({os.path.getsize(out) / 1e6:.1f} MB, VecNormalize folded in: {meta['normalized']})")
+
+    if args.compare:
+        compare(agent, PolicyRuntime(out), args.compare)
+
+    if args.startup:
+        t_sb3 = time_startup(STARTUP_SB3.format(src=SRC_DIR, model=args.model))
+        t_exported = time_startup(STARTUP_EXPORTED.format(src=SRC_DIR, path=out))
+        print(f"\nStartup to first action: SB3 {t_sb3:.2f} s | exported {t_exported:.2f} s")
+
+    agent.close()
+
+
+if __name__ == "__main__":
+    main()
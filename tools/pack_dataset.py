@@ -0,0 +1,22 @@
+import sys
+import os
+import argparse
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src'))
+
+from agent.dataset import build_frame_store
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack recorded sessions into a memory-mapped frame store")
+    parser.add_argument("--data", type=str, default="data/raw", help="Directory containing session_* folders")
+    parser.add_argument("--out", type=str, default="data/processed", help="Output directory for frames.npy/index.npz")
+    parser.add_argument("--workers", type=int, default=None, help="Decoder processes (default: all cores)")
+    parser.add_argument("--reduced_decode", action="store_true",
+                        help="Faster reduced-resolution JPEG decoding (lossy: frames differ slightly from process_frame)")
+    args = parser.parse_args()
+    
+    build_frame_store(args.data, args.out, num_workers=args.workers, reduced_decode=args.reduced_decode)
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,11 @@ import cv2
 import numpy as np
 import argparse
 import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../src'))
+from env.color_mask import ColorMaskLUT
 
 def process_canny(img_bgr):
     """Standard Canny Edge Detection"""
@@ -83,6 +88,7 @@ def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--image", type=str, required=True, help="Input image path")
     parser.add_argument("--out", type=str, default="preprocessing_test.jpg", help="Output comparison image")
+    parser.add_argument("--lut_bits", type=int, default=6, help="Bits per channel of the colour-mask LUT")
     args = parser.parse_args()
     
     if not os.path.exists(args.image):
@@ -116,6 +122,21 @@ def main():
     
     # 4. Laplacian
     lap = process_laplacian(img_resized)
+
+    # Production version of the colour filter (precomputed LUT)
+    lut = ColorMaskLUT(bits=args.lut_bits, size=target_shape)
+    lut_mask = lut.apply(img_resized)
+    agree = (lut_mask == color_mask).mean() * 100
+    n = 200
+    t0 = time.perf_counter()
+    for _ in range(n):
+        process_color_filter(img_resized)
+    t_hsv = (time.perf_counter() - t0) / n * 1000
+    t0 = time.perf_counter()
+    for _ in range(n):
+        lut.apply(img_resized)
+    t_lut = (time.perf_counter() - t0) / n * 1000
+    print(f"Color filter: HSV {t_hsv:.3f} ms | LUT ({args.lut_bits} bits) {t_lut:.3f} ms | agreement {agree:.2f}%")
     
     # Concatenate for display
     # Top Row: Original Gray | Canny
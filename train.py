@@ -14,6 +14,9 @@ def main():
     parser.add_argument("--model", type=str, default=None, help="Path to existing model to load")
     parser.add_argument("--tensorboard", type=str, default="./logs/", help="Tensorboard log dir")
     parser.add_argument("--lr", type=float, default=1e-4, help="Learning Rate")
+    parser.add_argument("--serials", type=str, nargs="+", default=None, help="ADB serials to train on in parallel (one env process per device)")
+    parser.add_argument("--async_reward", action="store_true", help="Read HUD rewards on a worker thread and credit them to their steps afterwards")
+    parser.add_argument("--sim_envs", type=int, default=0, help="Pretrain on N surrogate simulator envs instead of the device")
     
     args = parser.parse_args()
     
@@ -28,7 +31,10 @@ def main():
     agent = BenjiAgent(
         model_path=args.model,
         tensorboard_log=args.tensorboard,
-        learning_rate=args.lr
+        learning_rate=args.lr,
+        sim_envs=args.sim_envs,
+        serials=args.serials,
+        async_reward=args.async_reward
     )
     
     try: